@@ -20,6 +20,9 @@ SOURCE_DIR=""
 BACKUP_DIR="${BACKUP_DIR:-$HOME/backups}"
 EXCLUDE_PATTERNS=()
 COMPRESSION="gzip"
+BACKUP_ENGINE="${BACKUP_ENGINE:-tar}"
+BACKUP_REPO=""
+BACKUP_REPO_PY="${BACKUP_REPO_PY:-$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/backup_repo.py}"
 
 show_help() {
     cat << EOF
@@ -41,10 +44,21 @@ Options:
     -b, --backup-dir DIR    Répertoire de destination
     -c, --compression TYPE  Type (gzip|bzip2|xz|none)
     -e, --exclude PATTERN   Pattern d'exclusion (répétable)
+    --engine ENGINE         Moteur (tar|dedup, défaut: \$BACKUP_ENGINE ou tar)
+    --dedup                 Équivalent de --engine dedup
+    --repo DIR              Dépôt dédupliqué (défaut: <backup-dir>/repo)
+
+Moteur dedup:
+    Délègue à backup_repo.py: découpage en blocs définis par le contenu,
+    stockage unique par SHA-256, compression parallèle. Les fichiers
+    inchangés depuis le dernier snapshot ne sont pas relus, une sauvegarde
+    quotidienne ne coûte que le delta. backup_file vaut <repo>::<snapshot>,
+    utilisable tel quel par restore-directory.sh et restore-backup.sh.
     
 Exemples:
     $SCRIPT_NAME /home/user
     $SCRIPT_NAME -e "*.tmp" -e "cache/" /var/www
+    $SCRIPT_NAME --engine dedup -c xz /var/www
 EOF
 }
 
@@ -59,6 +73,9 @@ parse_args() {
             -b|--backup-dir) BACKUP_DIR="$2"; shift 2 ;;
             -c|--compression) COMPRESSION="$2"; shift 2 ;;
             -e|--exclude) EXCLUDE_PATTERNS+=("$2"); shift 2 ;;
+            --engine) BACKUP_ENGINE="$2"; shift 2 ;;
+            --dedup) BACKUP_ENGINE="dedup"; shift ;;
+            --repo) BACKUP_REPO="$2"; shift 2 ;;
             -*) echo "Option inconnue: $1" >&2; exit 2 ;;
             *) 
                 [[ -z "$SOURCE_DIR" ]] && SOURCE_DIR="$1" || { echo "Trop d'arguments" >&2; exit 2; }
@@ -68,11 +85,107 @@ parse_args() {
 
     [[ -z "$SOURCE_DIR" ]] && { echo "Répertoire source manquant" >&2; exit 2; }
     [[ ! -d "$SOURCE_DIR" ]] && { echo "Répertoire source non trouvé: $SOURCE_DIR" >&2; exit 3; }
+    case "$BACKUP_ENGINE" in
+        tar|dedup) ;;
+        *) echo "Moteur invalide: $BACKUP_ENGINE" >&2; exit 2 ;;
+    esac
+    [[ -z "$BACKUP_REPO" ]] && BACKUP_REPO="$BACKUP_DIR/repo"
+    return 0
+}
+
+# Extrait une valeur scalaire de la sortie JSON de backup_repo.py
+json_field() {
+    local key="$1" json="$2"
+    sed -n "s/^ *\"$key\": \"\{0,1\}\([^\",]*\)\"\{0,1\},\{0,1\}\$/\1/p" <<< "$json" | head -n1
+}
+
+# Tableau JSON des motifs d'exclusion ([] si aucun)
+excluded_patterns_json() {
+    local pattern sep="" out="["
+    for pattern in "${EXCLUDE_PATTERNS[@]}"; do
+        pattern=${pattern//\\/\\\\}
+        out+="$sep\"${pattern//\"/\\\"}\""
+        sep=", "
+    done
+    echo "$out]"
+}
+
+dedup_backup() {
+    local args=(--repo "$BACKUP_REPO" backup -c "$COMPRESSION")
+    local pattern
+    for pattern in "${EXCLUDE_PATTERNS[@]}"; do
+        args+=(-e "$pattern")
+    done
+
+    local result
+    if ! command -v python3 >/dev/null 2>&1 || [[ ! -f "$BACKUP_REPO_PY" ]] || \
+       ! result=$(python3 "$BACKUP_REPO_PY" "${args[@]}" "$SOURCE_DIR" 2>&1); then
+        cat << EOF
+{
+  "status": "error",
+  "code": 1,
+  "timestamp": "$(date -u +"%Y-%m-%dT%H:%M:%SZ")",
+  "script": "$SCRIPT_NAME",
+  "message": "Directory backup failed",
+  "data": {},
+  "errors": ["Dedup backup engine failed: $(tr -d '"\n' <<< "${result:-python3 or backup_repo.py not found}")"],
+  "warnings": []
+}
+EOF
+        exit 1
+    fi
+
+    local snapshot_id parent original_size backup_size
+    snapshot_id=$(json_field id "$result")
+    parent=$(json_field parent "$result")
+    [[ "$parent" == "null" ]] || parent="\"$parent\""
+    original_size=$(json_field bytes_total "$result")
+    backup_size=$(json_field bytes_stored "$result")
+
+    local compression_ratio="0"
+    [[ $original_size -gt 0 ]] && compression_ratio=$(( (original_size - backup_size) * 100 / original_size ))
+
+    cat << EOF
+{
+  "status": "success",
+  "code": 0,
+  "timestamp": "$(date -u +"%Y-%m-%dT%H:%M:%SZ")",
+  "script": "$SCRIPT_NAME",
+  "message": "Directory backup completed successfully",
+  "data": {
+    "source_directory": "$SOURCE_DIR",
+    "backup_file": "$BACKUP_REPO::$snapshot_id",
+    "engine": "dedup",
+    "repository": "$BACKUP_REPO",
+    "snapshot_id": "$snapshot_id",
+    "parent_snapshot": $parent,
+    "compression": "$COMPRESSION",
+    "original_size": $original_size,
+    "backup_size": $backup_size,
+    "compression_ratio": $compression_ratio,
+    "duration_seconds": $(json_field duration_seconds "$result"),
+    "excluded_patterns": $(excluded_patterns_json),
+    "files_count": $(json_field files_total "$result"),
+    "files_changed": $(json_field files_changed "$result"),
+    "files_unchanged": $(json_field files_unchanged "$result"),
+    "bytes_read": $(json_field bytes_read "$result"),
+    "chunks_total": $(json_field chunks_total "$result"),
+    "chunks_new": $(json_field chunks_new "$result")
+  },
+  "errors": [],
+  "warnings": []
+}
+EOF
 }
 
 main() {
     parse_args "$@"
     
+    if [[ "$BACKUP_ENGINE" == "dedup" ]]; then
+        dedup_backup
+        return
+    fi
+    
     # Créer le répertoire de destination
     mkdir -p "$BACKUP_DIR"
     
@@ -138,7 +251,7 @@ main() {
     "backup_size": $backup_size,
     "compression_ratio": $compression_ratio,
     "duration_seconds": $duration,
-    "excluded_patterns": [$(printf '"%s",' "${EXCLUDE_PATTERNS[@]}" | sed 's/,$//')],
+    "excluded_patterns": $(excluded_patterns_json),
     "files_count": $(find "$SOURCE_DIR" -type f | wc -l)
   },
   "errors": [],
@@ -28,6 +28,9 @@ METADATA=${METADATA:-1}
 OVERWRITE=${OVERWRITE:-0}
 SOURCE_FILE=""
 CUSTOM_NAME=""
+BACKUP_ENGINE="${BACKUP_ENGINE:-standard}"
+BACKUP_REPO=""
+BACKUP_REPO_PY="${BACKUP_REPO_PY:-$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/backup_repo.py}"
 
 # =============================================================================
 # Fonctions Utilitaires et Logging
@@ -86,9 +89,12 @@ Options:
     --no-verify            Désactiver la vérification d'intégrité
     --no-metadata          Ne pas générer les métadonnées
     --overwrite            Écraser la sauvegarde existante
+    --dedup                Stocker dans le dépôt dédupliqué (backup_repo.py)
+    --repo DIR             Dépôt dédupliqué (défaut: <backup-dir>/repo)
     
 Variables d'environnement:
     BACKUP_DIR             Répertoire de sauvegarde par défaut
+    BACKUP_ENGINE          dedup pour activer --dedup par défaut
     
 Sortie JSON:
     {
@@ -137,6 +143,7 @@ Exemples:
     $SCRIPT_NAME /etc/hosts                       # Sauvegarde simple
     $SCRIPT_NAME -c xz /var/log/app.log          # Compression XZ
     $SCRIPT_NAME -b /backup -n config /etc/nginx.conf # Nom et répertoire personnalisés
+    $SCRIPT_NAME --dedup /var/lib/app/data.db     # Seuls les blocs modifiés sont stockés
 EOF
 }
 
@@ -201,6 +208,18 @@ parse_args() {
                 OVERWRITE=1
                 shift
                 ;;
+            --dedup)
+                BACKUP_ENGINE="dedup"
+                shift
+                ;;
+            --repo)
+                if [[ -n "${2:-}" ]]; then
+                    BACKUP_REPO="$2"
+                    shift 2
+                else
+                    die "Répertoire de dépôt manquant pour --repo" 2
+                fi
+                ;;
             -*)
                 die "Option inconnue: $1. Utilisez -h pour l'aide." 2
                 ;;
@@ -224,6 +243,9 @@ parse_args() {
         gzip|bzip2|xz|none) ;;
         *) die "Type de compression invalide: $COMPRESSION. Utilisez gzip, bzip2, xz ou none." 2 ;;
     esac
+    
+    [[ -z "$BACKUP_REPO" ]] && BACKUP_REPO="$BACKUP_DIR/repo"
+    return 0
 }
 
 # =============================================================================
@@ -337,7 +359,7 @@ check_disk_space() {
     
     # Espace disponible dans le répertoire de destination
     local available_space
-    available_space=$(df "$backup_dir" | awk 'NR==2 {print $4*1024}' 2>/dev/null || echo "0")
+    available_space=$(df "$backup_dir" | awk 'NR==2 {printf "%.0f", $4*1024}' 2>/dev/null || echo "0")
     
     # Estimation conservative (2x la taille du fichier)
     local required_space=$((source_size * 2))
@@ -552,6 +574,96 @@ generate_restore_command() {
     esac
 }
 
+# Extrait une valeur scalaire de la sortie JSON de backup_repo.py
+json_field() {
+    local key="$1" json="$2"
+    sed -n "s/^ *\"$key\": \"\{0,1\}\([^\",]*\)\"\{0,1\},\{0,1\}\$/\1/p" <<< "$json" | head -n1
+}
+
+dedup_backup_file() {
+    local source_file="$1"
+    
+    command -v python3 >/dev/null 2>&1 || die "Commande manquante: python3" 3
+    [[ -f "$BACKUP_REPO_PY" ]] || die "Moteur de sauvegarde introuvable: $BACKUP_REPO_PY" 3
+    
+    log_info "Dépôt dédupliqué: $BACKUP_REPO"
+    
+    local result
+    result=$(python3 "$BACKUP_REPO_PY" --repo "$BACKUP_REPO" backup -c "$COMPRESSION" \
+        ${CUSTOM_NAME:+--tag "$CUSTOM_NAME"} "$source_file" 2>&1) || die "Échec du moteur dedup: $result" 1
+    
+    local snapshot_id original_size compressed_size backup_duration
+    snapshot_id=$(json_field id "$result")
+    original_size=$(json_field bytes_total "$result")
+    compressed_size=$(json_field bytes_stored "$result")
+    backup_duration=$(json_field duration_seconds "$result")
+    
+    local compression_ratio="0"
+    [[ $original_size -gt 0 ]] && compression_ratio=$(( (original_size - compressed_size) * 100 / original_size ))
+    
+    # Relecture des blocs du snapshot et contrôle de leur empreinte
+    local verification_status="skipped" verification_duration=0
+    if [[ $VERIFY -eq 1 ]]; then
+        local verify_start=${EPOCHREALTIME/[.,]/}
+        if python3 "$BACKUP_REPO_PY" --repo "$BACKUP_REPO" verify --full "$snapshot_id" >/dev/null 2>&1; then
+            verification_status="success"
+        else
+            verification_status="failed"
+        fi
+        local verify_us=$(( ${EPOCHREALTIME/[.,]/} - verify_start ))
+        printf -v verification_duration '%d.%03d' $((verify_us / 1000000)) $((verify_us / 1000 % 1000))
+    fi
+    
+    local source_escaped file_metadata permissions owner modified_time
+    source_escaped=$(echo "$source_file" | sed 's/\\/\\\\/g; s/"/\\"/g')
+    file_metadata=$(get_file_metadata "$source_file")
+    IFS='|' read -r permissions owner modified_time <<< "$file_metadata"
+    
+    cat << EOF
+{
+  "status": "$([ "$verification_status" == "failed" ] && echo "error" || echo "success")",
+  "code": $([ "$verification_status" == "failed" ] && echo 1 || echo 0),
+  "timestamp": "$(date -u +"%Y-%m-%dT%H:%M:%SZ")",
+  "script": "$SCRIPT_NAME",
+  "message": "File backup completed successfully",
+  "data": {
+    "source_file": "$source_escaped",
+    "backup_file": "$BACKUP_REPO::$snapshot_id",
+    "engine": "dedup",
+    "repository": "$BACKUP_REPO",
+    "snapshot_id": "$snapshot_id",
+    "compression": "$COMPRESSION",
+    "original_size": $original_size,
+    "compressed_size": $compressed_size,
+    "compression_ratio": $compression_ratio,
+    "chunks_total": $(json_field chunks_total "$result"),
+    "chunks_new": $(json_field chunks_new "$result"),
+    "checksums": {
+      "algorithm": "sha256-chunks",
+      "verification": "$verification_status"
+    },
+    "metadata": {
+      "backup_date": "$(date -u +"%Y-%m-%dT%H:%M:%SZ")",
+      "original_permissions": "$permissions",
+      "original_owner": "$owner",
+      "original_modified": "$modified_time",
+      "backup_tool": "$SCRIPT_NAME v$SCRIPT_VERSION"
+    },
+    "timing": {
+      "backup_duration": $backup_duration,
+      "verification_duration": $verification_duration
+    },
+    "restore_command": "restore-backup.sh -p $(basename "$source_escaped") $BACKUP_REPO::$snapshot_id $(dirname "$source_escaped")"
+  },
+  "errors": [],
+  "warnings": []
+}
+EOF
+    
+    [[ "$verification_status" == "failed" ]] && exit 1
+    log_info "Sauvegarde dédupliquée terminée: $snapshot_id"
+}
+
 # =============================================================================
 # Fonction Principale
 # =============================================================================
@@ -560,6 +672,13 @@ main() {
     log_debug "Démarrage de $SCRIPT_NAME v$SCRIPT_VERSION"
     
     parse_args "$@"
+    
+    if [[ "$BACKUP_ENGINE" == "dedup" ]]; then
+        SOURCE_FILE=$(validate_source_file "$SOURCE_FILE")
+        dedup_backup_file "$SOURCE_FILE"
+        return
+    fi
+    
     check_dependencies
     
     # Valider et résoudre le fichier source
@@ -3,6 +3,7 @@
 # ==============================================================================
 # Script Atomique: get-disk.usage.sh
 # Description: Récupère les informations d'utilisation des disques/partitions
+# Cache-TTL: 60
 # Author: Generated with AI assistance
 # Version: 1.0
 # Date: 2025-01-03
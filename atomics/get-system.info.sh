@@ -2,6 +2,7 @@
 #
 # Script: get-system.info.sh
 # Description: Récupère les informations système complètes (hostname, OS, version, architecture, uptime, kernel)
+# Cache-TTL: 300
 # Usage: get-system.info.sh [OPTIONS]
 #
 # Options:
@@ -3,6 +3,7 @@
 # ==============================================================================
 # Script Atomique: list-disk.partitions.sh
 # Description: Liste toutes les partitions disque avec détails
+# Cache-TTL: 300
 # Author: Generated with AI assistance
 # Version: 1.0
 # Date: 2025-10-03
@@ -3,6 +3,7 @@
 # ==============================================================================
 # Script Atomique: list-network.interfaces.sh
 # Description: Liste toutes les interfaces réseau avec leurs configurations et états
+# Cache-TTL: 120
 # Author: Generated with AI assistance
 # Version: 1.0
 # Date: 2025-01-03
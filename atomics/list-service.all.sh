@@ -2,6 +2,7 @@
 #
 # Script: list-service.all.sh
 # Description: Liste tous les services systemd avec leurs états (nom, état active/inactive, enabled/disabled)
+# Cache-TTL: 60
 # Usage: list-service.all.sh [OPTIONS]
 #
 # Options:
@@ -21,6 +21,11 @@ MEM_THRESHOLD=${MEM_THRESHOLD:-85}
 DISK_THRESHOLD=${DISK_THRESHOLD:-90}
 LOAD_THRESHOLD=${LOAD_THRESHOLD:-2.0}
 
+# Démon d'échantillonnage optionnel (resource_sampler.py) : évite les forks sur /proc
+SAMPLER_LIB="$(dirname "${BASH_SOURCE[0]}")/../lib/sampler.sh"
+declare -A SAMPLER_DATA=()
+[[ -f "$SAMPLER_LIB" ]] && source "$SAMPLER_LIB"
+
 show_help() {
     cat << EOF
 Usage: $SCRIPT_NAME [OPTIONS]
@@ -65,7 +70,9 @@ parse_args() {
 }
 
 get_cpu_usage() {
-    if command -v top >/dev/null 2>&1; then
+    if [[ -n "${SAMPLER_DATA[cpu_usage_pct]:-}" ]]; then
+        echo "${SAMPLER_DATA[cpu_usage_pct]}"
+    elif command -v top >/dev/null 2>&1; then
         top -bn1 | grep "Cpu(s)" | awk '{print $2}' | sed 's/%us,//' || echo "0"
     else
         echo "0"
@@ -73,7 +80,9 @@ get_cpu_usage() {
 }
 
 get_memory_info() {
-    if [[ -f /proc/meminfo ]]; then
+    if [[ -n "${SAMPLER_DATA[mem_used_pct]:-}" ]]; then
+        echo "${SAMPLER_DATA[mem_used_pct]} ${SAMPLER_DATA[mem_used_kb]} ${SAMPLER_DATA[mem_total_kb]}"
+    elif [[ -f /proc/meminfo ]]; then
         local total used available
         total=$(grep "MemTotal:" /proc/meminfo | awk '{print $2}')
         available=$(grep "MemAvailable:" /proc/meminfo | awk '{print $2}')
@@ -91,7 +100,9 @@ get_disk_usage() {
 }
 
 get_load_average() {
-    if [[ -f /proc/loadavg ]]; then
+    if [[ -n "${SAMPLER_DATA[load_1m]:-}" ]]; then
+        echo "${SAMPLER_DATA[load_1m]}"
+    elif [[ -f /proc/loadavg ]]; then
         cut -d' ' -f1 /proc/loadavg
     else
         echo "0.0"
@@ -103,6 +114,11 @@ main() {
     
     local alerts=() warnings=()
     
+    # Échantillon du démon si disponible, sinon lecture directe de /proc
+    if declare -F sampler_load >/dev/null; then
+        sampler_load || true
+    fi
+    
     # Collecte des métriques CPU
     local cpu_usage
     cpu_usage=$(get_cpu_usage)
@@ -129,9 +145,13 @@ main() {
     
     # Uptime
     local uptime_info
-    if [[ -f /proc/uptime ]]; then
+    if [[ -n "${SAMPLER_DATA[uptime_s]:-}" ]] || [[ -f /proc/uptime ]]; then
         local uptime_seconds
-        uptime_seconds=$(cut -d' ' -f1 /proc/uptime | cut -d'.' -f1)
+        if [[ -n "${SAMPLER_DATA[uptime_s]:-}" ]]; then
+            uptime_seconds="${SAMPLER_DATA[uptime_s]%.*}"
+        else
+            uptime_seconds=$(cut -d' ' -f1 /proc/uptime | cut -d'.' -f1)
+        fi
         local days hours minutes
         days=$((uptime_seconds / 86400))
         hours=$(((uptime_seconds % 86400) / 3600))
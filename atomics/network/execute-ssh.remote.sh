@@ -33,6 +33,12 @@ readonly DEFAULT_SSH_PORT=22
 readonly DEFAULT_TIMEOUT=30
 readonly DEFAULT_USER="$(whoami)"
 readonly DEFAULT_MAX_RETRIES=3
+# Code d'une tentative dont la commande distante a échoué (pas de nouvelle tentative)
+readonly SSH_REMOTE_FAILURE_EXIT=5
+
+# Retry à backoff et disjoncteur par hôte, si la bibliothèque est disponible
+LIB_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../../lib" 2>/dev/null && pwd || true)"
+[[ -f "$LIB_DIR/retry.sh" ]] && source "$LIB_DIR/retry.sh"
 
 # === VARIABLES GLOBALES ===
 TARGET_HOST=""
@@ -296,6 +302,42 @@ prepare_ssh_command() {
 }
 
 # === EXÉCUTION SSH AVEC RETRY ===
+# Une tentative: sorties dans $ssh_stdout_file/$ssh_stderr_file, "code durée" ajouté à $ssh_attempts_file.
+# Retourne 255 (connexion, nouvelle tentative) ou SSH_REMOTE_FAILURE_EXIT (commande distante, sans retry)
+ssh_attempt() {
+    local attempt_start=$(date +%s.%N)
+    local exit_code=0
+
+    if [[ "$DRY_RUN" == true ]]; then
+        log_info "MODE DRY-RUN : ssh ${ssh_options[*]} $TARGET_USER@$TARGET_HOST \"$final_command\""
+        echo "DRY-RUN: Command would be executed" > "$ssh_stdout_file"
+        echo "" > "$ssh_stderr_file"
+    else
+        log_info "Connexion à $TARGET_USER@$TARGET_HOST:$TARGET_PORT"
+        log_debug "Exécution : ssh ${ssh_options[*]} $TARGET_USER@$TARGET_HOST"
+        ssh "${ssh_options[@]}" "$TARGET_USER@$TARGET_HOST" "$final_command" > "$ssh_stdout_file" 2> "$ssh_stderr_file" || exit_code=$?
+    fi
+
+    local attempt_end=$(date +%s.%N)
+    local attempt_duration=$(echo "$attempt_end - $attempt_start" | bc -l 2>/dev/null || echo "0.00")
+    echo "$exit_code $attempt_duration" >> "$ssh_attempts_file"
+
+    case $exit_code in
+        0)
+            log_debug "Commande SSH exécutée avec succès"
+            return 0
+            ;;
+        255)
+            log_debug "Erreur de connexion SSH (code 255) - retry possible"
+            return 255
+            ;;
+        *)
+            log_debug "Erreur d'exécution de commande (code: $exit_code) - pas de retry"
+            return $SSH_REMOTE_FAILURE_EXIT
+            ;;
+    esac
+}
+
 execute_ssh_with_retry() {
     log_debug "Début de l'exécution SSH avec retry"
     
@@ -306,86 +348,59 @@ execute_ssh_with_retry() {
     done < /tmp/ssh_options_$$
     
     local final_command=$(cat /tmp/final_command_$$)
-    local attempt=1
     local success=false
     local last_exit_code=0
-    local connection_time=0
-    local execution_time=0
     local total_time=0
+    local retries_used=0
     local stdout_content=""
     local stderr_content=""
     
-    while [[ $attempt -le $((MAX_RETRIES + 1)) ]]; do
-        log_info "Tentative $attempt/$((MAX_RETRIES + 1)) - Connexion à $TARGET_USER@$TARGET_HOST:$TARGET_PORT"
-        
-        local attempt_start=$(date +%s.%N)
-        
-        # Fichiers temporaires pour les sorties
-        local stdout_file=$(mktemp)
-        local stderr_file=$(mktemp)
-        
-        if [[ "$DRY_RUN" == true ]]; then
-            log_info "MODE DRY-RUN : ssh ${ssh_options[*]} $TARGET_USER@$TARGET_HOST \"$final_command\""
-            echo "DRY-RUN: Command would be executed" > "$stdout_file"
-            echo "" > "$stderr_file"
-            last_exit_code=0
-            success=true
-        else
-            # Exécution SSH réelle
-            log_debug "Exécution : ssh ${ssh_options[*]} $TARGET_USER@$TARGET_HOST"
-            
-            if ssh "${ssh_options[@]}" "$TARGET_USER@$TARGET_HOST" "$final_command" > "$stdout_file" 2> "$stderr_file"; then
-                last_exit_code=0
-                success=true
-                log_debug "Commande SSH exécutée avec succès"
-            else
-                last_exit_code=$?
-                log_debug "Échec commande SSH (code: $last_exit_code)"
-                
-                # Vérification si c'est un problème de connexion (retry possible)
-                if [[ $last_exit_code -eq 255 ]]; then
-                    log_debug "Erreur de connexion SSH (code 255) - retry possible"
-                else
-                    log_debug "Erreur d'exécution de commande (code: $last_exit_code) - pas de retry"
-                    success=false
-                    break
-                fi
-            fi
-        fi
-        
-        local attempt_end=$(date +%s.%N)
-        local attempt_duration=$(echo "$attempt_end - $attempt_start" | bc -l 2>/dev/null || echo "0.00")
-        
-        # Lecture des sorties
-        stdout_content=$(cat "$stdout_file" 2>/dev/null || echo "")
-        stderr_content=$(cat "$stderr_file" 2>/dev/null || echo "")
-        
-        # Nettoyage des fichiers temporaires
-        rm -f "$stdout_file" "$stderr_file"
-        
-        if [[ "$success" == true ]]; then
-            total_time="$attempt_duration"
-            log_info "Commande exécutée avec succès en ${total_time}s"
-            break
-        else
-            log_debug "Tentative $attempt échouée en ${attempt_duration}s"
-            
-            if [[ $attempt -le $MAX_RETRIES ]]; then
-                local wait_time=$((attempt * 2))
-                log_info "Attente ${wait_time}s avant retry..."
-                sleep "$wait_time"
-            fi
-            
-            ((attempt++))
-        fi
-    done
+    # Fichiers temporaires pour les sorties et le suivi des tentatives
+    local ssh_stdout_file=$(mktemp)
+    local ssh_stderr_file=$(mktemp)
+    local ssh_attempts_file=$(mktemp)
+    
+    # Backoff avec jitter et disjoncteur par hôte (lib/retry.sh); seules les erreurs
+    # de connexion (255) sont retentées, un échec de la commande distante est définitif
+    local rc=0
+    if declare -F retry_run >/dev/null; then
+        RETRY_NON_RETRYABLE_CODES="$SSH_REMOTE_FAILURE_EXIT" \
+            retry_run --host "$TARGET_HOST" --port "$TARGET_PORT" --attempts $((MAX_RETRIES + 1)) \
+            -- ssh_attempt || rc=$?
+    else
+        ssh_attempt || rc=$?
+    fi
+    
+    local attempts_done=$(wc -l < "$ssh_attempts_file")
+    if [[ $attempts_done -gt 0 ]]; then
+        read -r last_exit_code total_time < <(tail -n 1 "$ssh_attempts_file")
+        retries_used=$((attempts_done - 1))
+    else
+        # Aucune tentative: disjoncteur ouvert pour cet hôte
+        last_exit_code=255
+        echo "Disjoncteur ouvert pour $TARGET_HOST: hôte indisponible" > "$ssh_stderr_file"
+    fi
+    [[ $rc -eq 0 ]] && success=true
+    
+    # Lecture des sorties
+    stdout_content=$(cat "$ssh_stdout_file" 2>/dev/null || echo "")
+    stderr_content=$(cat "$ssh_stderr_file" 2>/dev/null || echo "")
+    
+    # Nettoyage des fichiers temporaires
+    rm -f "$ssh_stdout_file" "$ssh_stderr_file" "$ssh_attempts_file"
+    
+    if [[ "$success" == true ]]; then
+        log_info "Commande exécutée avec succès en ${total_time}s"
+    else
+        log_debug "Échec après $attempts_done tentative(s) (code: $last_exit_code)"
+    fi
     
     # Stockage des résultats
     cat << EOF > /tmp/execution_result_$$
 {
     "success": $success,
     "exit_code": $last_exit_code,
-    "retries_used": $((attempt - 1)),
+    "retries_used": $retries_used,
     "total_time": "$total_time",
     "stdout": "$(echo "$stdout_content" | sed 's/"/\\"/g' | tr '\n' '\\n')",
     "stderr": "$(echo "$stderr_content" | sed 's/"/\\"/g' | tr '\n' '\\n')",
@@ -615,9 +630,8 @@ main() {
     
     # Exécution SSH avec retry
     local ssh_exit_code=0
-    if ! execute_ssh_with_retry; then
-        ssh_exit_code=$?
-        
+    execute_ssh_with_retry || ssh_exit_code=$?
+    if [[ $ssh_exit_code -ne 0 ]]; then
         # Détermination du type d'erreur pour le code de retour
         case $ssh_exit_code in
             255) exit 2 ;;  # Erreur de connexion SSH
@@ -3,6 +3,7 @@
 # ===================================================================
 # Script: get-cpu.info.sh
 # Description: Récupère les informations CPU détaillées
+# Cache-TTL: 3600
 # Author: AtomicOps-Suite
 # Version: 1.0
 # Niveau: atomic
@@ -242,14 +242,16 @@ format_text_output() {
 format_json_output() {
     echo "{"
     
-    local json_data=""
-    run_benchmarks | while IFS=':' read -r key value; do
-        [[ "$key" == "---" ]] && break
-        [[ -n "$json_data" ]] && json_data+=", "
-        json_data+='"'$key'": "'$value'"'
-    done
+    run_benchmarks | {
+        local json_data=""
+        while IFS=':' read -r key value; do
+            [[ "$key" == "---" ]] && break
+            [[ -n "$json_data" ]] && json_data+=", "
+            json_data+='"'$key'": "'$value'"'
+        done
+        echo "  $json_data"
+    }
     
-    echo "  $json_data"
     echo "}"
 }
 
@@ -5,6 +5,8 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 LIB_DIR="$(realpath "$SCRIPT_DIR/../../../lib")"
 [[ -f "$LIB_DIR/lib-atomics-common.sh" ]] && source "$LIB_DIR/lib-atomics-common.sh"
+# Démon d'échantillonnage optionnel (resource_sampler.py): débits sans double lecture
+[[ -f "$LIB_DIR/sampler.sh" ]] && source "$LIB_DIR/sampler.sh"
 
 OUTPUT_FORMAT="text"
 DEVICE=""
@@ -101,9 +103,21 @@ parse_diskstats() {
     done < /proc/diskstats
 }
 
+# Débits agrégés du dernier échantillon du démon (code 1 si indisponible)
+load_sampler_rates() {
+    declare -F sampler_load >/dev/null && sampler_load && [[ -n "${SAMPLER_DATA[disk_busy_pct]:-}" ]]
+}
+
 format_text_output() {
     echo "=== Statistiques I/O système ==="
     echo
+
+    if load_sampler_rates; then
+        printf "%-20s: %s\n" "read_bytes_s" "${SAMPLER_DATA[disk_read_bytes_s]}"
+        printf "%-20s: %s\n" "write_bytes_s" "${SAMPLER_DATA[disk_write_bytes_s]}"
+        printf "%-20s: %s\n" "busy_pct" "${SAMPLER_DATA[disk_busy_pct]}"
+        echo
+    fi
     
     if command -v iostat >/dev/null 2>&1; then
         get_iostat_data
@@ -120,6 +134,14 @@ format_text_output() {
 format_json_output() {
     echo "{"
     echo '  "timestamp": "'$(date -Iseconds)'",'
+    if load_sampler_rates; then
+        echo '  "rates": {'
+        echo '    "source": "sampler",'
+        echo '    "read_bytes_s": '"${SAMPLER_DATA[disk_read_bytes_s]}"','
+        echo '    "write_bytes_s": '"${SAMPLER_DATA[disk_write_bytes_s]}"','
+        echo '    "busy_pct": '"${SAMPLER_DATA[disk_busy_pct]}"
+        echo '  },'
+    fi
     echo '  "io_statistics": {'
     
     if command -v iostat >/dev/null 2>&1; then
@@ -20,6 +20,8 @@ LIB_DIR="$(realpath "$SCRIPT_DIR/../../../lib")"
 if [[ -f "$LIB_DIR/lib-atomics-common.sh" ]]; then
     source "$LIB_DIR/lib-atomics-common.sh"
 fi
+# Démon d'échantillonnage optionnel (resource_sampler.py): lecture sans fork
+[[ -f "$LIB_DIR/sampler.sh" ]] && source "$LIB_DIR/sampler.sh"
 
 # === VARIABLES GLOBALES ===
 OUTPUT_FORMAT="json"
@@ -88,14 +90,23 @@ convert_bytes() {
 }
 
 get_memory_stats() {
-    local meminfo
-    meminfo=$(cat /proc/meminfo 2>/dev/null) || return 1
-    
-    MEM_TOTAL=$(echo "$meminfo" | awk '/MemTotal/ {print $2 * 1024}')
-    MEM_FREE=$(echo "$meminfo" | awk '/MemFree/ {print $2 * 1024}')
-    MEM_AVAILABLE=$(echo "$meminfo" | awk '/MemAvailable/ {print $2 * 1024}')
-    MEM_BUFFERS=$(echo "$meminfo" | awk '/Buffers/ {print $2 * 1024}')
-    MEM_CACHED=$(echo "$meminfo" | awk '/^Cached/ {print $2 * 1024}')
+    # Via le démon d'échantillonnage si disponible, sinon /proc/meminfo
+    if declare -F sampler_load >/dev/null && sampler_load && [[ -n "${SAMPLER_DATA[mem_cached_kb]:-}" ]]; then
+        MEM_TOTAL=$(( ${SAMPLER_DATA[mem_total_kb]%.*} * 1024 ))
+        MEM_FREE=$(( ${SAMPLER_DATA[mem_free_kb]%.*} * 1024 ))
+        MEM_AVAILABLE=$(( ${SAMPLER_DATA[mem_available_kb]%.*} * 1024 ))
+        MEM_BUFFERS=$(( ${SAMPLER_DATA[mem_buffers_kb]%.*} * 1024 ))
+        MEM_CACHED=$(( ${SAMPLER_DATA[mem_cached_kb]%.*} * 1024 ))
+    else
+        local meminfo
+        meminfo=$(cat /proc/meminfo 2>/dev/null) || return 1
+
+        MEM_TOTAL=$(echo "$meminfo" | awk '/MemTotal/ {print $2 * 1024}')
+        MEM_FREE=$(echo "$meminfo" | awk '/MemFree/ {print $2 * 1024}')
+        MEM_AVAILABLE=$(echo "$meminfo" | awk '/MemAvailable/ {print $2 * 1024}')
+        MEM_BUFFERS=$(echo "$meminfo" | awk '/Buffers/ {print $2 * 1024}')
+        MEM_CACHED=$(echo "$meminfo" | awk '/^Cached/ {print $2 * 1024}')
+    fi
     
     MEM_USED=$((MEM_TOTAL - MEM_FREE - MEM_BUFFERS - MEM_CACHED))
     MEM_USED_PERCENT=$(echo "scale=1; ($MEM_USED * 100) / $MEM_TOTAL" | bc -l)
@@ -3,6 +3,7 @@
 # ===================================================================
 # Script: get-memory.info.sh
 # Description: Récupère les informations mémoire détaillées
+# Cache-TTL: 30
 # Author: AtomicOps-Suite
 # Version: 1.0
 # Niveau: atomic
@@ -5,6 +5,7 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 LIB_DIR="$(realpath "$SCRIPT_DIR/../../../lib")"
 [[ -f "$LIB_DIR/lib-atomics-common.sh" ]] && source "$LIB_DIR/lib-atomics-common.sh"
+[[ -f "$LIB_DIR/sampler.sh" ]] && source "$LIB_DIR/sampler.sh"
 
 OUTPUT_FORMAT="json"
 VERBOSE=false
@@ -43,10 +44,15 @@ convert_kb() {
 get_swap_info() {
     SWAP_DEVICES=()
     
-    # Info globale via /proc/meminfo
-    local meminfo=$(cat /proc/meminfo 2>/dev/null)
-    SWAP_TOTAL=$(echo "$meminfo" | awk '/SwapTotal/ {print $2}')
-    SWAP_FREE=$(echo "$meminfo" | awk '/SwapFree/ {print $2}')
+    # Info globale via le démon d'échantillonnage si disponible, sinon /proc/meminfo
+    if declare -F sampler_load >/dev/null && sampler_load; then
+        SWAP_TOTAL="${SAMPLER_DATA[swap_total_kb]%.*}"
+        SWAP_FREE="${SAMPLER_DATA[swap_free_kb]%.*}"
+    else
+        local meminfo=$(cat /proc/meminfo 2>/dev/null)
+        SWAP_TOTAL=$(echo "$meminfo" | awk '/SwapTotal/ {print $2}')
+        SWAP_FREE=$(echo "$meminfo" | awk '/SwapFree/ {print $2}')
+    fi
     SWAP_USED=$((SWAP_TOTAL - SWAP_FREE))
     
     if [[ $SWAP_TOTAL -gt 0 ]]; then
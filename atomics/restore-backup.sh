@@ -20,6 +20,9 @@ BACKUP_FILE=""
 RESTORE_DIR=""
 FORCE=${FORCE:-0}
 VERIFY_CHECKSUM=${VERIFY_CHECKSUM:-1}
+RESTORE_PATHS=()
+SNAPSHOT_SOURCE=""
+BACKUP_REPO_PY="${BACKUP_REPO_PY:-$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/backup_repo.py}"
 
 show_help() {
     cat << EOF
@@ -30,7 +33,8 @@ Description:
     et gestion des conflits de fichiers existants.
 
 Arguments:
-    <backup_file>          Fichier de sauvegarde à restaurer
+    <backup_file>          Fichier de sauvegarde à restaurer, ou snapshot
+                           dédupliqué <repo>::<snapshot|latest>
     [restore_directory]    Répertoire destination (défaut: PWD)
 
 Options:
@@ -41,10 +45,15 @@ Options:
     -j, --json-only       Sortie JSON uniquement
     -f, --force           Forcer écrasement sans confirmation
     --no-verify           Ignorer vérification checksum
+    -p, --path PATH       Restaurer uniquement ce fichier/répertoire du snapshot
+                          (répétable, snapshots dédupliqués uniquement)
+    --source PATH         Chemin sauvegardé: latest désigne son dernier snapshot
+                          (obligatoire si le dépôt contient plusieurs sources)
     
 Exemples:
     $SCRIPT_NAME backup.tar.gz
     $SCRIPT_NAME -f backup.tar.bz2 /home/user
+    $SCRIPT_NAME --source /etc/nginx -p nginx/nginx.conf ~/backups/repo::latest /tmp
 EOF
 }
 
@@ -58,6 +67,8 @@ parse_args() {
             -j|--json-only) JSON_ONLY=1; QUIET=1; shift ;;
             -f|--force) FORCE=1; shift ;;
             --no-verify) VERIFY_CHECKSUM=0; shift ;;
+            -p|--path) RESTORE_PATHS+=("$2"); shift 2 ;;
+            --source) SNAPSHOT_SOURCE="$2"; shift 2 ;;
             -*) echo "Option inconnue: $1" >&2; exit 2 ;;
             *) 
                 if [[ -z "$BACKUP_FILE" ]]; then
@@ -72,8 +83,9 @@ parse_args() {
     done
 
     [[ -z "$BACKUP_FILE" ]] && { echo "Fichier de sauvegarde manquant" >&2; exit 2; }
-    [[ ! -f "$BACKUP_FILE" ]] && { echo "Fichier de sauvegarde non trouvé: $BACKUP_FILE" >&2; exit 3; }
+    [[ "$BACKUP_FILE" != *::* && ! -f "$BACKUP_FILE" ]] && { echo "Fichier de sauvegarde non trouvé: $BACKUP_FILE" >&2; exit 3; }
     [[ -z "$RESTORE_DIR" ]] && RESTORE_DIR="$PWD"
+    return 0
 }
 
 check_backup_integrity() {
@@ -81,6 +93,10 @@ check_backup_integrity() {
     
     # Vérifier selon l'extension
     case "$file" in
+        *::*)
+            # Présence des blocs; leur empreinte est contrôlée pendant la restauration
+            python3 "$BACKUP_REPO_PY" verify "$file" ${SNAPSHOT_SOURCE:+--source "$SNAPSHOT_SOURCE"} >/dev/null 2>&1 || return 1
+            ;;
         *.tar.gz|*.tgz)
             gzip -t "$file" 2>/dev/null || return 1
             tar -tzf "$file" >/dev/null 2>&1 || return 1
@@ -121,7 +137,7 @@ main() {
     # Vérifier l'espace disque
     local archive_size restore_space
     archive_size=$(stat -c%s "$BACKUP_FILE" 2>/dev/null || echo "0")
-    restore_space=$(df "$RESTORE_DIR" | awk 'NR==2 {print $4 * 1024}')
+    restore_space=$(df "$RESTORE_DIR" | awk 'NR==2 {printf "%.0f", $4 * 1024}')
     
     if [[ $archive_size -gt $restore_space ]]; then
         warnings+=("Insufficient disk space might be available")
@@ -130,25 +146,43 @@ main() {
     # Construire la commande tar pour la restauration
     local tar_cmd="tar"
     case "$BACKUP_FILE" in
+        *::*) ;;
         *.tar.gz|*.tgz) tar_cmd+=" -xzf" ;;
         *.tar.bz2|*.tbz2) tar_cmd+=" -xjf" ;;
         *.tar.xz|*.txz) tar_cmd+=" -xJf" ;;
         *.tar) tar_cmd+=" -xf" ;;
         *) errors+=("Unsupported archive format") ;;
     esac
+    if [[ ${#RESTORE_PATHS[@]} -gt 0 && "$BACKUP_FILE" != *::* ]]; then
+        errors+=("--path requires a dedup snapshot (<repo>::<snapshot>)")
+    fi
     
     if [[ ${#errors[@]} -eq 0 ]]; then
-        tar_cmd+=" \"$BACKUP_FILE\" -C \"$RESTORE_DIR\""
+        if [[ "$BACKUP_FILE" == *::* ]]; then
+            # Snapshot dédupliqué: seuls les blocs des fichiers sélectionnés sont lus
+            tar_cmd="python3 \"$BACKUP_REPO_PY\" restore \"$BACKUP_FILE\" \"$RESTORE_DIR\""
+            [[ -n "$SNAPSHOT_SOURCE" ]] && tar_cmd+=" --source \"$SNAPSHOT_SOURCE\""
+            local restore_path
+            for restore_path in "${RESTORE_PATHS[@]}"; do
+                tar_cmd+=" -p \"$restore_path\""
+            done
+        else
+            tar_cmd+=" \"$BACKUP_FILE\" -C \"$RESTORE_DIR\""
+        fi
         
         # Exécuter la restauration
-        local start_time
+        local start_time restore_output
         start_time=$(date +%s)
         
-        if eval "$tar_cmd" >/dev/null 2>&1; then
+        if restore_output=$(eval "$tar_cmd" 2>/dev/null); then
             local end_time duration files_restored
             end_time=$(date +%s)
             duration=$((end_time - start_time))
-            files_restored=$(tar -tf "$BACKUP_FILE" | wc -l)
+            if [[ "$BACKUP_FILE" == *::* ]]; then
+                files_restored=$(sed -n 's/^ *"files_restored": \([0-9]*\).*/\1/p' <<< "$restore_output")
+            else
+                files_restored=$(tar -tf "$BACKUP_FILE" | wc -l)
+            fi
             
             # JSON de succès
             cat << EOF
@@ -171,7 +205,7 @@ main() {
 }
 EOF
         else
-            errors+=("Tar extract command failed")
+            errors+=("Restore command failed")
         fi
     fi
     
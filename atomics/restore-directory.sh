@@ -21,6 +21,9 @@ TARGET_DIR=""
 FORCE=${FORCE:-0}
 PRESERVE_PERMISSIONS=${PRESERVE_PERMISSIONS:-1}
 OVERWRITE=${OVERWRITE:-0}
+RESTORE_PATHS=()
+SNAPSHOT_SOURCE=""
+BACKUP_REPO_PY="${BACKUP_REPO_PY:-$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/backup_repo.py}"
 
 show_help() {
     cat << EOF
@@ -32,6 +35,7 @@ Description:
 
 Arguments:
     <backup_file>        Archive de sauvegarde (tar.gz, tar.bz2, tar.xz, tar)
+                         ou snapshot dédupliqué <repo>::<snapshot|latest>
     <target_directory>   Répertoire de destination pour la restauration
 
 Options:
@@ -43,10 +47,16 @@ Options:
     -f, --force         Forcer la restauration même si le répertoire existe
     --no-preserve       Ne pas préserver les permissions originales
     --overwrite         Écraser les fichiers existants
+    -p, --path PATH     Restaurer uniquement ce chemin du snapshot (répétable,
+                        snapshots dédupliqués; seuls ses blocs sont lus)
+    --source DIR        Répertoire sauvegardé: latest désigne son dernier snapshot
+                        (obligatoire si le dépôt contient plusieurs sources)
     
 Exemples:
     $SCRIPT_NAME backup.tar.gz /home/user/restored
     $SCRIPT_NAME -f --overwrite backup.tar.bz2 /var/www
+    $SCRIPT_NAME --source /srv/www ~/backups/repo::latest /srv/restore
+    $SCRIPT_NAME --source /srv/www -p www/config.php ~/backups/repo::latest /tmp/restore
 EOF
 }
 
@@ -61,6 +71,8 @@ parse_args() {
             -f|--force) FORCE=1; shift ;;
             --no-preserve) PRESERVE_PERMISSIONS=0; shift ;;
             --overwrite) OVERWRITE=1; shift ;;
+            -p|--path) RESTORE_PATHS+=("$2"); shift 2 ;;
+            --source) SNAPSHOT_SOURCE="$2"; shift 2 ;;
             -*) echo "Option inconnue: $1" >&2; exit 2 ;;
             *) 
                 if [[ -z "$BACKUP_FILE" ]]; then
@@ -76,12 +88,14 @@ parse_args() {
 
     [[ -z "$BACKUP_FILE" ]] && { echo "Fichier de sauvegarde manquant" >&2; exit 2; }
     [[ -z "$TARGET_DIR" ]] && { echo "Répertoire cible manquant" >&2; exit 2; }
-    [[ ! -f "$BACKUP_FILE" ]] && { echo "Fichier de sauvegarde non trouvé: $BACKUP_FILE" >&2; exit 3; }
+    [[ "$BACKUP_FILE" != *::* && ! -f "$BACKUP_FILE" ]] && { echo "Fichier de sauvegarde non trouvé: $BACKUP_FILE" >&2; exit 3; }
+    return 0
 }
 
 check_archive_type() {
     local file="$1"
     case "$file" in
+        *::*) echo "dedup" ;;
         *.tar.gz|*.tgz) echo "gzip" ;;
         *.tar.bz2|*.tbz2) echo "bzip2" ;;
         *.tar.xz|*.txz) echo "xz" ;;
@@ -98,6 +112,7 @@ verify_archive() {
         gzip) gzip -t "$file" 2>/dev/null ;;
         bzip2) bzip2 -t "$file" 2>/dev/null ;;
         xz) xz -t "$file" 2>/dev/null ;;
+        dedup) python3 "$BACKUP_REPO_PY" verify "$file" ${SNAPSHOT_SOURCE:+--source "$SNAPSHOT_SOURCE"} >/dev/null 2>&1 ;;
         tar|*) tar -tf "$file" >/dev/null 2>&1 ;;
     esac
 }
@@ -113,6 +128,9 @@ main() {
     if [[ "$archive_type" == "unknown" ]]; then
         errors+=("Unsupported archive format: $BACKUP_FILE")
     fi
+    if [[ ${#RESTORE_PATHS[@]} -gt 0 && "$archive_type" != "dedup" ]]; then
+        errors+=("--path requires a dedup snapshot (<repo>::<snapshot>)")
+    fi
     
     # Vérifier l'intégrité de l'archive
     if [[ ${#errors[@]} -eq 0 ]] && ! verify_archive "$BACKUP_FILE" "$archive_type"; then
@@ -137,7 +155,7 @@ main() {
     # Vérifier l'espace disque
     local archive_size available_space
     archive_size=$(stat -c%s "$BACKUP_FILE" 2>/dev/null || echo "0")
-    available_space=$(df "$parent_dir" | awk 'NR==2 {print $4 * 1024}')
+    available_space=$(df "$parent_dir" | awk 'NR==2 {printf "%.0f", $4 * 1024}')
     
     if [[ $archive_size -gt $available_space ]]; then
         warnings+=("Insufficient disk space might be available")
@@ -152,18 +170,30 @@ main() {
         local tar_flags=""
         
         case "$archive_type" in
-            gzip) tar_flags="-xzf" ;;
-            bzip2) tar_flags="-xjf" ;;
-            xz) tar_flags="-xJf" ;;
-            tar) tar_flags="-xf" ;;
+            gzip) tar_flags="-xz" ;;
+            bzip2) tar_flags="-xj" ;;
+            xz) tar_flags="-xJ" ;;
+            tar) tar_flags="-x" ;;
         esac
         
         [[ $PRESERVE_PERMISSIONS -eq 1 ]] && tar_flags+="p"
         [[ $VERBOSE -eq 1 ]] && tar_flags+="v"
         [[ $OVERWRITE -eq 1 ]] && tar_flags+="" # tar écrase par défaut
+        tar_flags+="f"
         
         tar_cmd+=" $tar_flags \"$BACKUP_FILE\" -C \"$TARGET_DIR\""
         
+        # Snapshot dédupliqué: seuls les blocs des fichiers sélectionnés sont lus
+        if [[ "$archive_type" == "dedup" ]]; then
+            tar_cmd="python3 \"$BACKUP_REPO_PY\" restore \"$BACKUP_FILE\" \"$TARGET_DIR\""
+            [[ $PRESERVE_PERMISSIONS -eq 0 ]] && tar_cmd+=" --no-preserve"
+            [[ -n "$SNAPSHOT_SOURCE" ]] && tar_cmd+=" --source \"$SNAPSHOT_SOURCE\""
+            local restore_path
+            for restore_path in "${RESTORE_PATHS[@]}"; do
+                tar_cmd+=" -p \"$restore_path\""
+            done
+        fi
+        
         # Exécuter la restauration
         local start_time end_time duration files_count
         start_time=$(date +%s)
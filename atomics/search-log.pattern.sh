@@ -22,6 +22,12 @@ CONTEXT_LINES=${CONTEXT_LINES:-3}
 MAX_RESULTS=${MAX_RESULTS:-100}
 CASE_SENSITIVE=${CASE_SENSITIVE:-0}
 USE_REGEX=${USE_REGEX:-0}
+SINCE=""
+UNTIL=""
+USE_INDEX=${USE_INDEX:-0}
+INCLUDE_ROTATED=${INCLUDE_ROTATED:-0}
+WORKERS=${WORKERS:-}
+LOG_SEARCH_PY="${LOG_SEARCH_PY:-$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/log_search.py}"
 
 show_help() {
     cat << EOF
@@ -45,6 +51,16 @@ Options:
     -m, --max N      Résultats maximum (défaut: 100)
     -i, --ignore-case Ignorer la casse
     -r, --regex      Utiliser regex
+    --since T        Début de la fenêtre (ISO 8601 ou relatif: 30m, 2h, 7d)
+    --until T        Fin de la fenêtre
+    --rotated        Inclure les rotations (.1, .2.gz, ...)
+    --index          Utiliser l'index incrémental (blocs horodatés + Bloom)
+    -w, --workers N  Processus de recherche (défaut: nombre de cœurs)
+
+Moteur:
+    Avec python3, la recherche est déléguée à log_search.py (mmap, parallèle,
+    décompression en flux des .gz). LOG_SEARCH_ENGINE=grep force le mode grep,
+    qui ignore --since/--until/--rotated/--index.
     
 Exemples:
     $SCRIPT_NAME "error" /var/log/syslog
@@ -65,6 +81,11 @@ parse_args() {
             -m|--max) MAX_RESULTS="$2"; shift 2 ;;
             -i|--ignore-case) CASE_SENSITIVE=0; shift ;;
             -r|--regex) USE_REGEX=1; shift ;;
+            --since) SINCE="$2"; shift 2 ;;
+            --until) UNTIL="$2"; shift 2 ;;
+            --rotated) INCLUDE_ROTATED=1; shift ;;
+            --index) USE_INDEX=1; shift ;;
+            -w|--workers) WORKERS="$2"; shift 2 ;;
             -*) echo "Option inconnue: $1" >&2; exit 2 ;;
             *) 
                 if [[ -z "$PATTERN" ]]; then
@@ -84,6 +105,26 @@ parse_args() {
     fi
 }
 
+# Délègue la recherche au moteur Python (même format JSON) si disponible
+use_python_engine() {
+    [[ "${LOG_SEARCH_ENGINE:-auto}" != "grep" ]] || return 1
+    command -v python3 >/dev/null 2>&1 && [[ -f "$LOG_SEARCH_PY" ]]
+}
+
+run_python_engine() {
+    local args=(-c "$CONTEXT_LINES" -m "$MAX_RESULTS")
+
+    [[ $CASE_SENSITIVE -eq 1 ]] && args+=(--case-sensitive)
+    [[ $USE_REGEX -eq 1 ]] && args+=(--regex)
+    [[ -n "$SINCE" ]] && args+=(--since "$SINCE")
+    [[ -n "$UNTIL" ]] && args+=(--until "$UNTIL")
+    [[ $INCLUDE_ROTATED -eq 1 ]] && args+=(--rotated)
+    [[ $USE_INDEX -eq 1 ]] && args+=(--index)
+    [[ -n "$WORKERS" ]] && args+=(--workers "$WORKERS")
+
+    exec python3 "$LOG_SEARCH_PY" "${args[@]}" -- "$PATTERN" "${LOG_FILES[@]}"
+}
+
 search_in_file() {
     local pattern="$1" file="$2"
     local grep_opts="-n"
@@ -117,6 +158,10 @@ analyze_matches() {
 
 main() {
     parse_args "$@"
+
+    if use_python_engine; then
+        run_python_engine
+    fi
     
     local errors=() warnings=() results=()
     local total_matches=0 files_searched=0
@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+"""
+Dépôt de sauvegarde dédupliqué pour AtomicOps-Suite (moteur "dedup" des atomiques backup/restore)
+
+- Les fichiers sont découpés en blocs définis par le contenu (frontières qui se resynchronisent
+  après une insertion), chaque bloc est stocké une seule fois sous son SHA-256.
+- Les fichiers inchangés depuis le snapshot précédent (taille, mtime, inode) ne sont pas relus.
+- Hachage et compression des blocs en parallèle sur tous les cœurs (zlib/bz2/lzma libèrent le GIL).
+- Chaque exécution écrit un petit manifeste de snapshot ; la restauration ne lit que les blocs
+  des fichiers demandés.
+
+Structure du dépôt:
+    <repo>/config.json
+    <repo>/chunks/ab/abcdef...          (1 octet de codec + données compressées)
+    <repo>/snapshots/<id>.json          (métadonnées et statistiques)
+    <repo>/snapshots/<id>.files.json.gz (liste des fichiers et de leurs blocs)
+
+Référence de snapshot pour les atomiques: <repo>::<snapshot_id> (ou <repo>::latest, qui exige
+--source dès que le dépôt contient plusieurs sources)
+"""
+
+import argparse
+import bz2
+import fcntl
+import fnmatch
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import random
+import socket
+import stat
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+REPO_VERSION = 1
+DEFAULT_REPO = os.path.join(os.environ.get("BACKUP_DIR", os.path.join(os.path.expanduser("~"), "backups")), "repo")
+
+# Découpage: frontière quand les BOUNDARY_BITS derniers octets tombent tous dans la moitié
+# "marquée" de la table ; taille moyenne ~ 2^BOUNDARY_BITS au-delà du minimum
+MIN_CHUNK = 16 * 1024
+BOUNDARY_BITS = 16
+MAX_CHUNK = 256 * 1024
+READ_SIZE = 8 * 1024 * 1024
+
+_rng = random.Random(0x41544F4D)
+_marked = set(_rng.sample(range(256), 128))
+BOUNDARY_TABLE = bytes(1 if b in _marked else 0 for b in range(256))
+BOUNDARY_PATTERN = b"\x01" * BOUNDARY_BITS
+
+CODECS = {
+    "gzip": (b"z", lambda d: zlib.compress(d, 6)),
+    "bzip2": (b"b", lambda d: bz2.compress(d, 9)),
+    "xz": (b"x", lambda d: lzma.compress(d, preset=6)),
+    "none": (b"n", lambda d: d),
+}
+DECODERS = {
+    b"z": zlib.decompress,
+    b"b": bz2.decompress,
+    b"x": lzma.decompress,
+    b"n": lambda d: d,
+}
+
+
+class RepoError(Exception):
+    pass
+
+
+def chunk_boundaries(data, final):
+    """Offsets de fin des blocs de data; sans final, le reliquat n'est pas découpé"""
+    marked = data.translate(BOUNDARY_TABLE)
+    ends = []
+    start = 0
+    size = len(data)
+    while start < size:
+        search_from = start + MIN_CHUNK - BOUNDARY_BITS
+        limit = min(start + MAX_CHUNK, size)
+        pos = marked.find(BOUNDARY_PATTERN, max(search_from, start), limit)
+        if pos >= 0:
+            end = pos + BOUNDARY_BITS
+        elif limit - start == MAX_CHUNK:
+            end = limit
+        elif final:
+            end = size
+        else:
+            break
+        ends.append(end)
+        start = end
+    return ends
+
+
+def iter_chunks(path):
+    """Blocs définis par le contenu d'un fichier, lus par tampons de READ_SIZE"""
+    with open(path, "rb") as f:
+        carry = b""
+        while True:
+            block = f.read(READ_SIZE)
+            data = carry + block if carry else block
+            final = not block
+            start = 0
+            for end in chunk_boundaries(data, final):
+                yield data[start:end]
+                start = end
+            carry = data[start:]
+            if final:
+                break
+
+
+def snapshot_id():
+    return datetime.now().strftime("%Y%m%dT%H%M%S") + "-" + os.urandom(2).hex()
+
+
+class BackupRepository:
+    def __init__(self, path=DEFAULT_REPO, workers=None):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.chunks_dir = os.path.join(self.path, "chunks")
+        self.snapshots_dir = os.path.join(self.path, "snapshots")
+        self.workers = workers or os.cpu_count() or 1
+
+    # ------------------------------------------------------------------
+    # Structure et verrouillage
+    # ------------------------------------------------------------------
+
+    def exists(self):
+        return os.path.isfile(os.path.join(self.path, "config.json"))
+
+    def init(self):
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        config = os.path.join(self.path, "config.json")
+        if not os.path.exists(config):
+            with open(config, "w") as f:
+                json.dump({
+                    "version": REPO_VERSION,
+                    "chunker": {"min": MIN_CHUNK, "boundary_bits": BOUNDARY_BITS, "max": MAX_CHUNK},
+                    "created": datetime.now(timezone.utc).isoformat(),
+                }, f, indent=2)
+
+    def lock(self):
+        fd = os.open(os.path.join(self.path, "lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    @staticmethod
+    def unlock(fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def chunk_path(self, digest):
+        return os.path.join(self.chunks_dir, digest[:2], digest)
+
+    # ------------------------------------------------------------------
+    # Blocs
+    # ------------------------------------------------------------------
+
+    def _store_chunk(self, digest, data, codec):
+        """Compresse et écrit un bloc; retourne la taille stockée"""
+        tag, compress = CODECS[codec]
+        payload = compress(data)
+        if len(payload) >= len(data):
+            tag, payload = b"n", data
+        path = self.chunk_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(tag)
+            f.write(payload)
+        os.replace(tmp, path)
+        return len(payload) + 1
+
+    def read_chunk(self, digest):
+        with open(self.chunk_path(digest), "rb") as f:
+            raw = f.read()
+        data = DECODERS[raw[:1]](raw[1:])
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise RepoError(f"Bloc corrompu: {digest}")
+        return data
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def list_snapshots(self, source=None):
+        snapshots = []
+        if not os.path.isdir(self.snapshots_dir):
+            return snapshots
+        for name in sorted(os.listdir(self.snapshots_dir)):
+            if name.endswith(".json") and not name.endswith(".files.json"):
+                with open(os.path.join(self.snapshots_dir, name)) as f:
+                    meta = json.load(f)
+                if source is None or meta.get("source") == source:
+                    snapshots.append(meta)
+        snapshots.sort(key=lambda m: m["created"])
+        return snapshots
+
+    def resolve(self, snapshot, source=None):
+        """Identifiant complet d'un snapshot (préfixe accepté, 'latest' par source)"""
+        snapshots = self.list_snapshots(source)
+        if not snapshots:
+            raise RepoError(f"Aucun snapshot dans {self.path}" + (f" pour {source}" if source else ""))
+        if snapshot in (None, "", "latest"):
+            # Le dépôt par défaut est partagé: le plus récent d'une autre source ne convient pas
+            sources = {s.get("source") for s in snapshots}
+            if len(sources) > 1:
+                raise RepoError(f"'latest' ambigu: {len(sources)} sources dans {self.path}, préciser --source")
+            return snapshots[-1]["id"]
+        matches = [s["id"] for s in snapshots if s["id"].startswith(snapshot)]
+        if len(matches) != 1:
+            raise RepoError(f"Snapshot introuvable ou ambigu: {snapshot}")
+        return matches[0]
+
+    def load_meta(self, snap_id):
+        with open(os.path.join(self.snapshots_dir, f"{snap_id}.json")) as f:
+            return json.load(f)
+
+    def load_files(self, snap_id):
+        with gzip.open(os.path.join(self.snapshots_dir, f"{snap_id}.files.json.gz"), "rt") as f:
+            return json.load(f)
+
+    def _write_snapshot(self, meta, files):
+        base = os.path.join(self.snapshots_dir, meta["id"])
+        with gzip.open(base + ".files.json.gz.tmp", "wt") as f:
+            json.dump(files, f, separators=(",", ":"))
+        os.replace(base + ".files.json.gz.tmp", base + ".files.json.gz")
+        with open(base + ".json.tmp", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(base + ".json.tmp", base + ".json")
+
+    # ------------------------------------------------------------------
+    # Sauvegarde
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _excluded(rel_path, name, is_dir, patterns):
+        for pattern in patterns:
+            if pattern.endswith("/"):
+                if is_dir and fnmatch.fnmatch(name, pattern.rstrip("/")):
+                    return True
+            elif fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel_path, pattern):
+                return True
+        return False
+
+    def _walk(self, source, excludes):
+        """Entrées (chemin absolu, chemin relatif, stat) préfixées par le nom de la source"""
+        base = os.path.basename(source.rstrip("/")) or "root"
+        st = os.lstat(source)
+        if not stat.S_ISDIR(st.st_mode):
+            yield source, base, st
+            return
+        yield source, base, st
+        for root, dirs, files in os.walk(source):
+            rel_root = os.path.join(base, os.path.relpath(root, source)) if root != source else base
+            kept = []
+            for d in sorted(dirs):
+                rel = os.path.join(rel_root, d)
+                if not self._excluded(rel, d, True, excludes):
+                    kept.append(d)
+                    full = os.path.join(root, d)
+                    yield full, rel, os.lstat(full)
+            dirs[:] = kept
+            for name in sorted(files):
+                rel = os.path.join(rel_root, name)
+                if self._excluded(rel, name, False, excludes):
+                    continue
+                full = os.path.join(root, name)
+                try:
+                    yield full, rel, os.lstat(full)
+                except FileNotFoundError:
+                    continue
+
+    def backup(self, source, codec="gzip", excludes=(), tag=None):
+        if codec not in CODECS:
+            raise RepoError(f"Compression invalide: {codec}")
+        source = os.path.abspath(source)
+        if not os.path.exists(source):
+            raise RepoError(f"Source introuvable: {source}")
+
+        self.init()
+        lock_fd = self.lock()
+        started = time.time()
+        try:
+            parents = self.list_snapshots(source)
+            parent_files = {}
+            if parents:
+                parent_files = {e["path"]: e for e in self.load_files(parents[-1]["id"])}
+
+            stats = {
+                "files_total": 0, "files_changed": 0, "files_unchanged": 0, "directories": 0, "symlinks": 0,
+                "bytes_total": 0, "bytes_read": 0, "chunks_total": 0, "chunks_new": 0, "bytes_stored": 0,
+            }
+            pending = set()
+            lock = threading.Lock()
+            slots = threading.BoundedSemaphore(self.workers * 4)
+
+            def store(digest, data):
+                try:
+                    stored = self._store_chunk(digest, data, codec)
+                    with lock:
+                        stats["bytes_stored"] += stored
+                finally:
+                    slots.release()
+
+            entries = []
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = []
+                for full, rel, st in self._walk(source, list(excludes)):
+                    entry = {
+                        "path": rel, "mode": stat.S_IMODE(st.st_mode), "uid": st.st_uid, "gid": st.st_gid,
+                        "mtime_ns": st.st_mtime_ns,
+                    }
+                    if stat.S_ISDIR(st.st_mode):
+                        entry["type"] = "dir"
+                        stats["directories"] += 1
+                    elif stat.S_ISLNK(st.st_mode):
+                        entry["type"] = "symlink"
+                        entry["target"] = os.readlink(full)
+                        stats["symlinks"] += 1
+                    elif stat.S_ISREG(st.st_mode):
+                        entry.update(type="file", size=st.st_size, ino=st.st_ino)
+                        stats["files_total"] += 1
+                        stats["bytes_total"] += st.st_size
+                        previous = parent_files.get(rel)
+                        if (previous and previous.get("type") == "file" and previous["size"] == st.st_size
+                                and previous["mtime_ns"] == st.st_mtime_ns and previous.get("ino") == st.st_ino):
+                            entry["chunks"] = previous["chunks"]
+                            stats["files_unchanged"] += 1
+                        else:
+                            entry["chunks"] = []
+                            stats["files_changed"] += 1
+                            try:
+                                for data in iter_chunks(full):
+                                    digest = hashlib.sha256(data).hexdigest()
+                                    entry["chunks"].append(digest)
+                                    stats["bytes_read"] += len(data)
+                                    if digest in pending or os.path.exists(self.chunk_path(digest)):
+                                        continue
+                                    pending.add(digest)
+                                    stats["chunks_new"] += 1
+                                    slots.acquire()
+                                    futures.append(pool.submit(store, digest, data))
+                            except OSError:
+                                stats["files_changed"] -= 1
+                                stats["files_total"] -= 1
+                                continue
+                        stats["chunks_total"] += len(entry["chunks"])
+                    else:
+                        continue
+                    entries.append(entry)
+                for future in futures:
+                    future.result()
+
+            meta = {
+                "id": snapshot_id(),
+                "created": datetime.now(timezone.utc).isoformat(),
+                "source": source,
+                "host": socket.gethostname(),
+                "tag": tag,
+                "compression": codec,
+                "parent": parents[-1]["id"] if parents else None,
+                "excludes": list(excludes),
+                "stats": dict(stats, duration_seconds=round(time.time() - started, 3)),
+            }
+            self._write_snapshot(meta, entries)
+            return meta
+        finally:
+            self.unlock(lock_fd)
+
+    # ------------------------------------------------------------------
+    # Restauration
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _selected(entry_path, paths):
+        if not paths:
+            return True
+        for p in paths:
+            p = p.strip("/")
+            if entry_path == p or entry_path.startswith(p + "/") or p.startswith(entry_path + "/"):
+                return True
+        return False
+
+    def restore(self, snapshot, target, paths=(), preserve=True, overwrite=True, source=None):
+        snap_id = self.resolve(snapshot, source)
+        entries = [e for e in self.load_files(snap_id) if self._selected(e["path"], paths)]
+        target = os.path.abspath(target)
+        started = time.time()
+        stats = {"files_restored": 0, "bytes_restored": 0, "chunks_read": 0, "skipped_existing": 0}
+        is_root = os.geteuid() == 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for entry in entries:
+                dest = os.path.join(target, entry["path"])
+                if entry["type"] == "dir":
+                    os.makedirs(dest, exist_ok=True)
+                    continue
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                if os.path.lexists(dest) and not overwrite:
+                    stats["skipped_existing"] += 1
+                    continue
+                if entry["type"] == "symlink":
+                    if os.path.lexists(dest):
+                        os.remove(dest)
+                    os.symlink(entry["target"], dest)
+                    continue
+
+                tmp = dest + ".restore.tmp"
+                with open(tmp, "wb") as out:
+                    # Décompression anticipée en parallèle, écriture dans l'ordre
+                    for data in pool.map(self.read_chunk, entry["chunks"]):
+                        out.write(data)
+                        stats["bytes_restored"] += len(data)
+                os.replace(tmp, dest)
+                stats["chunks_read"] += len(entry["chunks"])
+                stats["files_restored"] += 1
+                if preserve:
+                    self._apply_metadata(dest, entry, is_root)
+
+        # Métadonnées des répertoires en dernier (les écritures modifient leur mtime)
+        if preserve:
+            for entry in reversed(entries):
+                if entry["type"] == "dir":
+                    self._apply_metadata(os.path.join(target, entry["path"]), entry, is_root)
+
+        stats["duration_seconds"] = round(time.time() - started, 3)
+        return {"snapshot_id": snap_id, "target": target, "paths": list(paths), **stats}
+
+    @staticmethod
+    def _apply_metadata(path, entry, is_root):
+        try:
+            if is_root:
+                os.chown(path, entry["uid"], entry["gid"])
+            os.chmod(path, entry["mode"])
+            os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def verify(self, snapshot=None, full=False, source=None):
+        """Vérifie la présence (et avec full, l'empreinte) des blocs référencés"""
+        snap_ids = [self.resolve(snapshot, source)] if snapshot else [m["id"] for m in self.list_snapshots(source)]
+        digests = set()
+        for snap_id in snap_ids:
+            for entry in self.load_files(snap_id):
+                digests.update(entry.get("chunks", ()))
+
+        def check(digest):
+            if not os.path.exists(self.chunk_path(digest)):
+                return digest, "missing"
+            if full:
+                try:
+                    self.read_chunk(digest)
+                except (RepoError, ValueError, zlib.error, lzma.LZMAError, OSError):
+                    return digest, "corrupt"
+            return digest, None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            problems = [(d, p) for d, p in pool.map(check, digests) if p]
+        return {"snapshots": snap_ids, "chunks_checked": len(digests),
+                "missing": [d for d, p in problems if p == "missing"],
+                "corrupt": [d for d, p in problems if p == "corrupt"]}
+
+    def prune(self, keep=7):
+        """Conserve les keep derniers snapshots par source puis supprime les blocs orphelins"""
+        lock_fd = self.lock()
+        try:
+            by_source = {}
+            for meta in self.list_snapshots():
+                by_source.setdefault(meta["source"], []).append(meta["id"])
+            removed = []
+            for ids in by_source.values():
+                for snap_id in ids[:-keep] if keep > 0 else ids:
+                    for suffix in (".json", ".files.json.gz"):
+                        os.remove(os.path.join(self.snapshots_dir, snap_id + suffix))
+                    removed.append(snap_id)
+
+            referenced = set()
+            for meta in self.list_snapshots():
+                for entry in self.load_files(meta["id"]):
+                    referenced.update(entry.get("chunks", ()))
+
+            freed = chunks_removed = 0
+            for sub in os.listdir(self.chunks_dir):
+                sub_dir = os.path.join(self.chunks_dir, sub)
+                for name in os.listdir(sub_dir):
+                    if name not in referenced:
+                        path = os.path.join(sub_dir, name)
+                        freed += os.path.getsize(path)
+                        os.remove(path)
+                        chunks_removed += 1
+            return {"snapshots_removed": removed, "chunks_removed": chunks_removed, "bytes_freed": freed}
+        finally:
+            self.unlock(lock_fd)
+
+    def stats(self):
+        chunks = size = 0
+        if os.path.isdir(self.chunks_dir):
+            for sub in os.listdir(self.chunks_dir):
+                for entry in os.scandir(os.path.join(self.chunks_dir, sub)):
+                    chunks += 1
+                    size += entry.stat().st_size
+        snapshots = self.list_snapshots()
+        logical = sum(m["stats"]["bytes_total"] for m in snapshots)
+        return {
+            "repository": self.path,
+            "snapshots": len(snapshots),
+            "chunks": chunks,
+            "stored_bytes": size,
+            "logical_bytes": logical,
+            "dedup_ratio": round(logical / size, 2) if size else None,
+        }
+
+
+def parse_reference(reference):
+    """<repo>::<snapshot> -> (repo, snapshot)"""
+    if "::" in reference:
+        repo, snap = reference.split("::", 1)
+        return repo or DEFAULT_REPO, snap or "latest"
+    return DEFAULT_REPO, reference
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dépôt de sauvegarde dédupliqué AtomicOps-Suite")
+    parser.add_argument("--repo", default=DEFAULT_REPO)
+    parser.add_argument("-w", "--workers", type=int)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("backup", help="Créer un snapshot d'un fichier ou répertoire")
+    p.add_argument("source")
+    p.add_argument("-c", "--compression", default="gzip", choices=sorted(CODECS))
+    p.add_argument("-e", "--exclude", action="append", default=[])
+    p.add_argument("--tag")
+
+    p = sub.add_parser("restore", help="Restaurer un snapshot (ou certains chemins)")
+    p.add_argument("snapshot", help="Identifiant, préfixe, latest ou <repo>::<id>")
+    p.add_argument("target")
+    p.add_argument("-p", "--path", action="append", default=[])
+    p.add_argument("--no-preserve", action="store_true")
+    p.add_argument("--no-overwrite", action="store_true")
+    p.add_argument("--source", help="Source sauvegardée (résolution de latest)")
+
+    p = sub.add_parser("snapshots", help="Lister les snapshots")
+    p.add_argument("--source")
+
+    p = sub.add_parser("files", help="Lister les fichiers d'un snapshot")
+    p.add_argument("snapshot")
+    p.add_argument("--source", help="Source sauvegardée (résolution de latest)")
+
+    p = sub.add_parser("verify", help="Vérifier les blocs référencés")
+    p.add_argument("snapshot", nargs="?")
+    p.add_argument("--full", action="store_true", help="Relire et recalculer chaque empreinte")
+    p.add_argument("--source", help="Source sauvegardée (résolution de latest)")
+
+    p = sub.add_parser("prune", help="Supprimer les anciens snapshots et les blocs orphelins")
+    p.add_argument("--keep", type=int, default=7)
+
+    sub.add_parser("stats", help="Statistiques du dépôt")
+
+    args = parser.parse_args(argv)
+    repo_path = args.repo
+    snapshot = getattr(args, "snapshot", None)
+    if snapshot and "::" in snapshot:
+        repo_path, snapshot = parse_reference(snapshot)
+    repo = BackupRepository(repo_path, args.workers)
+    source = getattr(args, "source", None)
+    source = os.path.abspath(source) if source and args.command != "backup" else None
+
+    try:
+        if args.command == "backup":
+            result = repo.backup(args.source, args.compression, args.exclude, args.tag)
+        elif args.command == "restore":
+            result = repo.restore(
+                snapshot, args.target, args.path, not args.no_preserve, not args.no_overwrite, source
+            )
+        elif args.command == "snapshots":
+            result = repo.list_snapshots(source)
+        elif args.command == "files":
+            result = [
+                {k: e.get(k) for k in ("path", "type", "size", "mode")}
+                for e in repo.load_files(repo.resolve(snapshot, source))
+            ]
+        elif args.command == "verify":
+            result = repo.verify(snapshot, args.full, source)
+            print(json.dumps(result, indent=2))
+            return 1 if result["missing"] or result["corrupt"] else 0
+        elif args.command == "prune":
+            result = repo.prune(args.keep)
+        else:
+            result = repo.stats()
+    except (RepoError, OSError) as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        return 1
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
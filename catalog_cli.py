@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Point d'entrée unique des opérations sur le catalogue AtomicOps-Suite
+
+Sous-commandes: generate, search, show, export, register, stats, validate, bench.
+Le démarrage est volontairement minimal (sqlite3 et argparse seulement): les modules
+lourds (générateur, csv, analyse des sources) ne sont importés que par la sous-commande
+qui en a besoin, pour pouvoir appeler la CLI dans les boucles des orchestrateurs.
+`bench` mesure ce temps de démarrage à froid par rapport à un budget.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Même valeur que trace_collector.DEFAULT_CATALOG_DB, sans importer ses dépendances réseau
+DEFAULT_CATALOG_DB = os.environ.get("ATOMICOPS_CATALOG_DB", os.path.join(BASE_DIR, "scripts-catalog.db"))
+
+SEARCH_DIRS = ("atomics", "orchestrators")
+COLD_START_BUDGET_MS = 40
+
+
+def connect(db_path, readonly=True):
+    if not os.path.exists(db_path):
+        raise SystemExit(f"❌ Base introuvable: {db_path} (python3 catalog_cli.py generate)")
+    if readonly:
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _print_json(payload):
+    import json
+    print(json.dumps(payload, indent=2, ensure_ascii=False, default=str))
+
+
+def _print_rows(rows, columns, widths):
+    print("  ".join(f"{c:<{w}}" for c, w in zip(columns, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(f"{str(row[c] if row[c] is not None else '')[:w]:<{w}}" for c, w in zip(columns, widths)))
+
+
+def _table_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?",
+                        (name,)).fetchone() is not None
+
+
+# ----------------------------------------------------------------------
+# Sous-commandes
+# ----------------------------------------------------------------------
+
+def cmd_generate(args):
+    from generate_scripts_catalog import ScriptsCatalogGenerator
+
+    ScriptsCatalogGenerator(args.db).generate_database()
+    return 0
+
+
+def cmd_search(args):
+    where, params = [], []
+    if args.term:
+        # Jokers façon shell (create-*) ou sous-chaîne
+        pattern = args.term.replace("*", "%").replace("?", "_")
+        if pattern == args.term:
+            pattern = f"%{pattern}%"
+        where.append("(s.name LIKE ? OR s.description LIKE ?)")
+        params.extend([pattern, pattern])
+    for column in ("type", "category", "status"):
+        value = getattr(args, column)
+        if value:
+            where.append(f"s.{column} = ?")
+            params.append(value)
+    if args.tag:
+        where.append("s.id IN (SELECT script_id FROM script_tags WHERE tag_name = ?)")
+        params.append(args.tag)
+
+    sql = "SELECT s.name, s.type, s.category, s.status, s.description FROM scripts s"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY s.type, s.name LIMIT ?"
+    params.append(args.limit)
+
+    conn = connect(args.db)
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+
+    if args.names:
+        for row in rows:
+            print(row["name"])
+    elif args.json:
+        _print_json([dict(r) for r in rows])
+    else:
+        _print_rows(rows, ("name", "type", "category", "status", "description"), (34, 14, 18, 11, 50))
+        print(f"\n🔍 {len(rows)} script(s)")
+    return 0 if rows else 4
+
+
+def cmd_show(args):
+    conn = connect(args.db)
+    row = conn.execute("SELECT * FROM scripts WHERE name = ?", (args.name,)).fetchone()
+    if row is None:
+        print(f"❌ Script introuvable: {args.name}", file=sys.stderr)
+        return 4
+
+    script = dict(row)
+    details = {
+        "parameters": ("script_parameters", "param_name, param_type, is_required, default_value, description"),
+        "dependencies": ("script_dependencies", "dependency_type, dependency_name, is_optional"),
+        "tags": ("script_tags", "tag_name, tag_category"),
+        "compatibility": ("script_compatibility", "os_family, distribution, compatibility_level"),
+    }
+    for key, (table, columns) in details.items():
+        script[key] = [dict(r) for r in conn.execute(
+            f"SELECT {columns} FROM {table} WHERE script_id = ? ORDER BY id", (script["id"],))]
+    if _table_exists(conn, "script_test_results"):
+        last = conn.execute("""SELECT status, tested_at, duration_ms FROM script_test_results
+                               WHERE script_id = ? ORDER BY tested_at DESC LIMIT 1""", (script["id"],)).fetchone()
+        script["last_test"] = dict(last) if last else None
+    conn.close()
+
+    if args.json:
+        _print_json(script)
+        return 0
+
+    print(f"📄 {script['name']} ({script['type']}, {script['category']}, {script['status']})")
+    for field in ("description", "version", "author", "path", "complexity_score", "last_tested"):
+        if script.get(field) not in (None, ""):
+            print(f"  {field:<17}: {script[field]}")
+    if script.get("last_test"):
+        test = script["last_test"]
+        print(f"  {'dernier test':<17}: {test['status']} le {test['tested_at']} ({test['duration_ms']}ms)")
+    if script["tags"]:
+        print(f"  {'tags':<17}: {', '.join(t['tag_name'] for t in script['tags'])}")
+    for param in script["parameters"]:
+        required = "requis" if param["is_required"] else f"défaut: {param['default_value']}"
+        print(f"  - param {param['param_name']} ({param['param_type']}, {required}) {param['description'] or ''}")
+    for dep in script["dependencies"]:
+        print(f"  - dépendance {dep['dependency_type']}: {dep['dependency_name']}"
+              f"{' (optionnelle)' if dep['is_optional'] else ''}")
+    for compat in script["compatibility"]:
+        print(f"  - compatible {compat['os_family']}/{compat['distribution'] or '*'}: {compat['compatibility_level']}")
+    return 0
+
+
+def _export_tables(conn):
+    return [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+
+
+def cmd_export(args):
+    conn = connect(args.db)
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "sql":
+            for statement in conn.iterdump():
+                out.write(statement + "\n")
+
+        elif args.format == "csv":
+            import csv
+            rows = conn.execute(f"SELECT * FROM {args.table}")
+            writer = csv.writer(out)
+            writer.writerow([d[0] for d in rows.description])
+            writer.writerows(rows)
+
+        elif args.format == "json":
+            import json
+            payload = {"database": os.path.basename(args.db)}
+            for table in _export_tables(conn):
+                payload[table] = [dict(r) for r in conn.execute(f"SELECT * FROM {table}")]
+            json.dump(payload, out, indent=2, ensure_ascii=False, default=str)
+            out.write("\n")
+
+        elif args.format == "markdown":
+            out.write("# Catalogue des scripts AtomicOps-Suite\n\n")
+            current = None
+            for row in conn.execute("SELECT name, type, category, status, description FROM scripts "
+                                    "ORDER BY category, name"):
+                if row["category"] != current:
+                    current = row["category"]
+                    out.write(f"\n## {current}\n\n| Script | Type | Statut | Description |\n|---|---|---|---|\n")
+                description = (row["description"] or "").replace("|", "\\|")
+                out.write(f"| `{row['name']}` | {row['type']} | {row['status']} | {description} |\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        conn.close()
+
+    if args.output:
+        print(f"✅ Export {args.format} -> {args.output}", file=sys.stderr)
+    return 0
+
+
+def _script_type(rel_path):
+    parts = rel_path.replace(os.sep, "/").split("/")
+    for part in parts:
+        if part.startswith("level-") and part[6:].isdigit():
+            return f"orchestrator-{part[6:]}"
+    return "orchestrator-1" if "orchestrators" in parts else "atomic"
+
+
+def cmd_register(args):
+    from generate_scripts_catalog import ScriptsCatalogGenerator
+    from script_test_runner import SOURCE_RE
+
+    generator = ScriptsCatalogGenerator(args.db)
+    entries = []
+    for path in args.paths:
+        if not os.path.isfile(path):
+            print(f"❌ Script introuvable: {path}", file=sys.stderr)
+            return 4
+        data = generator.analyze_script_file(path)
+        if not data:
+            return 1
+        rel_path = os.path.relpath(os.path.abspath(path), BASE_DIR)
+        data["type"] = _script_type(rel_path)
+        data["path"] = rel_path
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            data["libraries"] = sorted(set(SOURCE_RE.findall(f.read())))
+        entries.append(data)
+
+    if args.dry_run:
+        _print_json(entries)
+        return 0
+
+    conn = connect(args.db, readonly=False)
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(scripts)")}
+    fields = ["name", "type", "category", "description", "version", "author", "path", "complexity_score"]
+    if "cache_ttl" in columns:
+        fields.append("cache_ttl")
+    # Upsert: l'identifiant du script (et ses lignes liées) est conservé
+    sql = (f"INSERT INTO scripts ({', '.join(fields)}, updated_at) "
+           f"VALUES ({', '.join('?' * len(fields))}, CURRENT_TIMESTAMP) "
+           f"ON CONFLICT(name) DO UPDATE SET "
+           + ", ".join(f"{f} = excluded.{f}" for f in fields[1:]) + ", updated_at = CURRENT_TIMESTAMP")
+    with conn:
+        for data in entries:
+            conn.execute(sql, [data[f] for f in fields])
+            script_id = conn.execute("SELECT id FROM scripts WHERE name = ?", (data["name"],)).fetchone()[0]
+            conn.execute("DELETE FROM script_dependencies WHERE script_id = ? AND dependency_type = 'library'",
+                         (script_id,))
+            conn.executemany(
+                """INSERT INTO script_dependencies (script_id, dependency_type, dependency_name, is_optional)
+                   VALUES (?, 'library', ?, 0)""",
+                [(script_id, lib) for lib in data["libraries"]],
+            )
+            print(f"✅ {data['name']} ({data['type']}, {data['category']}) enregistré")
+    conn.close()
+    return 0
+
+
+def cmd_stats(args):
+    conn = connect(args.db)
+    stats = {"total": conn.execute("SELECT COUNT(*) FROM scripts").fetchone()[0]}
+    for column in ("type", "category", "status"):
+        stats[f"by_{column}"] = {
+            (r[0] or "unknown"): r[1]
+            for r in conn.execute(f"SELECT {column}, COUNT(*) FROM scripts GROUP BY {column} ORDER BY 2 DESC, 1")
+        }
+    stats["tags"] = conn.execute("SELECT COUNT(DISTINCT tag_name) FROM script_tags").fetchone()[0]
+    stats["dependencies"] = conn.execute("SELECT COUNT(*) FROM script_dependencies").fetchone()[0]
+    stats["last_tested"] = conn.execute("SELECT MAX(last_tested) FROM scripts").fetchone()[0]
+    stats["db_size_kb"] = round(os.path.getsize(args.db) / 1024, 1)
+    conn.close()
+
+    if args.json:
+        _print_json(stats)
+        return 0
+    print(f"📊 {stats['total']} scripts, {stats['tags']} tags, {stats['dependencies']} dépendances "
+          f"({stats['db_size_kb']} KB)")
+    for column in ("type", "category", "status"):
+        print(f"\n  Par {column}:")
+        for key, count in stats[f"by_{column}"].items():
+            print(f"    {key:<22} {count:>4}")
+    print(f"\n  Dernier test: {stats['last_tested'] or 'jamais'}")
+    return 0
+
+
+def cmd_validate(args):
+    conn = connect(args.db)
+    issues = []
+
+    integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    if integrity != "ok":
+        issues.append(("integrity", "", integrity))
+    for table, rowid, parent, _ in conn.execute("PRAGMA foreign_key_check"):
+        issues.append(("foreign_key", table, f"ligne {rowid} -> {parent} absent"))
+    for table in ("script_parameters", "script_outputs", "script_dependencies", "script_tags",
+                  "script_compatibility", "script_usage_stats"):
+        if _table_exists(conn, table):
+            orphans = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE script_id NOT IN (SELECT id FROM scripts)"
+                                   ).fetchone()[0]
+            if orphans:
+                issues.append(("orphans", table, f"{orphans} ligne(s) sans script"))
+    for row in conn.execute("SELECT name FROM scripts WHERE description IS NULL OR TRIM(description) = ''"):
+        issues.append(("description", row["name"], "description vide"))
+
+    if args.files:
+        # Les chemins du catalogue peuvent venir d'un autre poste: vérification par nom
+        on_disk = set()
+        for top in SEARCH_DIRS:
+            for _, _, files in os.walk(os.path.join(BASE_DIR, top)):
+                on_disk.update(f for f in files if f.endswith(".sh"))
+        for row in conn.execute("SELECT name FROM scripts WHERE status != 'planned'"):
+            if row["name"] not in on_disk:
+                issues.append(("missing_file", row["name"], "script absent de atomics/ et orchestrators/"))
+    conn.close()
+
+    if args.json:
+        _print_json([{"check": c, "object": o, "detail": d} for c, o, d in issues])
+    else:
+        for check, obj, detail in issues:
+            print(f"❌ [{check}] {obj} {detail}")
+        print(f"{'✅ Catalogue valide' if not issues else f'⚠️  {len(issues)} problème(s)'} ({args.db})")
+    return 8 if issues else 0
+
+
+def cmd_bench(args):
+    import statistics
+    import subprocess
+    import time
+
+    commands = {
+        "interpreter": [sys.executable, "-c", "pass"],
+        "search": [sys.executable, __file__, "--db", args.db, "search", "backup", "--names"],
+        "show": [sys.executable, __file__, "--db", args.db, "show", args.script],
+        "stats": [sys.executable, __file__, "--db", args.db, "stats", "--json"],
+    }
+    results = {}
+    for name, cmd in commands.items():
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = statistics.median(timings)
+
+    baseline = results.pop("interpreter")
+    over_budget = {name: ms - baseline for name, ms in results.items() if ms - baseline > args.budget}
+    if args.json:
+        _print_json({"interpreter_ms": round(baseline, 1), "budget_ms": args.budget,
+                     "commands_ms": {k: round(v, 1) for k, v in results.items()},
+                     "over_budget": sorted(over_budget)})
+    else:
+        print(f"⏱️  Interpréteur seul: {baseline:.1f}ms (médiane de {args.runs})")
+        for name, ms in results.items():
+            icon = "❌" if name in over_budget else "✅"
+            print(f"{icon} {name:<8} {ms:6.1f}ms  (+{ms - baseline:.1f}ms, budget +{args.budget}ms)")
+    return 1 if over_budget else 0
+
+
+def _args_search(p):
+    p.add_argument("term", nargs="?", help="Nom ou description (jokers * et ? acceptés)")
+    p.add_argument("-t", "--type")
+    p.add_argument("-c", "--category")
+    p.add_argument("-s", "--status")
+    p.add_argument("-T", "--tag")
+    p.add_argument("--limit", type=int, default=500)
+    p.add_argument("--names", action="store_true", help="Noms seuls, un par ligne")
+    p.add_argument("--json", action="store_true")
+
+
+def _args_show(p):
+    p.add_argument("name")
+    p.add_argument("--json", action="store_true")
+
+
+def _args_export(p):
+    p.add_argument("format", choices=["json", "csv", "sql", "markdown"])
+    p.add_argument("-o", "--output", help="Fichier de sortie (défaut: stdout)")
+    p.add_argument("--table", default="scripts", help="Table exportée en CSV")
+
+
+def _args_register(p):
+    p.add_argument("paths", nargs="+")
+    p.add_argument("-n", "--dry-run", action="store_true")
+
+
+def _args_validate(p):
+    p.add_argument("--files", action="store_true", help="Vérifier aussi la présence des scripts sur disque")
+    p.add_argument("--json", action="store_true")
+
+
+def _args_bench(p):
+    p.add_argument("--runs", type=int, default=10)
+    p.add_argument("--budget", type=float, default=COLD_START_BUDGET_MS,
+                   help="Surcoût maximal par rapport à l'interpréteur seul (ms)")
+    p.add_argument("--script", default="backup-file.sh", help="Script utilisé pour show")
+    p.add_argument("--json", action="store_true")
+
+
+def _args_json(p):
+    p.add_argument("--json", action="store_true")
+
+
+# Sous-commande -> (aide, fonction, déclaration des arguments)
+SUBCOMMANDS = {
+    "generate": ("Régénérer la base depuis atomics/", cmd_generate, None),
+    "search": ("Rechercher des scripts", cmd_search, _args_search),
+    "show": ("Détail d'un script", cmd_show, _args_show),
+    "export": ("Exporter le catalogue", cmd_export, _args_export),
+    "register": ("Enregistrer ou mettre à jour des scripts", cmd_register, _args_register),
+    "stats": ("Statistiques du catalogue", cmd_stats, _args_json),
+    "validate": ("Vérifier l'intégrité du catalogue (code 8 si problème)", cmd_validate, _args_validate),
+    "bench": ("Mesurer le démarrage à froid des sous-commandes", cmd_bench, _args_bench),
+}
+
+
+def build_parser(argv=None):
+    parser = argparse.ArgumentParser(description="Opérations sur le catalogue des scripts AtomicOps-Suite")
+    parser.add_argument("--db", default=DEFAULT_CATALOG_DB, help="Base du catalogue")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    # Seule la sous-commande invoquée déclare ses arguments
+    argv = sys.argv[1:] if argv is None else argv
+    selected = next((a for a in argv if a in SUBCOMMANDS), None)
+    for name, (help_text, func, declare) in SUBCOMMANDS.items():
+        p = sub.add_parser(name, help=help_text)
+        p.set_defaults(func=func)
+        if declare and name == selected:
+            declare(p)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser(argv).parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
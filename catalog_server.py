@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Serveur HTTP en lecture seule du catalogue AtomicOps-Suite (API REST/JSON pour les GUI)
+
+- Pool partagé de connexions SQLite en lecture seule (mode=ro, query_only)
+- Cache mémoire des réponses, invalidé quand PRAGMA data_version change
+  (ou quand la base est régénérée: nouveau fichier)
+- ETag forts et réponses 304, gzip, pagination (page, per_page)
+
+Routes:
+    GET /api/scripts?type=&category=&status=&tag=&q=&sort=&page=&per_page=
+    GET /api/scripts/<nom>                 détail (paramètres, sorties, dépendances, tags)
+    GET /api/scripts/<nom>/parameters|dependencies|tags
+    GET /api/tags
+    GET /api/dependencies?page=&per_page=
+    GET /api/stats
+    GET /api/health                        jamais mis en cache
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from trace_collector import DEFAULT_CATALOG_DB
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("ATOMICOPS_CATALOG_PORT", "7784"))
+DEFAULT_POOL_SIZE = 4
+DEFAULT_CACHE_ENTRIES = 512
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+GZIP_MIN_BYTES = 1024
+
+SCRIPT_COLUMNS = ("id", "name", "type", "category", "description", "version", "author", "path", "status",
+                  "created_at", "updated_at", "last_tested", "complexity_score", "implementation_date")
+SORTABLE = {"name", "type", "category", "status", "updated_at", "last_tested", "complexity_score"}
+
+# Tables de détail d'un script: clé JSON -> (table, colonnes)
+DETAIL_TABLES = {
+    "parameters": ("script_parameters", "param_name, param_type, is_required, default_value, description, "
+                                        "validation_pattern"),
+    "outputs": ("script_outputs", "output_type, output_format, description, example_value"),
+    "dependencies": ("script_dependencies", "dependency_type, dependency_name, dependency_version, is_optional, "
+                                            "installation_command"),
+    "tags": ("script_tags", "tag_name, tag_category"),
+    "compatibility": ("script_compatibility", "os_family, distribution, version_min, version_max, "
+                                              "compatibility_level, notes"),
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ConnectionPool:
+    """Connexions en lecture seule partagées entre les threads du serveur"""
+
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._lock = threading.Lock()
+        self._open()
+
+    def _connect(self):
+        conn = sqlite3.connect(f"file:{os.path.abspath(self.db_path)}?mode=ro", uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = 1")
+        return conn
+
+    def _open(self):
+        inode = os.stat(self.db_path).st_ino
+        idle = queue.LifoQueue()
+        try:
+            for _ in range(self.size):
+                idle.put(self._connect())
+            # Connexion dédiée à la surveillance de PRAGMA data_version
+            watch = self._connect()
+        except sqlite3.Error:
+            self._close_all(idle)
+            raise
+        self.inode, self._idle, self._watch = inode, idle, watch
+
+    @staticmethod
+    def _close_all(idle, watch=None):
+        if watch is not None:
+            watch.close()
+        while True:
+            try:
+                idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def generation(self):
+        """Identifiant de version de la base: (inode, data_version)
+
+        OSError si le fichier est absent (remplacement en cours par le générateur).
+        """
+        with self._lock:
+            inode = os.stat(self.db_path).st_ino
+            if inode != self.inode:
+                # Base régénérée (nouveau fichier): nouvelles connexions, anciennes inactives fermées;
+                # celles en cours d'utilisation sont fermées à leur retour (voir connection())
+                previous = self._idle, self._watch
+                self._open()
+                self._close_all(*previous)
+            return self.inode, self._watch.execute("PRAGMA data_version").fetchone()[0]
+
+    @contextmanager
+    def connection(self):
+        idle = self._idle
+        conn = idle.get()
+        try:
+            yield conn
+        finally:
+            # Connexion d'un pool remplacé entre-temps: fermée au lieu d'être rendue
+            with self._lock:
+                current = idle is self._idle
+                if current:
+                    idle.put(conn)
+            if not current:
+                conn.close()
+
+
+class ResponseCache:
+    """Cache LRU des réponses, vidé à chaque changement de génération de la base"""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.generation = None
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, generation):
+        with self.lock:
+            if generation != self.generation:
+                self.entries.clear()
+                self.generation = generation
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def put(self, key, generation, entry):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "_gzipped")
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self._gzipped = None
+
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+# ----------------------------------------------------------------------
+# Requêtes
+# ----------------------------------------------------------------------
+
+def _rows(cursor):
+    return [dict(row) for row in cursor]
+
+
+def _pagination(params):
+    try:
+        page = max(1, int(params.get("page", 1)))
+        per_page = min(MAX_PER_PAGE, max(1, int(params.get("per_page", DEFAULT_PER_PAGE))))
+    except ValueError:
+        raise HTTPError(400, "page et per_page doivent être des entiers")
+    return page, per_page
+
+
+def _paginated(conn, sql, args, params):
+    page, per_page = _pagination(params)
+    total = conn.execute(f"SELECT COUNT(*) FROM ({sql})", args).fetchone()[0]
+    items = _rows(conn.execute(f"{sql} LIMIT ? OFFSET ?", [*args, per_page, (page - 1) * per_page]))
+    pages = (total + per_page - 1) // per_page
+    return {
+        "items": items,
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "pages": pages,
+        "next_page": page + 1 if page < pages else None,
+    }
+
+
+def _script_id(conn, name):
+    row = conn.execute("SELECT id FROM scripts WHERE name = ?", (name,)).fetchone()
+    if row is None:
+        raise HTTPError(404, f"Script introuvable: {name}")
+    return row[0]
+
+
+def list_scripts(conn, params):
+    where, args = [], []
+    for column in ("type", "category", "status"):
+        if params.get(column):
+            where.append(f"s.{column} = ?")
+            args.append(params[column])
+    if params.get("tag"):
+        where.append("s.id IN (SELECT script_id FROM script_tags WHERE tag_name = ?)")
+        args.append(params["tag"])
+    if params.get("q"):
+        where.append("(s.name LIKE ? OR s.description LIKE ?)")
+        args.extend([f"%{params['q']}%"] * 2)
+
+    sort = params.get("sort", "name")
+    descending = sort.startswith("-")
+    if sort.lstrip("-") not in SORTABLE:
+        raise HTTPError(400, f"Tri invalide: {sort}")
+
+    sql = f"SELECT {', '.join('s.' + c for c in SCRIPT_COLUMNS)} FROM scripts s"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY s.{sort.lstrip('-')} {'DESC' if descending else 'ASC'}, s.name"
+    return _paginated(conn, sql, args, params)
+
+
+def script_detail(conn, name, section=None):
+    script_id = _script_id(conn, name)
+    if section:
+        if section not in DETAIL_TABLES:
+            raise HTTPError(404, f"Section inconnue: {section}")
+        table, columns = DETAIL_TABLES[section]
+        return {"script": name, section: _rows(conn.execute(
+            f"SELECT {columns} FROM {table} WHERE script_id = ? ORDER BY id", (script_id,)))}
+
+    script = dict(conn.execute("SELECT * FROM scripts WHERE id = ?", (script_id,)).fetchone())
+    for key, (table, columns) in DETAIL_TABLES.items():
+        script[key] = _rows(conn.execute(f"SELECT {columns} FROM {table} WHERE script_id = ? ORDER BY id",
+                                         (script_id,)))
+    return script
+
+
+def list_tags(conn, params):
+    return {"items": _rows(conn.execute(
+        """SELECT tag_name, tag_category, COUNT(*) AS scripts
+           FROM script_tags GROUP BY tag_name, tag_category ORDER BY scripts DESC, tag_name"""))}
+
+
+def list_dependencies(conn, params):
+    sql = """SELECT s.name AS script, d.dependency_type, d.dependency_name, d.dependency_version, d.is_optional
+             FROM script_dependencies d JOIN scripts s ON s.id = d.script_id"""
+    args = []
+    if params.get("type"):
+        sql += " WHERE d.dependency_type = ?"
+        args.append(params["type"])
+    return _paginated(conn, sql + " ORDER BY s.name, d.dependency_name", args, params)
+
+
+def catalog_stats(conn, params):
+    stats = {"total": conn.execute("SELECT COUNT(*) FROM scripts").fetchone()[0]}
+    for column in ("type", "category", "status"):
+        stats[f"by_{column}"] = {
+            (row[0] or "unknown"): row[1]
+            for row in conn.execute(f"SELECT {column}, COUNT(*) FROM scripts GROUP BY {column} ORDER BY 2 DESC")
+        }
+    stats["tags"] = conn.execute("SELECT COUNT(DISTINCT tag_name) FROM script_tags").fetchone()[0]
+    stats["dependencies"] = conn.execute("SELECT COUNT(*) FROM script_dependencies").fetchone()[0]
+    stats["last_tested"] = conn.execute("SELECT MAX(last_tested) FROM scripts").fetchone()[0]
+    return stats
+
+
+def route(conn, path, params):
+    parts = [unquote(p) for p in path.strip("/").split("/")]
+    if parts[:1] != ["api"] or len(parts) < 2:
+        raise HTTPError(404, f"Route inconnue: {path}")
+    resource, rest = parts[1], parts[2:]
+
+    if resource == "scripts":
+        if not rest:
+            return list_scripts(conn, params)
+        if len(rest) <= 2:
+            return script_detail(conn, rest[0], rest[1] if len(rest) == 2 else None)
+    elif resource == "tags" and not rest:
+        return list_tags(conn, params)
+    elif resource == "dependencies" and not rest:
+        return list_dependencies(conn, params)
+    elif resource == "stats" and not rest:
+        return catalog_stats(conn, params)
+    raise HTTPError(404, f"Route inconnue: {path}")
+
+
+# ----------------------------------------------------------------------
+# Serveur
+# ----------------------------------------------------------------------
+
+class CatalogServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, db_path=DEFAULT_CATALOG_DB, pool_size=DEFAULT_POOL_SIZE,
+                 cache_entries=DEFAULT_CACHE_ENTRIES, cors_origin="*"):
+        self.pool = ConnectionPool(db_path, pool_size)
+        self.cache = ResponseCache(cache_entries)
+        self.cors_origin = cors_origin
+        super().__init__(address, CatalogHandler)
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    server_version = "AtomicOpsCatalog/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        if os.environ.get("DEBUG") == "1":
+            super().log_message(fmt, *args)
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head=False):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        # Clé normalisée (tuple, sans réencodage ambigu): l'ordre des paramètres n'influe pas sur le cache
+        key = (url.path.rstrip("/"), tuple(sorted(params.items())))
+        try:
+            generation = self.server.pool.generation()
+            if key[0] == "/api/health":
+                cache = self.server.cache
+                payload = {"status": "ok", "db": self.server.pool.db_path, "data_version": generation[1],
+                           "cache": {"entries": len(cache.entries), "hits": cache.hits, "misses": cache.misses}}
+                self._send(200, CachedResponse(payload), head, cacheable=False)
+                return
+            response = self.server.cache.get(key, generation)
+            if response is None:
+                with self.server.pool.connection() as conn:
+                    response = CachedResponse(route(conn, url.path, params))
+                self.server.cache.put(key, generation, response)
+        except HTTPError as e:
+            self._send(e.status, CachedResponse({"error": str(e), "status": e.status}), head, cacheable=False)
+            return
+        except OSError as e:
+            # Fichier de la base en cours de remplacement: réessayer sous peu
+            self._send(503, CachedResponse({"error": f"Base indisponible: {e}", "status": 503}), head,
+                       cacheable=False, retry_after=1)
+            return
+        except sqlite3.Error as e:
+            self._send(500, CachedResponse({"error": f"Erreur SQLite: {e}", "status": 500}), head, cacheable=False)
+            return
+
+        if self._etag_matches(response.etag):
+            self.send_response(304)
+            self.send_header("ETag", response.etag)
+            self._common_headers()
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send(200, response, head)
+
+    def _etag_matches(self, etag):
+        header = self.headers.get("If-None-Match")
+        if not header:
+            return False
+        return header.strip() == "*" or etag in (t.strip() for t in header.split(","))
+
+    def _common_headers(self):
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if self.server.cors_origin:
+            self.send_header("Access-Control-Allow-Origin", self.server.cors_origin)
+            self.send_header("Access-Control-Expose-Headers", "ETag")
+
+    def _send(self, status, response, head=False, cacheable=True, retry_after=None):
+        body = response.body
+        use_gzip = len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", "")
+        if use_gzip:
+            body = response.gzipped()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if cacheable:
+            self.send_header("ETag", response.etag)
+            self._common_headers()
+        elif self.server.cors_origin:
+            self.send_header("Access-Control-Allow-Origin", self.server.cors_origin)
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _method_not_allowed(self):
+        self._send(405, CachedResponse({"error": "API en lecture seule", "status": 405}), cacheable=False)
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = _method_not_allowed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP en lecture seule du catalogue AtomicOps-Suite")
+    parser.add_argument("--db", default=DEFAULT_CATALOG_DB, help="Base du catalogue")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="Démarrer le serveur")
+    p.add_argument("--host", default=DEFAULT_HOST)
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--pool", type=int, default=DEFAULT_POOL_SIZE, help="Connexions SQLite partagées")
+    p.add_argument("--cache-entries", type=int, default=DEFAULT_CACHE_ENTRIES)
+    p.add_argument("--cors-origin", default="*", help="Access-Control-Allow-Origin ('' pour désactiver)")
+
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"❌ Base introuvable: {args.db}", file=sys.stderr)
+        return 4
+
+    server = CatalogServer((args.host, args.port), args.db, args.pool, args.cache_entries, args.cors_origin)
+    print(f"📚 Catalogue sur http://{args.host}:{args.port}/api -> {args.db}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Distribution différentielle du catalogue AtomicOps-Suite vers les hôtes
+
+Sur la base de référence, des triggers alimentent un journal de versions de lignes
+(catalog_changelog: table, rowid, opération). `publish` transforme le journal en
+change-sets compacts et ordonnés (état final de chaque ligne modifiée, suppressions)
+dans un répertoire de publication, avec un manifeste et un instantané complet pour
+l'amorçage. Sur chaque hôte, `pull` applique seulement les change-sets postérieurs
+à sa version locale, en une transaction; l'instantané n'est utilisé qu'en cas de
+changement de schéma, de base régénérée ou de chaîne incomplète.
+
+La base par défaut est celle que lisent les outils bash des hôtes
+(database/scripts_catalogue.db); --db ou $ATOMICOPS_SYNC_DB permettent de distribuer
+aussi scripts-catalog.db. Les tables propres à chaque hôte (historique d'exécution,
+métriques, statistiques, spans, tests, mesures) ne sont pas répliquées et sont
+conservées lors d'un réamorçage. Les tables sans clé INTEGER PRIMARY KEY (tables
+de liaison) sont transmises en entier dès qu'une de leurs lignes change.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import urllib.request
+import uuid
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SYNC_DB = os.environ.get("ATOMICOPS_SYNC_DB", os.path.join(BASE_DIR, "database", "scripts_catalogue.db"))
+CHANGELOG_TABLE = "catalog_changelog"
+STATE_TABLE = "catalog_sync_state"
+# Données locales à chaque hôte: jamais répliquées
+# (historique_executions et metriques_performance: base des outils bash)
+LOCAL_TABLES = {
+    "historique_executions", "metriques_performance",
+    "script_usage_stats", "trace_spans", "script_test_results", "host_perf_samples",
+}
+MANIFEST = "manifest.json"
+MAX_CHANGESETS = 500
+
+SYNC_SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS {CHANGELOG_TABLE} (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    tbl TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    op TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+
+# ----------------------------------------------------------------------
+# Schéma et état
+# ----------------------------------------------------------------------
+
+def replicated_tables(conn):
+    """Tables répliquées: toutes sauf tables internes, de synchronisation et locales"""
+    return [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")
+            if not name.startswith("sqlite_") and name not in LOCAL_TABLES
+            and name not in (CHANGELOG_TABLE, STATE_TABLE)]
+
+
+def is_keyed(conn, table):
+    """Clé INTEGER PRIMARY KEY: rowid stable, réplication ligne à ligne"""
+    pk = [r for r in conn.execute(f"PRAGMA table_info('{table}')") if r[5]]
+    return len(pk) == 1 and pk[0][2].upper() == "INTEGER"
+
+
+def schema_hash(conn):
+    digest = hashlib.sha256()
+    for table in replicated_tables(conn):
+        sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (table,)).fetchone()[0]
+        digest.update(" ".join(sql.split()).encode())
+    return digest.hexdigest()[:16]
+
+
+def get_state(conn, key, default=None):
+    try:
+        row = conn.execute(f"SELECT value FROM {STATE_TABLE} WHERE key = ?", (key,)).fetchone()
+    except sqlite3.OperationalError:
+        return default
+    return row[0] if row else default
+
+
+def set_state(conn, **values):
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+    conn.executemany(f"INSERT OR REPLACE INTO {STATE_TABLE} (key, value) VALUES (?, ?)",
+                     [(k, str(v)) for k, v in values.items()])
+
+
+def install_changelog(conn):
+    """Installe le journal et ses triggers sur la base de référence (idempotent)"""
+    conn.executescript(SYNC_SCHEMA)
+    for table in replicated_tables(conn):
+        # Tables sans clé entière: row_id 0, la table entière est retransmise
+        keyed = is_keyed(conn, table)
+        new_id, old_id = ("NEW.rowid", "OLD.rowid") if keyed else ("0", "0")
+        moved = (f"INSERT INTO {CHANGELOG_TABLE} (tbl, row_id, op) "
+                 f"SELECT '{table}', OLD.rowid, 'D' WHERE OLD.rowid != NEW.rowid;" if keyed else "")
+        conn.executescript(f'''
+            CREATE TRIGGER IF NOT EXISTS {CHANGELOG_TABLE}_{table}_ins AFTER INSERT ON "{table}" BEGIN
+                INSERT INTO {CHANGELOG_TABLE} (tbl, row_id, op) VALUES ('{table}', {new_id}, 'I');
+            END;
+            CREATE TRIGGER IF NOT EXISTS {CHANGELOG_TABLE}_{table}_upd AFTER UPDATE ON "{table}" BEGIN
+                {moved}
+                INSERT INTO {CHANGELOG_TABLE} (tbl, row_id, op) VALUES ('{table}', {new_id}, 'U');
+            END;
+            CREATE TRIGGER IF NOT EXISTS {CHANGELOG_TABLE}_{table}_del AFTER DELETE ON "{table}" BEGIN
+                INSERT INTO {CHANGELOG_TABLE} (tbl, row_id, op) VALUES ('{table}', {old_id}, 'D');
+            END;
+        ''')
+    if get_state(conn, "db_id") is None:
+        with conn:
+            set_state(conn, db_id=uuid.uuid4().hex)
+
+
+def drop_changelog(conn):
+    """Retire journal et triggers (copies distribuées aux hôtes)"""
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE ?",
+                                (f"{CHANGELOG_TABLE}_%",)).fetchall():
+        conn.execute(f'DROP TRIGGER "{name}"')
+    conn.execute(f"DROP TABLE IF EXISTS {CHANGELOG_TABLE}")
+
+
+def current_version(conn):
+    return conn.execute(f"SELECT COALESCE(MAX(version), 0) FROM {CHANGELOG_TABLE}").fetchone()[0]
+
+
+# ----------------------------------------------------------------------
+# Publication
+# ----------------------------------------------------------------------
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def build_changeset(conn, since, until):
+    """Change-set compact: état final des lignes modifiées entre deux versions"""
+    changed = {}
+    for table, row_id in conn.execute(
+            f"SELECT DISTINCT tbl, row_id FROM {CHANGELOG_TABLE} WHERE version > ? AND version <= ?",
+            (since, until)):
+        changed.setdefault(table, set()).add(row_id)
+
+    known = set(replicated_tables(conn))
+    tables = {}
+    for table, row_ids in sorted(changed.items()):
+        if table not in known:
+            continue
+        columns = [r[1] for r in conn.execute(f"PRAGMA table_info('{table}')")]
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        if not is_keyed(conn, table):
+            tables[table] = {"columns": columns,
+                             "replace": [list(r) for r in conn.execute(f'SELECT {quoted} FROM "{table}"')]}
+            continue
+        upserts, present = [], set()
+        ids = sorted(row_ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            for row in conn.execute(
+                    f"SELECT rowid, {quoted} FROM \"{table}\" "
+                    f"WHERE rowid IN ({','.join('?' * len(chunk))})", chunk):
+                present.add(row[0])
+                upserts.append(list(row[1:]))
+        tables[table] = {
+            "columns": columns,
+            "upserts": upserts,
+            "deletes": [i for i in ids if i not in present],
+        }
+    return {"from": since, "to": until, "tables": tables}
+
+
+def make_snapshot(db_path, dest):
+    """Instantané gzip de la base sans journal ni tables locales"""
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "snapshot.db")
+        src = sqlite3.connect(db_path)
+        dst = sqlite3.connect(copy)
+        with dst:
+            src.backup(dst)
+        src.close()
+        drop_changelog(dst)
+        existing = {name for (name,) in dst.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in LOCAL_TABLES & existing:
+            dst.execute(f'DELETE FROM "{table}"')
+        dst.commit()
+        dst.execute("VACUUM")
+        dst.close()
+        with open(copy, "rb") as f_in, gzip.open(dest + ".tmp", "wb", compresslevel=9) as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.replace(dest + ".tmp", dest)
+
+
+def publish(db_path, out_dir, force_snapshot=False, max_changesets=MAX_CHANGESETS):
+    """Publie les changements depuis la dernière publication; renvoie un résumé"""
+    os.makedirs(os.path.join(out_dir, "changesets"), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        install_changelog(conn)
+        db_id = get_state(conn, "db_id")
+        schema = schema_hash(conn)
+        version = current_version(conn)
+
+        manifest_path = os.path.join(out_dir, MANIFEST)
+        manifest = None
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+
+        needs_snapshot = (force_snapshot or manifest is None or manifest["db_id"] != db_id
+                          or manifest["schema_hash"] != schema
+                          or len(manifest["changesets"]) >= max_changesets
+                          or version < manifest["latest"])
+        summary = {"db_id": db_id, "version": version, "snapshot": needs_snapshot, "changeset": None}
+
+        if needs_snapshot:
+            name = f"snapshot-{db_id[:8]}-{version}.db.gz"
+            make_snapshot(db_path, os.path.join(out_dir, name))
+            manifest = {
+                "db_id": db_id,
+                "schema_hash": schema,
+                "latest": version,
+                "snapshot": {"version": version, "file": name, "sha256": _sha256(os.path.join(out_dir, name)),
+                             "bytes": os.path.getsize(os.path.join(out_dir, name))},
+                "changesets": [],
+            }
+        elif version > manifest["latest"]:
+            changeset = build_changeset(conn, manifest["latest"], version)
+            data = gzip.compress(json.dumps(changeset, separators=(",", ":"), default=str).encode(), mtime=0)
+            name = f"changesets/{db_id[:8]}-{manifest['latest']}-{version}.json.gz"
+            _write_atomic(os.path.join(out_dir, name), data)
+            manifest["changesets"].append({"from": manifest["latest"], "to": version, "file": name,
+                                           "sha256": hashlib.sha256(data).hexdigest(), "bytes": len(data)})
+            manifest["latest"] = version
+            summary["changeset"] = manifest["changesets"][-1]
+
+        _write_atomic(manifest_path, json.dumps(manifest, indent=2).encode())
+
+        # Le journal publié n'est plus nécessaire sur la base de référence
+        with conn:
+            conn.execute(f"DELETE FROM {CHANGELOG_TABLE} WHERE version < ?", (version,))
+        _cleanup(out_dir, manifest)
+        return summary
+    finally:
+        conn.close()
+
+
+def _cleanup(out_dir, manifest):
+    keep = {manifest["snapshot"]["file"]} | {c["file"] for c in manifest["changesets"]}
+    for name in os.listdir(out_dir):
+        if name.startswith("snapshot-") and name not in keep:
+            os.remove(os.path.join(out_dir, name))
+    for name in os.listdir(os.path.join(out_dir, "changesets")):
+        if f"changesets/{name}" not in keep:
+            os.remove(os.path.join(out_dir, "changesets", name))
+
+
+# ----------------------------------------------------------------------
+# Application sur les hôtes
+# ----------------------------------------------------------------------
+
+def _fetch(source, name):
+    if source.startswith(("http://", "https://")):
+        with urllib.request.urlopen(f"{source.rstrip('/')}/{name}", timeout=30) as response:
+            return response.read()
+    with open(os.path.join(source, name), "rb") as f:
+        return f.read()
+
+
+def _verified(source, entry):
+    data = _fetch(source, entry["file"])
+    if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+        raise ValueError(f"Empreinte invalide: {entry['file']}")
+    return data
+
+
+def apply_changeset(conn, changeset):
+    for table, change in changeset["tables"].items():
+        columns = change["columns"]
+        existing = {r[1] for r in conn.execute(f"PRAGMA table_info('{table}')")}
+        if not existing or not set(columns) <= existing:
+            raise ValueError(f"Schéma local incompatible pour {table}")
+        if "replace" in change:
+            conn.execute(f'DELETE FROM "{table}"')
+            conn.executemany(
+                f'INSERT INTO "{table}" ({", ".join(chr(34) + c + chr(34) for c in columns)}) '
+                f'VALUES ({", ".join("?" * len(columns))})',
+                change["replace"],
+            )
+            continue
+        if change["deletes"]:
+            conn.executemany(f'DELETE FROM "{table}" WHERE rowid = ?', [(i,) for i in change["deletes"]])
+        if change["upserts"]:
+            conn.executemany(
+                f'INSERT OR REPLACE INTO "{table}" ({", ".join(chr(34) + c + chr(34) for c in columns)}) '
+                f'VALUES ({", ".join("?" * len(columns))})',
+                change["upserts"],
+            )
+
+
+def _bootstrap(db_path, source, manifest):
+    """Remplace la base locale par l'instantané, en conservant les tables locales"""
+    data = gzip.decompress(_verified(source, manifest["snapshot"]))
+    directory = os.path.dirname(os.path.abspath(db_path))
+    fd, tmp = tempfile.mkstemp(prefix=".catalog-sync-", suffix=".db", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        conn = sqlite3.connect(tmp)
+        if os.path.exists(db_path):
+            conn.execute("ATTACH DATABASE ? AS previous", (db_path,))
+            for table in LOCAL_TABLES:
+                old_cols = [r[1] for r in conn.execute(f"PRAGMA previous.table_info('{table}')")]
+                new_cols = {r[1] for r in conn.execute(f"PRAGMA main.table_info('{table}')")}
+                if not old_cols:
+                    continue
+                if not new_cols:
+                    sql = conn.execute("SELECT sql FROM previous.sqlite_master WHERE name = ?", (table,)).fetchone()
+                    conn.execute(sql[0])
+                    new_cols = set(old_cols)
+                cols = ", ".join(f'"{c}"' for c in old_cols if c in new_cols)
+                conn.execute(f'INSERT INTO main."{table}" ({cols}) SELECT {cols} FROM previous."{table}"')
+            conn.commit()
+            conn.execute("DETACH DATABASE previous")
+        with conn:
+            set_state(conn, db_id=manifest["db_id"], version=manifest["snapshot"]["version"],
+                      schema_hash=manifest["schema_hash"])
+        conn.close()
+        os.replace(tmp, db_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return len(data)
+
+
+def pull(db_path, source):
+    """Met la base locale à jour; renvoie un résumé (version, octets transférés)"""
+    manifest = json.loads(_fetch(source, MANIFEST))
+    summary = {"from": None, "to": manifest["latest"], "snapshot": False, "changesets": 0, "bytes": 0}
+
+    local_id = local_version = local_schema = None
+    if os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        local_id = get_state(conn, "db_id")
+        local_version = int(get_state(conn, "version", -1))
+        local_schema = get_state(conn, "schema_hash")
+        conn.close()
+    summary["from"] = local_version
+
+    if (local_id != manifest["db_id"] or local_schema != manifest["schema_hash"]
+            or local_version < manifest["snapshot"]["version"]):
+        summary["bytes"] += manifest["snapshot"]["bytes"]
+        _bootstrap(db_path, source, manifest)
+        summary["snapshot"] = True
+        local_version = manifest["snapshot"]["version"]
+
+    pending = [c for c in manifest["changesets"] if c["from"] >= local_version]
+    if not pending:
+        return summary
+
+    # Téléchargement et vérification avant toute écriture
+    changesets = []
+    for entry in pending:
+        changeset = json.loads(gzip.decompress(_verified(source, entry)))
+        if changeset["from"] != local_version:
+            raise ValueError(f"Chaîne de change-sets incomplète à la version {local_version}")
+        local_version = changeset["to"]
+        changesets.append(changeset)
+        summary["bytes"] += entry["bytes"]
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for changeset in changesets:
+            apply_changeset(conn, changeset)
+        set_state(conn, version=local_version)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    summary["changesets"] = len(changesets)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distribution différentielle du catalogue")
+    parser.add_argument("--db", default=DEFAULT_SYNC_DB,
+                        help="Base du catalogue (défaut: database/scripts_catalogue.db, lue par les outils bash)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("init", help="Installer le journal des changements sur la base de référence")
+
+    p = sub.add_parser("publish", help="Publier les change-sets depuis la dernière publication")
+    p.add_argument("out_dir", help="Répertoire de publication (servi en HTTP ou partagé)")
+    p.add_argument("--snapshot", action="store_true", help="Forcer un nouvel instantané")
+    p.add_argument("--max-changesets", type=int, default=MAX_CHANGESETS)
+
+    p = sub.add_parser("pull", help="Appliquer les change-sets manquants sur la base locale")
+    p.add_argument("source", help="Répertoire ou URL de publication")
+
+    p = sub.add_parser("status", help="Version locale et version publiée")
+    p.add_argument("source", nargs="?")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "init":
+            conn = sqlite3.connect(args.db)
+            install_changelog(conn)
+            result = {"db_id": get_state(conn, "db_id"), "tables": replicated_tables(conn),
+                      "version": current_version(conn)}
+            conn.close()
+        elif args.command == "publish":
+            result = publish(args.db, args.out_dir, args.snapshot, args.max_changesets)
+        elif args.command == "pull":
+            result = pull(args.db, args.source)
+        else:
+            result = {"db": args.db}
+            if os.path.exists(args.db):
+                conn = sqlite3.connect(args.db)
+                result.update(db_id=get_state(conn, "db_id"), version=get_state(conn, "version"),
+                              schema_hash=get_state(conn, "schema_hash"))
+                conn.close()
+            if args.source:
+                manifest = json.loads(_fetch(args.source, MANIFEST))
+                result["published"] = manifest["latest"]
+                result["up_to_date"] = (result.get("db_id") == manifest["db_id"]
+                                        and str(result.get("version")) == str(manifest["latest"]))
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif args.command == "publish":
+        if result["snapshot"]:
+            print(f"📦 Instantané publié à la version {result['version']}")
+        elif result["changeset"]:
+            c = result["changeset"]
+            print(f"✅ Change-set {c['from']} -> {c['to']} publié ({c['bytes']} octets)")
+        else:
+            print(f"✅ Rien à publier (version {result['version']})")
+    elif args.command == "pull":
+        how = "instantané + " if result["snapshot"] else ""
+        print(f"✅ Catalogue local: {result['from']} -> {result['to']} "
+              f"({how}{result['changesets']} change-set(s), {result['bytes']} octets)")
+    else:
+        print(json.dumps(result, indent=2))
+    if args.command == "status" and args.source and not result.get("up_to_date"):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -359,7 +359,11 @@ INSERT OR IGNORE INTO functions (name, library_file, category, description, para
 ('create_basic_ct', 'lib/ct-common.sh', 'ct_management', 'Crée un container CT basique', '$1=ctid, $2=template, $3=storage', '0=succès, 1=échec'),
 ('start_and_wait_ct', 'lib/ct-common.sh', 'ct_management', 'Démarre et attend le CT', '$1=ctid', '0=succès, 1=échec'),
 ('bootstrap_base_inside', 'lib/ct-common.sh', 'ct_management', 'Bootstrap de base dans CT', '$1=ctid', '0=succès, 1=échec'),
-('install_docker_inside', 'lib/ct-common.sh', 'ct_management', 'Installe Docker dans CT', '$1=ctid', '0=succès, 1=échec');
+('install_docker_inside', 'lib/ct-common.sh', 'ct_management', 'Installe Docker dans CT', '$1=ctid', '0=succès, 1=échec'),
+('release_ctid', 'lib/ct-common.sh', 'ct_management', 'Libère la réservation d''un CTID', '$1=ctid', 'void'),
+('ct_pool_fill', 'lib/ct-common.sh', 'ct_management', 'Complète le pool de CT pré-provisionnés', '$1=size, $2=profile, $3=template', '0=succès, 1=échec'),
+('ct_pool_claim', 'lib/ct-common.sh', 'ct_management', 'Réclame un CT prêt du pool', '$1=profile, $2=hostname', 'CTID_number, 4=pool vide'),
+('provision_ct', 'lib/ct-common.sh', 'ct_management', 'CT démarré depuis le pool ou provisionné', '$1=hostname, $2=profile, $3=template', 'CTID_number');
 
 EOF
     
@@ -10,6 +10,9 @@ import json
 from datetime import datetime
 from pathlib import Path
 
+# Données mesurées sur l'hôte (usage, spans, tests, baselines): reprises de l'ancienne base
+HOST_LOCAL_TABLES = ("script_usage_stats", "trace_spans", "script_test_results", "host_perf_samples")
+
 class ScriptsCatalogGenerator:
     def __init__(self, db_path="scripts-catalog.db"):
         self.db_path = db_path
@@ -60,6 +63,7 @@ class ScriptsCatalogGenerator:
             documentation_path TEXT,
             complexity_score INTEGER DEFAULT 5,
             implementation_date DATE,
+            cache_ttl INTEGER,
             
             CHECK (type IN ('atomic', 'orchestrator-1', 'orchestrator-2', 'orchestrator-3', 'orchestrator-4', 'orchestrator-5')),
             CHECK (status IN ('active', 'deprecated', 'experimental', 'disabled', 'implemented', 'planned'))
@@ -147,6 +151,47 @@ class ScriptsCatalogGenerator:
             FOREIGN KEY (script_id) REFERENCES scripts(id) ON DELETE CASCADE
         );
 
+        -- Spans des workflows tracés (alimentée par trace_collector.py)
+        CREATE TABLE IF NOT EXISTS trace_spans (
+            span_id TEXT PRIMARY KEY,
+            trace_id TEXT NOT NULL,
+            parent_id TEXT,
+            name TEXT NOT NULL,
+            service TEXT,
+            host TEXT,
+            start_us INTEGER NOT NULL,
+            end_us INTEGER NOT NULL,
+            duration_ms REAL NOT NULL,
+            status TEXT,
+            exit_code INTEGER
+        );
+
+        -- Résultats des tests (alimentée par script_test_runner.py)
+        CREATE TABLE IF NOT EXISTS script_test_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            script_id INTEGER,
+            script_name TEXT NOT NULL,
+            script_path TEXT,
+            tested_at DATETIME NOT NULL,
+            status TEXT NOT NULL,
+            duration_ms INTEGER,
+            content_hash TEXT,
+            checks TEXT,
+            output TEXT,
+            FOREIGN KEY (script_id) REFERENCES scripts(id) ON DELETE CASCADE
+        );
+
+        -- Mesures de performance par hôte (alimentée par perf_baseline.py)
+        CREATE TABLE IF NOT EXISTS host_perf_samples (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            host TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            target TEXT NOT NULL DEFAULT '',
+            value REAL NOT NULL,
+            source_script TEXT,
+            sampled_at DATETIME NOT NULL
+        );
+
         -- Index pour optimiser les requêtes
         CREATE INDEX IF NOT EXISTS idx_scripts_type ON scripts(type);
         CREATE INDEX IF NOT EXISTS idx_scripts_category ON scripts(category);
@@ -154,6 +199,10 @@ class ScriptsCatalogGenerator:
         CREATE INDEX IF NOT EXISTS idx_script_tags_name ON script_tags(tag_name);
         CREATE INDEX IF NOT EXISTS idx_compatibility_os ON script_compatibility(os_family);
         CREATE INDEX IF NOT EXISTS idx_usage_date ON script_usage_stats(execution_date);
+        CREATE INDEX IF NOT EXISTS idx_trace_spans_trace ON trace_spans(trace_id);
+        CREATE INDEX IF NOT EXISTS idx_trace_spans_name ON trace_spans(name, start_us);
+        CREATE INDEX IF NOT EXISTS idx_test_results_script ON script_test_results(script_name, tested_at);
+        CREATE INDEX IF NOT EXISTS idx_perf_samples_series ON host_perf_samples(host, metric, target, sampled_at);
         '''
         
         conn.executescript(schema_sql)
@@ -172,6 +221,10 @@ class ScriptsCatalogGenerator:
             version = self._extract_field(content, "Version") or "1.0"
             author = self._extract_field(content, "Author") or "AtomicOps-Suite"
             
+            # Durée de validité du cache pour les scripts en lecture seule (NULL = non cacheable)
+            cache_ttl = self._extract_field(content, "Cache-TTL")
+            cache_ttl = int(cache_ttl) if cache_ttl and cache_ttl.isdigit() else None
+            
             # Détecter la catégorie basée sur le nom
             category = self._determine_category(script_name)
             
@@ -186,7 +239,8 @@ class ScriptsCatalogGenerator:
                 'version': version,
                 'author': author,
                 'path': str(script_path),
-                'complexity_score': complexity_score
+                'complexity_score': complexity_score,
+                'cache_ttl': cache_ttl
             }
         except Exception as e:
             print(f"⚠️  Error analyzing {script_path}: {e}")
@@ -256,8 +310,8 @@ class ScriptsCatalogGenerator:
                     conn.execute('''
                         INSERT OR REPLACE INTO scripts (
                             name, type, category, description, version, author, path,
-                            status, complexity_score, implementation_date, updated_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            status, complexity_score, implementation_date, cache_ttl, updated_at
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (
                         script_data['name'],
                         script_data['type'],
@@ -269,6 +323,7 @@ class ScriptsCatalogGenerator:
                         status,
                         script_data['complexity_score'],
                         implementation_date,
+                        script_data['cache_ttl'],
                         datetime.now().isoformat()
                     ))
                     
@@ -504,11 +559,41 @@ class ScriptsCatalogGenerator:
         print(f"  Implementation %:   {(implemented_count/total_scripts*100):.1f}%")
         print(f"  Database Size:      {os.path.getsize(self.db_path)/1024:.1f} KB")
     
+    def restore_host_data(self, conn, backup_path):
+        """Recopie les tables locales de l'ancienne base; script_id est remappé par nom de script"""
+        conn.commit()  # ATTACH impossible dans une transaction
+        conn.execute("ATTACH DATABASE ? AS previous", (backup_path,))
+        try:
+            previous = {name for (name,) in conn.execute(
+                "SELECT name FROM previous.sqlite_master WHERE type = 'table'")}
+            for table in HOST_LOCAL_TABLES:
+                if table not in previous:
+                    continue
+                new_cols = {r[1] for r in conn.execute(f"PRAGMA main.table_info('{table}')")}
+                cols = [r[1] for r in conn.execute(f"PRAGMA previous.table_info('{table}')") if r[1] in new_cols]
+                select = ", ".join("ids.new_id" if c == "script_id" else f't."{c}"' for c in cols)
+                sql = (f'INSERT INTO main."{table}" ({", ".join(f"{chr(34)}{c}{chr(34)}" for c in cols)}) '
+                       f'SELECT {select} FROM previous."{table}" t')
+                if "script_id" in cols:
+                    # Scripts disparus du catalogue: leurs lignes sont abandonnées (clé étrangère)
+                    sql += """ LEFT JOIN (SELECT o.id AS old_id, n.id AS new_id FROM previous.scripts o
+                                          JOIN main.scripts n ON n.name = o.name) ids ON ids.old_id = t.script_id
+                               WHERE t.script_id IS NULL OR ids.new_id IS NOT NULL"""
+                copied = conn.execute(sql).rowcount
+                print(f"📊 {table}: {copied} row(s) kept from previous database")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("DETACH DATABASE previous")
+
     def generate_database(self):
         """Génère la base de données complète"""
         print("🚀 Starting AtomicOps-Suite Scripts Database Generation")
         
         # Backup existing database
+        backup_path = None
         if os.path.exists(self.db_path):
             backup_path = f"{self.db_path}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             os.rename(self.db_path, backup_path)
@@ -521,6 +606,8 @@ class ScriptsCatalogGenerator:
             
             self.create_database_schema(conn)
             self.populate_scripts_data(conn)
+            if backup_path:
+                self.restore_host_data(conn, backup_path)
             self.add_compatibility_data(conn)
             self.add_script_tags(conn)
             self.create_views_and_statistics(conn)
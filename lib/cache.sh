@@ -0,0 +1,101 @@
+#!/bin/bash
+#
+# Bibliothèque: cache.sh
+# Description: Cache de résultats des scripts atomiques en lecture seule (voir result_cache.py)
+# Usage: source "$PROJECT_ROOT/lib/cache.sh"
+#
+# Un script est cacheable s'il déclare "# Cache-TTL: <secondes>" dans son en-tête.
+# Variables: CACHE_DISABLED=1 désactive le cache, ATOMICOPS_CACHE_DIR change son emplacement.
+#
+
+# Vérification que la bibliothèque n'est chargée qu'une fois
+[[ "${CACHE_LIB_LOADED:-}" == "1" ]] && return 0
+readonly CACHE_LIB_LOADED=1
+
+CACHE_PROJECT_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+CACHE_PY="${CACHE_PY:-$CACHE_PROJECT_ROOT/result_cache.py}"
+CACHE_DISABLED="${CACHE_DISABLED:-0}"
+
+# Vérifie que le cache est utilisable
+cache_enabled() {
+    [[ "$CACHE_DISABLED" != "1" ]] && [[ -f "$CACHE_PY" ]] && command -v python3 >/dev/null 2>&1
+}
+
+# Retourne le TTL déclaré par un script (code 1 si non cacheable)
+cache_ttl_for() {
+    local script_path="$1"
+    local line
+
+    [[ -f "$script_path" ]] || return 1
+
+    # Lecture de l'en-tête uniquement, sans fork
+    while IFS= read -r line; do
+        if [[ "$line" =~ ^#[[:space:]]*Cache-TTL:[[:space:]]*([0-9]+)[[:space:]]*$ ]]; then
+            [[ "${BASH_REMATCH[1]}" -gt 0 ]] || return 1
+            echo "${BASH_REMATCH[1]}"
+            return 0
+        fi
+        [[ -n "$line" && "$line" != \#* ]] && break
+    done < "$script_path"
+
+    return 1
+}
+
+# Lit une entrée du cache: cache_lookup <host> <script> [args...]
+cache_lookup() {
+    local host="$1"
+    local script="$2"
+    shift 2
+
+    cache_enabled || return 1
+    python3 "$CACHE_PY" get --host "$host" "$script" -- "$@"
+}
+
+# Enregistre stdin dans le cache: cache_store <host> <script> <ttl> [args...]
+cache_store() {
+    local host="$1"
+    local script="$2"
+    local ttl="$3"
+    shift 3
+
+    cache_enabled || { cat >/dev/null; return 1; }
+    python3 "$CACHE_PY" put --host "$host" --ttl "$ttl" "$script" -- "$@"
+}
+
+# Exécute un script atomique local en servant les appels répétés depuis le cache
+cache_run_atomic() {
+    local script_path="$1"
+    shift
+
+    if ! cache_enabled || ! cache_ttl_for "$script_path" >/dev/null; then
+        "$script_path" "$@"
+        return $?
+    fi
+
+    python3 "$CACHE_PY" run --host "${CACHE_HOST:-localhost}" "$script_path" -- "$@"
+}
+
+# Affiche les compteurs hit/miss du cache (JSON)
+cache_stats() {
+    cache_enabled || return 1
+    python3 "$CACHE_PY" stats
+}
+
+# Invalide les entrées d'un hôte et/ou d'un script
+cache_invalidate() {
+    local host="${1:-}"
+    local script="${2:-}"
+    local args=()
+
+    cache_enabled || return 1
+    [[ -n "$host" ]] && args+=("--host" "$host")
+    [[ -n "$script" ]] && args+=("--script" "$script")
+    python3 "$CACHE_PY" invalidate "${args[@]}"
+}
+
+export CACHE_PY CACHE_DISABLED
+export -f cache_enabled
+export -f cache_ttl_for
+export -f cache_lookup
+export -f cache_store
+export -f cache_run_atomic
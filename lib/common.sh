@@ -80,19 +80,10 @@ print_colored() {
 # Fonction utilitaire : Validation d'adresse IP
 is_valid_ip() {
     local ip=$1
-    local regex='^([0-9]{1,3}\.){3}[0-9]{1,3}$'
+    # Même règle que le type "ip" de input_parameter_types (plages d'octets dans la regex)
+    local regex='^((25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
     
-    if [[ $ip =~ $regex ]]; then
-        local IFS='.'
-        local -a octets=($ip)
-        for octet in "${octets[@]}"; do
-            if [[ $octet -gt 255 ]]; then
-                return 1
-            fi
-        done
-        return 0
-    fi
-    return 1
+    [[ $ip =~ $regex ]]
 }
 
 # Fonction utilitaire : Validation de nom d'hôte
@@ -33,6 +33,88 @@ readonly DEFAULT_MEMORY_MB="512"
 readonly DEFAULT_SWAP_MB="512"
 readonly DEFAULT_CORES="1"
 
+# Allocation des CTID et pool de containers pré-provisionnés
+CT_ALLOC_DIR="${CT_ALLOC_DIR:-${ATOMICOPS_CACHE_DIR:-$HOME/.cache/atomicops}/ct}"
+CT_VMLIST_FILE="${CT_VMLIST_FILE:-/etc/pve/.vmlist}"
+CT_RESERVATION_TTL="${CT_RESERVATION_TTL:-900}"
+CT_ALLOC_LOCK_TIMEOUT="${CT_ALLOC_LOCK_TIMEOUT:-30}"
+
+# Fonction : Prendre le verrou d'allocation (fd dans CT_ALLOC_LOCK_FD)
+ct_alloc_lock() {
+    if ! mkdir -p "$CT_ALLOC_DIR/reserved" "$CT_ALLOC_DIR/pool" 2>/dev/null; then
+        ct_error "Cannot create allocation directory: $CT_ALLOC_DIR"
+        return $EXIT_ERROR_PERMISSION
+    fi
+    
+    exec {CT_ALLOC_LOCK_FD}>"$CT_ALLOC_DIR/alloc.lock"
+    if ! flock -w "$CT_ALLOC_LOCK_TIMEOUT" "$CT_ALLOC_LOCK_FD"; then
+        exec {CT_ALLOC_LOCK_FD}>&-
+        ct_error "Timeout waiting for CTID allocation lock"
+        return $EXIT_ERROR_TIMEOUT
+    fi
+    return 0
+}
+
+# Fonction : Relâcher le verrou d'allocation
+ct_alloc_unlock() {
+    [[ -n "${CT_ALLOC_LOCK_FD:-}" ]] && exec {CT_ALLOC_LOCK_FD}>&-
+    CT_ALLOC_LOCK_FD=""
+    return 0
+}
+
+# Fonction : Charger en une fois les IDs utilisés dans un tableau associatif (nom en $1)
+# CT et VM partagent l'espace d'IDs: /etc/pve/.vmlist (cluster) sinon pct list + qm list
+ct_load_used_ids() {
+    local -n _used_ids="$1"
+    local line id
+    
+    if [[ -r "$CT_VMLIST_FILE" ]]; then
+        while IFS= read -r line; do
+            [[ $line =~ ^[[:space:]]*\"([0-9]+)\":[[:space:]]*\{ ]] && _used_ids[${BASH_REMATCH[1]}]=1
+        done < "$CT_VMLIST_FILE"
+        return 0
+    fi
+    
+    if ! command_exists pct; then
+        ct_error "Proxmox pct command not found"
+        return $EXIT_ERROR_DEPENDENCY
+    fi
+    
+    while read -r id _; do
+        [[ $id =~ ^[0-9]+$ ]] && _used_ids[$id]=1
+    done < <(pct list 2>/dev/null)
+    
+    if command_exists qm; then
+        while read -r id _; do
+            [[ $id =~ ^[0-9]+$ ]] && _used_ids[$id]=1
+        done < <(qm list 2>/dev/null)
+    fi
+    return 0
+}
+
+# Fonction : Ajouter les réservations en cours (non expirées) aux IDs utilisés
+ct_load_reservations() {
+    local -n _reserved_ids="$1"
+    local file ctid pid stamp
+    
+    for file in "$CT_ALLOC_DIR"/reserved/*; do
+        [[ -f "$file" ]] || continue
+        ctid="${file##*/}"
+        read -r pid stamp < "$file" || true
+        if [[ -n "$stamp" ]] && (( EPOCHSECONDS - stamp < CT_RESERVATION_TTL )) && kill -0 "$pid" 2>/dev/null; then
+            _reserved_ids[$ctid]=1
+        else
+            rm -f "$file"
+        fi
+    done
+}
+
+# Fonction : Libérer la réservation d'un CTID (après création ou en cas d'échec)
+release_ctid() {
+    local ctid="$1"
+    rm -f "$CT_ALLOC_DIR/reserved/$ctid"
+}
+
 # Fonction : Trouver un CTID libre
 pick_free_ctid() {
     local start_ctid="${1:-100}"
@@ -40,21 +122,31 @@ pick_free_ctid() {
     
     ct_info "Looking for free container ID starting from $start_ctid"
     
-    # Vérifier que pct est disponible
-    if ! command_exists pct; then
-        ct_error "Proxmox pct command not found"
-        return $EXIT_ERROR_DEPENDENCY
+    # Lecture unique des IDs utilisés et réservation sous verrou: deux appels
+    # concurrents ne peuvent pas obtenir le même ID
+    ct_alloc_lock || return $?
+    
+    local -A used_ids=()
+    local rc=0
+    ct_load_used_ids used_ids || rc=$?
+    if [[ $rc -ne 0 ]]; then
+        ct_alloc_unlock
+        return $rc
     fi
+    ct_load_reservations used_ids
     
     local ctid
-    for ctid in $(seq "$start_ctid" "$max_ctid"); do
-        if ! pct list | grep -q "^$ctid "; then
+    for (( ctid = start_ctid; ctid <= max_ctid; ctid++ )); do
+        if [[ -z "${used_ids[$ctid]:-}" ]]; then
+            printf '%s %s\n' "$$" "$EPOCHSECONDS" > "$CT_ALLOC_DIR/reserved/$ctid"
+            ct_alloc_unlock
             ct_info "Found free container ID: $ctid"
             echo "$ctid"
             return 0
         fi
     done
     
+    ct_alloc_unlock
     ct_error "No free container ID found between $start_ctid and $max_ctid"
     return $EXIT_ERROR_NOT_FOUND
 }
@@ -139,9 +231,11 @@ create_basic_ct() {
     ct_info "Executing: ${pct_cmd[*]}"
     
     if "${pct_cmd[@]}"; then
+        release_ctid "$ctid"
         ct_info "Container $ctid created successfully"
         return 0
     else
+        release_ctid "$ctid"
         ct_error "Failed to create container $ctid"
         return $EXIT_ERROR_GENERAL
     fi
@@ -359,7 +453,147 @@ get_ct_ip() {
     return $EXIT_ERROR_TIMEOUT
 }
 
+# Fonction : Préparer un container de pool (création, bootstrap, arrêt)
+ct_pool_prepare() {
+    local profile="$1"
+    local template_ref="$2"
+    
+    local ctid
+    ctid=$(pick_free_ctid "${CT_POOL_START_CTID:-900}" "${CT_POOL_MAX_CTID:-999}") || return $?
+    
+    local rc=0
+    create_basic_ct "$ctid" "$template_ref" "pool-$profile-$ctid" || return $?
+    start_and_wait_ct "$ctid" || rc=$?
+    [[ $rc -eq 0 ]] && { bootstrap_base_inside "$ctid" || rc=$?; }
+    [[ $rc -eq 0 && "$profile" == "docker" ]] && { install_docker_inside "$ctid" || rc=$?; }
+    
+    if [[ $rc -ne 0 ]]; then
+        ct_error "Pool container $ctid failed to provision, destroying it"
+        pct stop "$ctid" >/dev/null 2>&1 || true
+        pct destroy "$ctid" >/dev/null 2>&1 || true
+        return $rc
+    fi
+    
+    pct exec "$ctid" -- apt-get clean >/dev/null 2>&1 || true
+    if ! pct stop "$ctid"; then
+        ct_error "Failed to stop pool container $ctid"
+        return $EXIT_ERROR_GENERAL
+    fi
+    
+    mkdir -p "$CT_ALLOC_DIR/pool/$profile"
+    echo "$EPOCHSECONDS" > "$CT_ALLOC_DIR/pool/$profile/$ctid"
+    ct_info "Pool container $ctid ready (profile: $profile)"
+    echo "$ctid"
+    return 0
+}
+
+# Fonction : Compléter le pool jusqu'à N containers arrêtés prêts (profils: base, docker)
+ct_pool_fill() {
+    local size="${1:-2}"
+    local profile="${2:-base}"
+    local template_ref="${3:-}"
+    
+    case "$profile" in
+        base|docker) ;;
+        *)
+            ct_error "Unknown pool profile: $profile (base|docker)"
+            return $EXIT_ERROR_VALIDATION
+            ;;
+    esac
+    
+    local ready
+    ready=$(ct_pool_count "$profile")
+    if [[ $ready -ge $size ]]; then
+        ct_info "Pool $profile already has $ready/$size containers"
+        return 0
+    fi
+    
+    if [[ -z "$template_ref" ]]; then
+        template_ref=$(find_debian12_template) || return $?
+    fi
+    
+    while [[ $ready -lt $size ]]; do
+        ct_pool_prepare "$profile" "$template_ref" >/dev/null || return $?
+        ready=$((ready + 1))
+    done
+    
+    ct_info "Pool $profile filled: $ready/$size containers"
+    return 0
+}
+
+# Fonction : Nombre de containers prêts dans un profil de pool
+ct_pool_count() {
+    local profile="${1:-base}"
+    local entries=("$CT_ALLOC_DIR/pool/$profile"/*)
+    [[ -e "${entries[0]}" ]] || { echo 0; return 0; }
+    echo "${#entries[@]}"
+}
+
+# Fonction : Réclamer un container prêt du pool (renommé, non démarré); code 4 si pool vide
+ct_pool_claim() {
+    local profile="${1:-base}"
+    local hostname="${2:-}"
+    
+    ct_alloc_lock || return $?
+    
+    local entry ctid=""
+    for entry in "$CT_ALLOC_DIR/pool/$profile"/*; do
+        [[ -f "$entry" ]] || continue
+        rm -f "$entry"
+        if pct status "${entry##*/}" >/dev/null 2>&1; then
+            ctid="${entry##*/}"
+            break
+        fi
+        ct_warn "Pool container ${entry##*/} no longer exists, skipping"
+    done
+    
+    ct_alloc_unlock
+    
+    if [[ -z "$ctid" ]]; then
+        ct_warn "No pre-provisioned container available in pool: $profile"
+        return $EXIT_ERROR_NOT_FOUND
+    fi
+    
+    if [[ -n "$hostname" ]]; then
+        validate_hostname "$hostname" || return $?
+        pct set "$ctid" --hostname "$hostname" || return $EXIT_ERROR_GENERAL
+    fi
+    
+    ct_info "Claimed pool container $ctid (profile: $profile)"
+    echo "$ctid"
+    return 0
+}
+
+# Fonction : Obtenir un container démarré, depuis le pool si possible, sinon provisionné
+provision_ct() {
+    local hostname="$1"
+    local profile="${2:-base}"
+    local template_ref="${3:-}"
+    
+    local ctid
+    if ! ctid=$(ct_pool_claim "$profile" "$hostname"); then
+        ct_info "Provisioning container $hostname from scratch"
+        [[ -z "$template_ref" ]] && { template_ref=$(find_debian12_template) || return $?; }
+        ctid=$(pick_free_ctid) || return $?
+        create_basic_ct "$ctid" "$template_ref" "$hostname" || return $?
+        start_and_wait_ct "$ctid" || return $?
+        bootstrap_base_inside "$ctid" || return $?
+        [[ "$profile" == "docker" ]] && { install_docker_inside "$ctid" || return $?; }
+        echo "$ctid"
+        return 0
+    fi
+    
+    start_and_wait_ct "$ctid" || return $?
+    echo "$ctid"
+    return 0
+}
+
 # Export des fonctions pour utilisation dans les sous-shells
+export -f ct_alloc_lock
+export -f ct_alloc_unlock
+export -f ct_load_used_ids
+export -f ct_load_reservations
+export -f release_ctid
 export -f pick_free_ctid
 export -f find_debian12_template
 export -f create_basic_ct
@@ -369,4 +603,9 @@ export -f install_docker_inside
 export -f create_user_inside
 export -f copy_to_ct
 export -f exec_script_inside
-export -f get_ct_ip
\ No newline at end of file
+export -f get_ct_ip
+export -f ct_pool_prepare
+export -f ct_pool_fill
+export -f ct_pool_count
+export -f ct_pool_claim
+export -f provision_ct
\ No newline at end of file
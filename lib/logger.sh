@@ -20,6 +20,17 @@ fi
 LOG_LEVEL="${LOG_LEVEL:-1}"  # 0=DEBUG, 1=INFO, 2=WARN, 3=ERROR
 LOG_DIR="${LOG_DIR:-$PROJECT_ROOT/logs}"
 LOG_FORMAT="${LOG_FORMAT:-standard}"  # standard, json, syslog
+LOG_BACKEND="${LOG_BACKEND:-file}"  # file, collector (voir log_collector.py)
+LOG_COLLECTOR_HOST="${LOG_COLLECTOR_HOST:-127.0.0.1}"
+LOG_COLLECTOR_PORT="${LOG_COLLECTOR_PORT:-${ATOMICOPS_LOG_COLLECTOR_PORT:-7782}}"
+
+# Descripteur persistant ouvert par init_logging (évite une ouverture par ligne)
+LOG_FD=""
+LOG_FD_KIND=""  # collector ou file
+LOG_STREAM=""
+LOG_PIPE_TRAP=""
+# Nom d'hôte mis en cache (variable interne de bash, sans fork)
+LOG_HOSTNAME="${HOSTNAME:-localhost}"
 
 # Niveaux de log
 readonly LOG_LEVEL_DEBUG=0
@@ -50,25 +61,84 @@ SCRIPT_PID="${SCRIPT_PID:-$$}"
 # Initialisation du système de logging
 init_logging() {
     local script_name="${1:-$SCRIPT_NAME}"
-    
+    local today category
+
     SCRIPT_NAME="$script_name"
-    
-    # Créer le répertoire de logs si nécessaire
-    local log_subdir="$LOG_DIR"
-    
+    printf -v today '%(%Y-%m-%d)T' -1
+
     # Organiser par type de script et par date
     if [[ "$SCRIPT_NAME" == *"atomic"* ]] || [[ -f "$PROJECT_ROOT/atomics/$SCRIPT_NAME" ]]; then
-        log_subdir="$LOG_DIR/atomics/$(date +%Y-%m-%d)"
+        category="atomics"
     elif [[ "$SCRIPT_NAME" == *"orchestrator"* ]] || [[ -d "$PROJECT_ROOT/orchestrators" ]]; then
-        log_subdir="$LOG_DIR/orchestrators/$(date +%Y-%m-%d)"
+        category="orchestrators"
     else
-        log_subdir="$LOG_DIR/general/$(date +%Y-%m-%d)"
+        category="general"
     fi
-    
-    mkdir -p "$log_subdir" 2>/dev/null || true
-    
+
     # Définir le fichier de log
-    LOG_FILE="$log_subdir/${SCRIPT_NAME%.*}.log"
+    LOG_FILE="$LOG_DIR/$category/$today/${SCRIPT_NAME%.*}.log"
+
+    open_log_output "$category/$today/${SCRIPT_NAME%.*}.log"
+}
+
+# Ouvre le descripteur persistant: flux TCP vers le collecteur, sinon fichier en ajout
+open_log_output() {
+    local stream="${1:-$LOG_STREAM}"
+
+    close_log_output
+    LOG_STREAM="$stream"
+
+    if [[ "$LOG_BACKEND" == "collector" ]]; then
+        if { exec {LOG_FD}>"/dev/tcp/$LOG_COLLECTOR_HOST/$LOG_COLLECTOR_PORT"; } 2>/dev/null; then
+            # Trap SIGPIPE de l'appelant, restauré après chaque écriture (capturé ici, hors du chemin chaud)
+            LOG_PIPE_TRAP=$(trap -p PIPE)
+            LOG_FD_KIND="collector"
+            _log_write "@stream $stream" && return 0
+        fi
+        LOG_FD=""
+    fi
+
+    mkdir -p "${LOG_FILE%/*}" 2>/dev/null || true
+    LOG_FD_KIND="file"
+    { exec {LOG_FD}>>"$LOG_FILE"; } 2>/dev/null || LOG_FD=""
+}
+
+# Écrit une ligne sur le descripteur persistant. Vers le collecteur, SIGPIPE est ignoré
+# le temps de l'écriture: un collecteur arrêté fait échouer printf au lieu de tuer l'appelant
+_log_write() {
+    [[ "$LOG_FD_KIND" != "collector" ]] && { printf '%s\n' "$1" >&"$LOG_FD"; return; }
+
+    local rc=0
+    trap '' PIPE
+    printf '%s\n' "$1" >&"$LOG_FD" 2>/dev/null || rc=$?
+    if [[ -n "$LOG_PIPE_TRAP" ]]; then
+        eval "$LOG_PIPE_TRAP"
+    else
+        trap - PIPE
+    fi
+    return "$rc"
+}
+
+# Ferme le descripteur persistant
+close_log_output() {
+    if [[ -n "$LOG_FD" ]]; then
+        exec {LOG_FD}>&- 2>/dev/null || true
+        LOG_FD=""
+        LOG_FD_KIND=""
+    fi
+}
+
+# Échappement JSON sans fork; le résultat est placé dans la variable nommée par $1
+log_json_escape() {
+    local -n _escaped=$1
+    local value="$2"
+
+    value=${value//\\/\\\\}
+    value=${value//\"/\\\"}
+    value=${value//$'\t'/\\t}
+    value=${value//$'\r'/\\r}
+    value=${value//$'\n'/\\n}
+    _escaped="$value"
 }
 
 # Fonction de logging générique
@@ -80,39 +150,53 @@ log_message() {
     # Vérifier si on doit logger ce niveau
     [[ $level -lt $LOG_LEVEL ]] && return 0
     
-    local timestamp=$(date '+%Y-%m-%d %H:%M:%S.%3N')
+    # Horodatage via EPOCHREALTIME et printf %(...)T (builtins, sans fork)
+    local now="$EPOCHREALTIME"
+    local timestamp
+    printf -v timestamp '%(%Y-%m-%d %H:%M:%S)T' "${now%[.,]*}"
+    timestamp+=".${now:${#now}-6:3}"
     local level_name="${LOG_LEVEL_NAMES[$level]}"
     local level_color="${LOG_LEVEL_COLORS[$level]}"
-    
+
+    # Corrélation avec la trace du workflow (voir lib/trace.sh)
+    local trace_id="${ATOMICOPS_TRACE_ID:-}"
+    local span_id="${ATOMICOPS_SPAN_ID:-}"
+
     # Format du message
     local log_entry=""
-    
+
     case "$LOG_FORMAT" in
         json)
-            log_entry=$(cat <<EOF
-{
-  "timestamp": "$timestamp",
-  "level": "$level_name",
-  "script": "$SCRIPT_NAME",
-  "pid": $SCRIPT_PID,
-  "function": "$function_name",
-  "message": "$(to_json_string "$message")"
-}
-EOF
-            )
+            # Une entrée JSON par ligne (NDJSON) pour l'ingestion en masse
+            local escaped
+            log_json_escape escaped "$message"
+            log_entry="{\"timestamp\":\"$timestamp\",\"level\":\"$level_name\",\"script\":\"$SCRIPT_NAME\",\"pid\":$SCRIPT_PID,\"function\":\"$function_name\","
+            [[ -n "$trace_id" ]] && log_entry+="\"trace_id\":\"$trace_id\",\"span_id\":\"$span_id\","
+            log_entry+="\"message\":\"$escaped\"}"
             ;;
         syslog)
-            log_entry="<$(( (16 + level) * 8 + 6 ))>1 $timestamp $(hostname) $SCRIPT_NAME $SCRIPT_PID $function_name - $message"
+            local structured_data="-"
+            [[ -n "$trace_id" ]] && structured_data="[trace trace_id=\"$trace_id\" span_id=\"$span_id\"]"
+            log_entry="<$(( (16 + level) * 8 + 6 ))>1 $timestamp $LOG_HOSTNAME $SCRIPT_NAME $SCRIPT_PID $function_name $structured_data $message"
             ;;
         *)
             # Format standard : [TIMESTAMP] [LEVEL] [SCRIPT:PID] [FUNCTION] Message
-            log_entry="[$timestamp] [$level_name] [$SCRIPT_NAME:$SCRIPT_PID] [$function_name] $message"
+            log_entry="[$timestamp] [$level_name] [$SCRIPT_NAME:$SCRIPT_PID] [$function_name] "
+            [[ -n "$trace_id" ]] && log_entry+="[trace:$trace_id/$span_id] "
+            log_entry+="$message"
             ;;
     esac
     
-    # Écrire dans le fichier de log si configuré
-    if [[ -n "${LOG_FILE:-}" ]] && [[ -w "$(dirname "$LOG_FILE")" ]]; then
-        echo "$log_entry" >> "$LOG_FILE" 2>/dev/null || true
+    # Écrire sur le descripteur persistant, sinon en ajout (sous-shells via export -f)
+    if [[ -n "${LOG_FD:-}" ]]; then
+        # Écriture refusée (collecteur arrêté ou redémarré): reconnexion, sinon repli sur $LOG_FILE
+        if ! _log_write "$log_entry" 2>/dev/null; then
+            open_log_output
+            [[ -n "$LOG_FD" ]] && { _log_write "$log_entry" 2>/dev/null || true; }
+        fi
+    elif [[ -n "${LOG_FILE:-}" ]]; then
+        # Le groupe capte aussi l'erreur d'ouverture (répertoire de logs absent)
+        { printf '%s\n' "$log_entry" >> "$LOG_FILE"; } 2>/dev/null || true
     fi
     
     # Afficher sur stderr avec couleur selon le niveau
@@ -199,13 +283,13 @@ log_command() {
     
     log_debug "Executing: $command_line"
     
-    local start_time=$(date +%s%3N)
+    local start_time=${EPOCHREALTIME/[.,]/}
     local exit_code=0
-    
+
     "$@" || exit_code=$?
-    
-    local end_time=$(date +%s%3N)
-    local duration=$(( end_time - start_time ))
+
+    local end_time=${EPOCHREALTIME/[.,]/}
+    local duration=$(( (end_time - start_time) / 1000 ))
     
     if [[ $exit_code -eq 0 ]]; then
         log_debug "Command completed successfully (${duration}ms): $command_line"
@@ -234,7 +318,7 @@ cleanup_old_logs() {
 
 # Initialisation automatique avec le nom du script appelant
 if [[ -n "${BASH_SOURCE[1]:-}" ]]; then
-    auto_script_name=$(basename "${BASH_SOURCE[1]}")
+    auto_script_name="${BASH_SOURCE[1]##*/}"
     init_logging "$auto_script_name"
 fi
 
@@ -252,4 +336,5 @@ export -f usb_error
 export -f iscsi_info
 export -f iscsi_warn
 export -f iscsi_error
-export -f log_command
\ No newline at end of file
+export -f log_command
+export -f log_json_escape
\ No newline at end of file
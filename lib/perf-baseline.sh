@@ -0,0 +1,61 @@
+#!/bin/bash
+#
+# Bibliothèque: perf-baseline.sh
+# Description: Enregistrement des mesures de performance et sélection d'hôtes (voir perf_baseline.py)
+# Usage: source "$PROJECT_ROOT/lib/perf-baseline.sh"
+#
+# perf_record exécute un atomique de atomics/performance/ en JSON, affiche sa sortie
+# et l'ingère dans la base du catalogue. perf_filter_hosts ne garde que les hôtes
+# conformes aux exigences et sans régression; sans Python ni base, la liste est inchangée.
+#
+
+# Vérification que la bibliothèque n'est chargée qu'une fois
+[[ "${PERF_BASELINE_LIB_LOADED:-}" == "1" ]] && return 0
+readonly PERF_BASELINE_LIB_LOADED=1
+
+PERF_BASELINE_PY="${PERF_BASELINE_PY:-$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/perf_baseline.py}"
+
+# Exécute un atomique de performance et ingère son résultat: perf_record <hôte> <script> [args...]
+perf_record() {
+    local host="$1" script="$2"
+    shift 2
+
+    local output rc=0
+    output=$("$script" --format json "$@") || rc=$?
+    printf '%s\n' "$output"
+    (( rc == 0 )) || return "$rc"
+
+    if command -v python3 >/dev/null 2>&1 && [[ -f "$PERF_BASELINE_PY" ]]; then
+        printf '%s\n' "$output" | python3 "$PERF_BASELINE_PY" ingest --host "$host" --script "${script##*/}" >/dev/null 2>&1 || true
+    fi
+    return 0
+}
+
+# Filtre des hôtes selon leurs capacités: perf_filter_hosts <tableau_sortie> <exigences...> -- <hôtes...>
+# Exemple: perf_filter_hosts targets 'disk.write_mbps>=200' -- "${HOSTS[@]}"
+perf_filter_hosts() {
+    local -n _perf_out=$1
+    shift
+
+    local -a requirements=()
+    while [[ $# -gt 0 && "$1" != "--" ]]; do
+        requirements+=(--require "$1")
+        shift
+    done
+    [[ "${1:-}" == "--" ]] && shift
+
+    _perf_out=("$@")
+    command -v python3 >/dev/null 2>&1 && [[ -f "$PERF_BASELINE_PY" ]] || return 0
+
+    local selected
+    if selected=$(python3 "$PERF_BASELINE_PY" capable "${requirements[@]}" "$@" 2>/dev/null); then
+        mapfile -t _perf_out <<< "$selected"
+    elif [[ $? -eq 4 ]]; then
+        _perf_out=()
+        return 4
+    fi
+    return 0
+}
+
+export -f perf_record
+export -f perf_filter_hosts
@@ -0,0 +1,320 @@
+#!/bin/bash
+#
+# Bibliothèque: retry.sh
+# Description: Retry à backoff exponentiel avec jitter et disjoncteur (circuit breaker) par hôte
+# Usage: source "$PROJECT_ROOT/lib/retry.sh"
+#
+# L'état des disjoncteurs est un fichier par hôte sous CIRCUIT_DIR, partagé par toutes les
+# exécutions concurrentes (mises à jour sous flock). Après CIRCUIT_FAILURE_THRESHOLD échecs
+# consécutifs de connexion (RETRY_CONNECTION_CODES ou sonde de l'hôte en échec),
+# le disjoncteur s'ouvre: les étapes visant l'hôte échouent immédiatement.
+# Une fois le délai d'ouverture écoulé, une seule exécution sonde l'hôte (half-open):
+# succès -> fermé, échec -> rouvert avec un délai doublé (plafonné à CIRCUIT_MAX_OPEN_SECONDS).
+#
+# Exemple:
+#   retry_run --host "$HOST" --port 22 -- "$ATOMICS/ssh-connect.sh" --json-only "$HOST"
+#
+
+# Vérification que la bibliothèque n'est chargée qu'une fois
+[[ "${RETRY_LIB_LOADED:-}" == "1" ]] && return 0
+readonly RETRY_LIB_LOADED=1
+
+RETRY_MAX_ATTEMPTS="${RETRY_MAX_ATTEMPTS:-${RETRY_ATTEMPTS:-3}}"
+RETRY_BASE_DELAY_MS="${RETRY_BASE_DELAY_MS:-500}"
+RETRY_MAX_DELAY_MS="${RETRY_MAX_DELAY_MS:-30000}"
+# Codes de sortie sans nouvelle tentative: usage, permission, validation
+RETRY_NON_RETRYABLE_CODES="${RETRY_NON_RETRYABLE_CODES:-2 3 8}"
+# Codes d'échec de connexion comptés par le disjoncteur sans sonde: ssh (255), timeout (124)
+RETRY_CONNECTION_CODES="${RETRY_CONNECTION_CODES:-255 124}"
+
+CIRCUIT_DIR="${CIRCUIT_DIR:-${ATOMICOPS_CACHE_DIR:-$HOME/.cache/atomicops}/circuits}"
+CIRCUIT_FAILURE_THRESHOLD="${CIRCUIT_FAILURE_THRESHOLD:-3}"
+CIRCUIT_OPEN_SECONDS="${CIRCUIT_OPEN_SECONDS:-30}"
+CIRCUIT_MAX_OPEN_SECONDS="${CIRCUIT_MAX_OPEN_SECONDS:-600}"
+CIRCUIT_PROBE_TIMEOUT="${CIRCUIT_PROBE_TIMEOUT:-5}"
+# Commande de sonde personnalisée, appelée avec <hôte> <port>
+CIRCUIT_PROBE_CMD="${CIRCUIT_PROBE_CMD:-}"
+# Code renvoyé quand le disjoncteur est ouvert (dépendance indisponible)
+CIRCUIT_OPEN_EXIT="${CIRCUIT_OPEN_EXIT:-6}"
+
+RETRY_ATOMICS_DIR="${RETRY_ATOMICS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/atomics}"
+
+_retry_log() {
+    local level="$1"
+    shift
+    declare -F "log_$level" >/dev/null && "log_$level" "$*"
+    return 0
+}
+
+# Délai avant la tentative suivante, en ms (full jitter): retry_backoff_delay <var> <tentative>
+retry_backoff_delay() {
+    local -n _delay=$1
+    local attempt=$2
+    local cap=$RETRY_BASE_DELAY_MS
+    local rand=${SRANDOM:-$(( RANDOM * 32768 + RANDOM ))}
+
+    while (( attempt > 1 && cap < RETRY_MAX_DELAY_MS )); do
+        cap=$(( cap * 2 ))
+        attempt=$(( attempt - 1 ))
+    done
+    (( cap > RETRY_MAX_DELAY_MS )) && cap=$RETRY_MAX_DELAY_MS
+    _delay=$(( rand % (cap + 1) ))
+}
+
+# Fichier d'état d'un hôte
+_circuit_file() {
+    local -n _file=$1
+    _file="$CIRCUIT_DIR/${2//[^A-Za-z0-9._-]/_}"
+}
+
+# Lit l'état: _circuit_read <fichier> -> CIRCUIT_STATE CIRCUIT_FAILURES CIRCUIT_SINCE CIRCUIT_COOLDOWN
+_circuit_read() {
+    CIRCUIT_STATE="closed" CIRCUIT_FAILURES=0 CIRCUIT_SINCE=0 CIRCUIT_COOLDOWN=$CIRCUIT_OPEN_SECONDS
+    [[ -f "$1" ]] || return 0
+    read -r CIRCUIT_STATE CIRCUIT_FAILURES CIRCUIT_SINCE CIRCUIT_COOLDOWN < "$1" || true
+    CIRCUIT_STATE="${CIRCUIT_STATE:-closed}"
+    CIRCUIT_FAILURES="${CIRCUIT_FAILURES:-0}"
+    CIRCUIT_SINCE="${CIRCUIT_SINCE:-0}"
+    CIRCUIT_COOLDOWN="${CIRCUIT_COOLDOWN:-$CIRCUIT_OPEN_SECONDS}"
+}
+
+_circuit_write() {
+    { printf '%s %s %s %s\n' "$2" "$3" "$4" "$5" > "$1.tmp.$$" && mv -f "$1.tmp.$$" "$1"; } 2>/dev/null || true
+}
+
+# Exécute "$@" sous le verrou du fichier d'état $1
+_circuit_locked() {
+    local file="$1"
+    shift
+
+    # Sans répertoire d'état ni flock, le disjoncteur ne doit pas bloquer les tentatives
+    if ! mkdir -p "$CIRCUIT_DIR" 2>/dev/null || ! command -v flock >/dev/null 2>&1; then
+        "$@"
+        return
+    fi
+    local fd rc=0
+    exec {fd}>"$file.lock"
+    flock -w 10 "$fd" || _retry_log warn "Verrou du disjoncteur indisponible: $file"
+    "$@" || rc=$?
+    exec {fd}>&-
+    return "$rc"
+}
+
+# Transition à l'entrée d'une tentative: 0 autorisé, 1 ouvert, 2 sonde à effectuer par l'appelant
+_circuit_enter() {
+    local file="$1"
+    local now=${EPOCHSECONDS:-$(date +%s)}
+
+    _circuit_read "$file"
+    case "$CIRCUIT_STATE" in
+        open)
+            (( now - CIRCUIT_SINCE < CIRCUIT_COOLDOWN )) && return 1
+            _circuit_write "$file" half_open "$CIRCUIT_FAILURES" "$now" "$CIRCUIT_COOLDOWN"
+            return 2
+            ;;
+        half_open)
+            # Sonde en cours ailleurs; reprise si elle semble abandonnée
+            (( now - CIRCUIT_SINCE < CIRCUIT_PROBE_TIMEOUT * 3 )) && return 1
+            _circuit_write "$file" half_open "$CIRCUIT_FAILURES" "$now" "$CIRCUIT_COOLDOWN"
+            return 2
+            ;;
+    esac
+    return 0
+}
+
+_circuit_success() {
+    _circuit_read "$1"
+    [[ "$CIRCUIT_STATE" == "closed" && "$CIRCUIT_FAILURES" == "0" ]] && return 0
+    _circuit_write "$1" closed 0 "${EPOCHSECONDS:-$(date +%s)}" "$CIRCUIT_OPEN_SECONDS"
+}
+
+_circuit_failure() {
+    local now=${EPOCHSECONDS:-$(date +%s)}
+
+    _circuit_read "$1"
+    local failures=$(( CIRCUIT_FAILURES + 1 ))
+    if [[ "$CIRCUIT_STATE" == "half_open" ]]; then
+        # Sonde échouée: réouverture avec un délai doublé
+        local cooldown=$(( CIRCUIT_COOLDOWN * 2 ))
+        (( cooldown > CIRCUIT_MAX_OPEN_SECONDS )) && cooldown=$CIRCUIT_MAX_OPEN_SECONDS
+        _circuit_write "$1" open "$failures" "$now" "$cooldown"
+    elif (( failures >= CIRCUIT_FAILURE_THRESHOLD )); then
+        _circuit_write "$1" open "$failures" "$now" "$CIRCUIT_OPEN_SECONDS"
+    else
+        _circuit_write "$1" closed "$failures" "$CIRCUIT_SINCE" "$CIRCUIT_COOLDOWN"
+    fi
+}
+
+# Sonde légère de l'hôte: circuit_probe <hôte> [port]
+circuit_probe() {
+    local host="$1" port="${2:-22}"
+    local rc=0
+
+    if [[ -n "$CIRCUIT_PROBE_CMD" ]]; then
+        $CIRCUIT_PROBE_CMD "$host" "$port" >/dev/null 2>&1
+        return
+    fi
+
+    local ssh_check="$RETRY_ATOMICS_DIR/network/check-ssh.connection.sh"
+    if [[ "$port" == "22" && -s "$ssh_check" ]]; then
+        bash "$ssh_check" --json-only --timeout "$CIRCUIT_PROBE_TIMEOUT" "$host" >/dev/null 2>&1
+        return
+    fi
+
+    local port_check="$RETRY_ATOMICS_DIR/test-network.port.sh"
+    if [[ -s "$port_check" ]]; then
+        bash "$port_check" --json-only --timeout "$CIRCUIT_PROBE_TIMEOUT" "$host" "$port" >/dev/null 2>&1 || rc=$?
+        # 4/5: ports (partiellement) fermés; autres codes: test impossible, repli sur /dev/tcp
+        case "$rc" in
+            0) return 0 ;;
+            4|5) return 1 ;;
+        esac
+    fi
+
+    timeout "$CIRCUIT_PROBE_TIMEOUT" bash -c 'exec 3<>"/dev/tcp/$1/$2"' _ "$host" "$port" 2>/dev/null
+}
+
+# Autorise (0) ou refuse (1) une tentative vers l'hôte, avec sonde half-open: circuit_allow <hôte> [port]
+circuit_allow() {
+    local host="$1" port="${2:-22}"
+    local file rc=0
+
+    _circuit_file file "$host"
+    _circuit_locked "$file" _circuit_enter "$file" || rc=$?
+    case "$rc" in
+        0) return 0 ;;
+        2)
+            _retry_log info "Disjoncteur $host: sonde half-open (port $port)"
+            if circuit_probe "$host" "$port"; then
+                _circuit_locked "$file" _circuit_success "$file"
+                _retry_log info "Disjoncteur $host: fermé"
+                return 0
+            fi
+            _circuit_locked "$file" _circuit_failure "$file"
+            _retry_log warn "Disjoncteur $host: sonde échouée, toujours ouvert"
+            return 1
+            ;;
+    esac
+    return 1
+}
+
+circuit_record_success() {
+    local file
+    _circuit_file file "$1"
+    # Lecture sans verrou: rien à écrire dans le cas nominal
+    _circuit_read "$file"
+    [[ "$CIRCUIT_STATE" == "closed" && "$CIRCUIT_FAILURES" == "0" ]] && return 0
+    _circuit_locked "$file" _circuit_success "$file"
+}
+
+circuit_record_failure() {
+    local file
+    _circuit_file file "$1"
+    _circuit_locked "$file" _circuit_failure "$file"
+}
+
+circuit_reset() {
+    local file
+    _circuit_file file "$1"
+    rm -f "$file"
+}
+
+# État des disjoncteurs: circuit_status [hôte...]
+circuit_status() {
+    local file host now=${EPOCHSECONDS:-$(date +%s)}
+    local -a hosts=("$@")
+
+    if [[ ${#hosts[@]} -eq 0 && -d "$CIRCUIT_DIR" ]]; then
+        for file in "$CIRCUIT_DIR"/*; do
+            [[ -f "$file" && "$file" != *.lock && "$file" != *.tmp.* ]] && hosts+=("${file##*/}")
+        done
+    fi
+    for host in "${hosts[@]}"; do
+        _circuit_file file "$host"
+        _circuit_read "$file"
+        local remaining=0
+        [[ "$CIRCUIT_STATE" == "open" ]] && remaining=$(( CIRCUIT_SINCE + CIRCUIT_COOLDOWN - now ))
+        (( remaining < 0 )) && remaining=0
+        printf '%-30s %-10s échecs=%-4s réouverture=%ss\n' "$host" "$CIRCUIT_STATE" "$CIRCUIT_FAILURES" "$remaining"
+    done
+}
+
+# Impute un échec au disjoncteur seulement s'il relève de la connexion: code de connexion,
+# ou sonde de l'hôte en échec. Un échec applicatif d'un hôte joignable ne l'ouvre pas.
+_retry_record_outcome() {
+    local host="$1" port="$2" rc="$3"
+
+    if [[ " $RETRY_CONNECTION_CODES " == *" $rc "* ]] || ! circuit_probe "$host" "$port"; then
+        circuit_record_failure "$host"
+    else
+        circuit_record_success "$host"
+    fi
+}
+
+# Exécute une commande avec retry et disjoncteur; seule la sortie de la dernière tentative est affichée
+# Usage: retry_run [--host H] [--port P] [--attempts N] -- commande [args...]
+retry_run() {
+    local host="" port="22" attempts="$RETRY_MAX_ATTEMPTS"
+
+    while [[ $# -gt 0 ]]; do
+        case "$1" in
+            --host) host="$2"; shift 2 ;;
+            --port) port="${2:-22}"; shift 2 ;;
+            --attempts) attempts="$2"; shift 2 ;;
+            --) shift; break ;;
+            *) break ;;
+        esac
+    done
+
+    local attempt=1 rc=0 output="" delay
+    while (( attempt <= attempts )); do
+        if [[ -n "$host" ]] && ! circuit_allow "$host" "$port"; then
+            _retry_log warn "Disjoncteur ouvert pour $host: échec immédiat"
+            [[ -n "$output" ]] && printf '%s\n' "$output"
+            return "$CIRCUIT_OPEN_EXIT"
+        fi
+
+        rc=0
+        output=$("$@") || rc=$?
+        if (( rc == 0 )); then
+            [[ -n "$host" ]] && circuit_record_success "$host"
+            [[ -n "$output" ]] && printf '%s\n' "$output"
+            return 0
+        fi
+
+        _retry_log debug "Échec tentative $attempt/$attempts (code: $rc)"
+        if [[ " $RETRY_NON_RETRYABLE_CODES " == *" $rc "* ]]; then
+            break
+        fi
+        [[ -n "$host" ]] && _retry_record_outcome "$host" "$port" "$rc"
+
+        if (( attempt < attempts )); then
+            retry_backoff_delay delay "$attempt"
+            _retry_log debug "Attente ${delay}ms avant nouvelle tentative"
+            printf -v delay '%d.%03d' $(( delay / 1000 )) $(( delay % 1000 ))
+            sleep "$delay"
+        fi
+        attempt=$(( attempt + 1 ))
+    done
+
+    [[ -n "$output" ]] && printf '%s\n' "$output"
+    return "$rc"
+}
+
+export -f _retry_log
+export -f _circuit_file
+export -f _circuit_read
+export -f _circuit_write
+export -f _circuit_locked
+export -f _circuit_enter
+export -f _circuit_success
+export -f _circuit_failure
+export -f retry_backoff_delay
+export -f circuit_probe
+export -f circuit_allow
+export -f circuit_record_success
+export -f circuit_record_failure
+export -f circuit_reset
+export -f circuit_status
+export -f _retry_record_outcome
+export -f retry_run
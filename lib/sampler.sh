@@ -0,0 +1,73 @@
+#!/bin/bash
+#
+# Bibliothèque: sampler.sh
+# Description: Accès sans fork au démon d'échantillonnage des ressources (voir resource_sampler.py)
+# Usage: source "$PROJECT_ROOT/lib/sampler.sh"
+#
+# Le démon se lance avec: python3 resource_sampler.py serve [--interval 1] [--capacity 3600]
+# Variables: SAMPLER_HOST (défaut 127.0.0.1), SAMPLER_PORT (défaut 7781), SAMPLER_DISABLED=1
+#
+
+# Vérification que la bibliothèque n'est chargée qu'une fois
+[[ "${SAMPLER_LIB_LOADED:-}" == "1" ]] && return 0
+readonly SAMPLER_LIB_LOADED=1
+
+SAMPLER_HOST="${SAMPLER_HOST:-127.0.0.1}"
+SAMPLER_PORT="${SAMPLER_PORT:-${ATOMICOPS_SAMPLER_PORT:-7781}}"
+SAMPLER_TIMEOUT="${SAMPLER_TIMEOUT:-2}"
+SAMPLER_DISABLED="${SAMPLER_DISABLED:-0}"
+
+# Dernière réponse brute et dernier échantillon chargé par sampler_load (clé -> valeur)
+SAMPLER_RESPONSE=""
+declare -gA SAMPLER_DATA=()
+
+# Envoie une requête au démon; la réponse est placée dans SAMPLER_RESPONSE (sans sous-shell)
+sampler_request() {
+    local request="$*"
+    local fd
+
+    SAMPLER_RESPONSE=""
+    [[ "$SAMPLER_DISABLED" == "1" ]] && return 1
+
+    { exec {fd}<>"/dev/tcp/$SAMPLER_HOST/$SAMPLER_PORT"; } 2>/dev/null || return 1
+
+    printf '%s\n' "$request" >&"$fd"
+    if ! IFS= read -r -t "$SAMPLER_TIMEOUT" -u "$fd" SAMPLER_RESPONSE; then
+        exec {fd}>&-
+        return 1
+    fi
+    exec {fd}>&-
+    return 0
+}
+
+# Envoie une requête au démon et affiche la réponse (code 1 si injoignable)
+sampler_query() {
+    sampler_request "$@" || return 1
+    printf '%s\n' "$SAMPLER_RESPONSE"
+}
+
+# Charge un échantillon dans SAMPLER_DATA: sampler_load [window_seconds]
+# Sans argument: dernier échantillon; avec argument: moyennes sur la fenêtre
+sampler_load() {
+    local window="${1:-}"
+    local pair
+
+    if [[ -n "$window" ]]; then
+        sampler_request "window $window kv" || return 1
+    else
+        sampler_request "snapshot kv" || return 1
+    fi
+
+    [[ "$SAMPLER_RESPONSE" == *=* ]] || return 1
+
+    SAMPLER_DATA=()
+    for pair in $SAMPLER_RESPONSE; do
+        SAMPLER_DATA["${pair%%=*}"]="${pair#*=}"
+    done
+    return 0
+}
+
+# Vérifie que le démon répond
+sampler_available() {
+    sampler_query "stats" >/dev/null
+}
@@ -0,0 +1,179 @@
+#!/bin/bash
+#
+# Bibliothèque: trace.sh
+# Description: Traçage des workflows (trace/span propagés aux scripts enfants, voir trace_collector.py)
+# Usage: source "$PROJECT_ROOT/lib/trace.sh"
+#
+# Propagation: ATOMICOPS_TRACE_ID (32 hex) et ATOMICOPS_SPAN_ID (span actif, parent des enfants)
+# Activation: ATOMICOPS_TRACE=1, ou automatiquement si un ATOMICOPS_TRACE_ID est hérité
+# Envoi: collecteur TCP (TRACE_COLLECTOR_HOST/PORT, défaut 127.0.0.1:7783), sinon fichier TRACE_SPOOL
+#
+
+# Vérification que la bibliothèque n'est chargée qu'une fois
+[[ "${TRACE_LIB_LOADED:-}" == "1" ]] && return 0
+readonly TRACE_LIB_LOADED=1
+
+TRACE_COLLECTOR_HOST="${TRACE_COLLECTOR_HOST:-127.0.0.1}"
+TRACE_COLLECTOR_PORT="${TRACE_COLLECTOR_PORT:-${ATOMICOPS_TRACE_PORT:-7783}}"
+TRACE_SPOOL="${TRACE_SPOOL:-${ATOMICOPS_TRACE_SPOOL:-${ATOMICOPS_CACHE_DIR:-$HOME/.cache/atomicops}/spans.ndjson}}"
+TRACE_SERVICE="${TRACE_SERVICE:-${0##*/}}"
+TRACE_HOSTNAME="${HOSTNAME:-localhost}"
+
+# Descripteur de sortie ouvert au premier span terminé
+TRACE_FD=""
+TRACE_FD_KIND=""  # collector ou spool
+TRACE_PIPE_TRAP=""
+# Identifiant du dernier span ouvert par trace_span_start
+TRACE_SPAN_ID=""
+
+# Pile des spans ouverts dans ce processus
+declare -ga TRACE_STACK_IDS=()
+declare -ga TRACE_STACK_NAMES=()
+declare -ga TRACE_STACK_STARTS=()
+declare -ga TRACE_STACK_PARENTS=()
+
+# Identifiant hexadécimal aléatoire de $2 caractères dans la variable nommée par $1 (sans fork)
+trace_random_hex() {
+    local -n _hex=$1
+    local length=$2
+    local chunk
+
+    _hex=""
+    while (( ${#_hex} < length )); do
+        if [[ -n "${SRANDOM:-}" ]]; then
+            printf -v chunk '%08x' "$SRANDOM"
+        else
+            printf -v chunk '%04x%04x' "$RANDOM" "$RANDOM"
+        fi
+        _hex+="$chunk"
+    done
+    _hex="${_hex:0:length}"
+}
+
+# Vérifie si le traçage est actif
+trace_enabled() {
+    [[ "${ATOMICOPS_TRACE:-0}" == "1" || -n "${ATOMICOPS_TRACE_ID:-}" ]]
+}
+
+# Démarre ou rejoint une trace: trace_init [service]
+trace_init() {
+    [[ -n "${1:-}" ]] && TRACE_SERVICE="$1"
+    trace_enabled || return 0
+
+    if [[ -z "${ATOMICOPS_TRACE_ID:-}" ]]; then
+        trace_random_hex ATOMICOPS_TRACE_ID 32
+    fi
+    export ATOMICOPS_TRACE_ID
+    export ATOMICOPS_SPAN_ID="${ATOMICOPS_SPAN_ID:-}"
+}
+
+# Ouvre un span: trace_span_start <nom>; il devient le parent des scripts lancés ensuite
+trace_span_start() {
+    local name="$1"
+    local span_id
+
+    TRACE_SPAN_ID=""
+    trace_enabled || return 0
+    [[ -n "${ATOMICOPS_TRACE_ID:-}" ]] || trace_init
+
+    trace_random_hex span_id 16
+    TRACE_STACK_IDS+=("$span_id")
+    TRACE_STACK_NAMES+=("$name")
+    TRACE_STACK_STARTS+=("${EPOCHREALTIME/[.,]/}")
+    TRACE_STACK_PARENTS+=("${ATOMICOPS_SPAN_ID:-}")
+
+    TRACE_SPAN_ID="$span_id"
+    export ATOMICOPS_SPAN_ID="$span_id"
+}
+
+# Ferme le span courant: trace_span_end [ok|error] [exit_code]
+trace_span_end() {
+    local status="${1:-ok}"
+    local exit_code="${2:-0}"
+    local top=$(( ${#TRACE_STACK_IDS[@]} - 1 ))
+
+    (( top >= 0 )) || return 0
+
+    local end_us="${EPOCHREALTIME/[.,]/}"
+    local span_id="${TRACE_STACK_IDS[top]}"
+    local name="${TRACE_STACK_NAMES[top]}"
+    local start_us="${TRACE_STACK_STARTS[top]}"
+    local parent_id="${TRACE_STACK_PARENTS[top]}"
+
+    unset 'TRACE_STACK_IDS[top]' 'TRACE_STACK_NAMES[top]' 'TRACE_STACK_STARTS[top]' 'TRACE_STACK_PARENTS[top]'
+    export ATOMICOPS_SPAN_ID="$parent_id"
+
+    name="${name//\\/\\\\}"
+    name="${name//\"/\\\"}"
+    trace_emit "{\"trace_id\":\"$ATOMICOPS_TRACE_ID\",\"span_id\":\"$span_id\",\"parent_id\":\"$parent_id\",\"name\":\"$name\",\"service\":\"$TRACE_SERVICE\",\"host\":\"$TRACE_HOSTNAME\",\"start_us\":$start_us,\"end_us\":$end_us,\"status\":\"$status\",\"exit_code\":$exit_code}"
+}
+
+# Ouvre le descripteur persistant: collecteur TCP, sinon fichier spool
+trace_open_output() {
+    if [[ -n "$TRACE_FD" ]]; then
+        exec {TRACE_FD}>&- 2>/dev/null || true
+        TRACE_FD=""
+    fi
+
+    if { exec {TRACE_FD}>"/dev/tcp/$TRACE_COLLECTOR_HOST/$TRACE_COLLECTOR_PORT"; } 2>/dev/null; then
+        # Trap SIGPIPE de l'appelant, restauré après chaque écriture (capturé hors du chemin chaud)
+        TRACE_PIPE_TRAP=$(trap -p PIPE)
+        TRACE_FD_KIND="collector"
+        return 0
+    fi
+
+    TRACE_FD_KIND="spool"
+    mkdir -p "${TRACE_SPOOL%/*}" 2>/dev/null || true
+    { exec {TRACE_FD}>>"$TRACE_SPOOL"; } 2>/dev/null || TRACE_FD=""
+}
+
+# Écrit une ligne; vers le collecteur, SIGPIPE est ignoré le temps de l'écriture
+# pour qu'un collecteur arrêté fasse échouer printf au lieu de tuer le workflow
+_trace_write() {
+    [[ "$TRACE_FD_KIND" != "collector" ]] && { printf '%s\n' "$1" >&"$TRACE_FD"; return; }
+
+    local rc=0
+    trap '' PIPE
+    printf '%s\n' "$1" >&"$TRACE_FD" 2>/dev/null || rc=$?
+    if [[ -n "$TRACE_PIPE_TRAP" ]]; then
+        eval "$TRACE_PIPE_TRAP"
+    else
+        trap - PIPE
+    fi
+    return "$rc"
+}
+
+# Écrit un span sur le descripteur persistant (collecteur, sinon fichier spool)
+trace_emit() {
+    [[ -n "$TRACE_FD" ]] || trace_open_output
+    [[ -n "$TRACE_FD" ]] || return 0
+
+    _trace_write "$1" 2>/dev/null && return 0
+    # Écriture refusée (collecteur arrêté ou redémarré): reconnexion, sinon spool
+    trace_open_output
+    [[ -n "$TRACE_FD" ]] && { _trace_write "$1" 2>/dev/null || true; }
+    return 0
+}
+
+# Exécute une commande dans un span: trace_run <nom> <commande> [args...]
+trace_run() {
+    local name="$1"
+    shift
+
+    if ! trace_enabled; then
+        "$@"
+        return
+    fi
+
+    local exit_code=0
+    local status="ok"
+    trace_span_start "$name"
+    "$@" || exit_code=$?
+    [[ $exit_code -eq 0 ]] || status="error"
+    trace_span_end "$status" "$exit_code"
+    return $exit_code
+}
+
+# Export des fonctions pour utilisation dans les sous-shells
+export -f trace_random_hex
+export -f trace_enabled
@@ -20,6 +20,11 @@ if [[ "${LOGGER_LIB_LOADED:-}" != "1" ]]; then
     source "$PROJECT_ROOT/lib/logger.sh"
 fi
 
+# Validateurs compilés depuis input_parameter_types (python3 param_validator.py compile-bash)
+if [[ -f "$PROJECT_ROOT/lib/validators.generated.sh" ]]; then
+    source "$PROJECT_ROOT/lib/validators.generated.sh"
+fi
+
 # Validation des permissions
 validate_permissions() {
     local required_user="${1:-root}"
@@ -249,7 +254,13 @@ validate_hostname() {
         return $EXIT_ERROR_VALIDATION
     fi
     
-    if ! is_valid_hostname "$hostname"; then
+    if declare -F validate_type_hostname >/dev/null; then
+        if ! validate_type_hostname "$hostname"; then
+            log_error "Invalid hostname format: $hostname"
+            log_info "${_VT_MESSAGES[hostname]}"
+            return $EXIT_ERROR_VALIDATION
+        fi
+    elif ! is_valid_hostname "$hostname"; then
         log_error "Invalid hostname format: $hostname"
         log_info "Hostname must follow RFC 1123 standards"
         return $EXIT_ERROR_VALIDATION
@@ -269,7 +280,12 @@ validate_ip_address() {
         return $EXIT_ERROR_VALIDATION
     fi
     
-    if ! is_valid_ip "$ip"; then
+    if declare -F validate_type_ip >/dev/null; then
+        if ! validate_type_ip "$ip"; then
+            log_error "Invalid IP address format: $ip"
+            return $EXIT_ERROR_VALIDATION
+        fi
+    elif ! is_valid_ip "$ip"; then
         log_error "Invalid IP address format: $ip"
         return $EXIT_ERROR_VALIDATION
     fi
@@ -347,22 +363,34 @@ validate_disk_size() {
         return $EXIT_ERROR_VALIDATION
     fi
     
-    # Convertir en GB pour comparaison
-    local size_gb
+    # Minimum en MB; les décimales (0.5) sont converties, pas tronquées
+    local min_mb
+    if [[ "$min_size_gb" =~ ^([0-9]+)(\.([0-9]{1,6}))?$ ]]; then
+        local min_frac="${BASH_REMATCH[3]:-0}"
+        min_mb=$(( 10#${BASH_REMATCH[1]} * 1024 + 10#$min_frac * 1024 / 10 ** ${#min_frac} ))
+    else
+        log_error "Invalid minimum disk size: $min_size_gb (use a number of GB, e.g. 1 or 0.5)"
+        return $EXIT_ERROR_VALIDATION
+    fi
+    
+    # Convertir en MB pour comparaison (arithmétique entière du shell, base 10 forcée: 08G)
+    size_value=$(( 10#$size_value ))
+    local size_mb size_gb
     case "${size_unit^^}" in
-        ""|"B") size_gb=$(echo "scale=2; $size_value / 1024 / 1024 / 1024" | bc) ;;
-        "K"|"KB") size_gb=$(echo "scale=2; $size_value / 1024 / 1024" | bc) ;;
-        "M"|"MB") size_gb=$(echo "scale=2; $size_value / 1024" | bc) ;;
-        "G"|"GB") size_gb="$size_value" ;;
-        "T"|"TB") size_gb=$(echo "scale=0; $size_value * 1024" | bc) ;;
+        ""|"B") size_mb=$(( size_value / 1024 / 1024 )) ;;
+        "K"|"KB") size_mb=$(( size_value / 1024 )) ;;
+        "M"|"MB") size_mb=$size_value ;;
+        "G"|"GB") size_mb=$(( size_value * 1024 )) ;;
+        "T"|"TB") size_mb=$(( size_value * 1024 * 1024 )) ;;
         *) 
             log_error "Unsupported size unit: $size_unit"
             return $EXIT_ERROR_VALIDATION
             ;;
     esac
+    printf -v size_gb '%d.%02d' $(( size_mb / 1024 )) $(( size_mb % 1024 * 100 / 1024 ))
     
     # Vérifier la taille minimale
-    if (( $(echo "$size_gb < $min_size_gb" | bc -l) )); then
+    if (( size_mb < min_mb )); then
         log_error "Disk size too small: ${size_gb}GB (minimum: ${min_size_gb}GB)"
         return $EXIT_ERROR_VALIDATION
     fi
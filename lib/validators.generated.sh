@@ -0,0 +1,270 @@
+#!/bin/bash
+#
+# Bibliothèque: validators.generated.sh
+# Description: Validateurs compilés depuis input_parameter_types et script_parameters
+#              (builtins [[ =~ ]] et (( )) uniquement, aucun sous-shell)
+# Usage: source "$PROJECT_ROOT/lib/validators.generated.sh"
+#
+# FICHIER GÉNÉRÉ par param_validator.py compile-bash - ne pas éditer à la main
+#
+
+[[ "${VALIDATORS_GENERATED_LIB_LOADED:-}" == "1" ]] && return 0
+readonly VALIDATORS_GENERATED_LIB_LOADED=1
+
+declare -gA _VT_MESSAGES=()
+declare -gA _VP_TYPES=() _VP_REQUIRED=() _VP_PATTERNS=() _VP_SCRIPT_PARAMS=()
+declare -ga VALIDATION_ERRORS=()
+VALIDATION_MESSAGE=""
+
+_VT_RE_ip='^((25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
+_VT_MESSAGES[ip]='Format IP invalide (ex: 192.168.1.1)'
+validate_type_ip() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 7 )) || return 1
+    (( ${#v} <= 15 )) || return 1
+    [[ $v =~ $_VT_RE_ip ]] || return 1
+    return 0
+}
+
+_VT_RE_hostname='^[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*$'
+_VT_MESSAGES[hostname]='Format hostname invalide (ex: server.domain.com)'
+validate_type_hostname() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 1 )) || return 1
+    (( ${#v} <= 253 )) || return 1
+    [[ $v =~ $_VT_RE_hostname ]] || return 1
+    return 0
+}
+
+_VT_RE_url='^(https?|ftp)://[^[:space:]/?#]+[^[:space:]]*$'
+_VT_MESSAGES[url]='URL invalide (ex: https://example.com/path)'
+validate_type_url() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 8 )) || return 1
+    (( ${#v} <= 2048 )) || return 1
+    [[ $v =~ $_VT_RE_url ]] || return 1
+    return 0
+}
+
+_VT_RE_email='^[^[:space:]@]+@[^[:space:]@]+\.[^[:space:]@]+$'
+_VT_MESSAGES[email]='Format email invalide (ex: user@domain.com)'
+validate_type_email() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 5 )) || return 1
+    (( ${#v} <= 320 )) || return 1
+    [[ $v =~ $_VT_RE_email ]] || return 1
+    return 0
+}
+
+_VT_RE_port='^([1-9][0-9]{0,3}|[1-5][0-9]{4}|6[0-4][0-9]{3}|65[0-4][0-9]{2}|655[0-2][0-9]|6553[0-5])$'
+_VT_MESSAGES[port]='Port invalide (1-65535)'
+validate_type_port() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 1 )) || return 1
+    (( ${#v} <= 5 )) || return 1
+    [[ $v =~ $_VT_RE_port ]] || return 1
+    return 0
+}
+
+_VT_RE_username='^[a-zA-Z0-9_][a-zA-Z0-9_.-]{0,31}[$]?$'
+_VT_MESSAGES[username]='Username invalide (lettres, chiffres, ., _ et -)'
+validate_type_username() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 1 )) || return 1
+    (( ${#v} <= 32 )) || return 1
+    [[ $v =~ $_VT_RE_username ]] || return 1
+    return 0
+}
+
+_VT_MESSAGES[password]='Mot de passe trop court (min 8 caractères)'
+validate_type_password() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 8 )) || return 1
+    (( ${#v} <= 128 )) || return 1
+    return 0
+}
+
+_VT_RE_token='^[a-zA-Z0-9_.=-]+$'
+_VT_MESSAGES[token]='Token invalide (min 16 chars, alphanumériques + -_.=)'
+validate_type_token() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 16 )) || return 1
+    (( ${#v} <= 4096 )) || return 1
+    [[ $v =~ $_VT_RE_token ]] || return 1
+    return 0
+}
+
+_VT_RE_device='^/dev/[a-zA-Z0-9]+[a-zA-Z0-9]*$'
+_VT_MESSAGES[device]='Chemin de périphérique invalide (ex: /dev/sdb1)'
+validate_type_device() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 5 )) || return 1
+    (( ${#v} <= 50 )) || return 1
+    [[ $v =~ $_VT_RE_device ]] || return 1
+    return 0
+}
+
+_VT_RE_path='^(/[^/]+)*/?$'
+_VT_MESSAGES[path]='Chemin de fichier invalide (ex: /home/user/file.txt)'
+validate_type_path() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 1 )) || return 1
+    (( ${#v} <= 4096 )) || return 1
+    [[ $v =~ $_VT_RE_path ]] || return 1
+    return 0
+}
+
+_VT_RE_iqn='^iqn\.[0-9]{4}-[0-9]{2}\.[a-zA-Z0-9.-]+(:.*)?$'
+_VT_MESSAGES[iqn]='Format IQN invalide (ex: iqn.2025-01.com.example:target1)'
+validate_type_iqn() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 10 )) || return 1
+    (( ${#v} <= 200 )) || return 1
+    [[ $v =~ $_VT_RE_iqn ]] || return 1
+    return 0
+}
+
+_VT_RE_size='^[1-9][0-9]*[KMGT]?[Bb]?$|^[1-9][0-9]*$'
+_VT_MESSAGES[size]='Taille invalide (ex: 4096, 1GB, 500MB)'
+validate_type_size() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 1 )) || return 1
+    (( ${#v} <= 20 )) || return 1
+    [[ $v =~ $_VT_RE_size ]] || return 1
+    return 0
+}
+
+_VT_RE_timeout='^[1-9][0-9]*$'
+_VT_MESSAGES[timeout]='Timeout invalide (1-86400 secondes)'
+validate_type_timeout() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} >= 1 )) || return 1
+    (( ${#v} <= 5 )) || return 1
+    [[ $v =~ $_VT_RE_timeout ]] || return 1
+    [[ $v =~ ^-?[0-9]{1,18}$ ]] || return 1
+    local n=$(( 10#${v#-} ))
+    [[ $v == -* ]] && n=$(( -n ))
+    (( n >= 1 )) || return 1
+    (( n <= 86400 )) || return 1
+    return 0
+}
+
+_VT_RE_integer='^-?[0-9]+$'
+_VT_MESSAGES[integer]='Entier invalide'
+validate_type_integer() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    [[ $v =~ $_VT_RE_integer ]] || return 1
+    return 0
+}
+
+_VT_RE_boolean='^(true|false|yes|no|0|1)$'
+_VT_MESSAGES[boolean]='Booléen invalide (true/false, yes/no, 0/1)'
+validate_type_boolean() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    [[ $v =~ $_VT_RE_boolean ]] || return 1
+    return 0
+}
+
+_VT_MESSAGES[string]='Chaîne invalide'
+validate_type_string() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    return 0
+}
+
+_VT_RE_ipv6='^(([0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}|(([0-9a-fA-F]{1,4}:){1,7}|:):(([0-9a-fA-F]{1,4}:){0,6}[0-9a-fA-F]{1,4})?)(%[0-9a-zA-Z_.-]+)?$'
+_VT_MESSAGES[ipv6]='Adresse IPv6 invalide (ex: 2001:db8::10, fe80::1%eth0)'
+validate_type_ipv6() {
+    local v="$1"
+    [[ $v == *$'\n'* ]] && return 1
+    (( ${#v} <= 64 )) || return 1
+    [[ $v =~ $_VT_RE_ipv6 ]] || return 1
+    return 0
+}
+
+# Valide une valeur selon un type; message dans VALIDATION_MESSAGE
+validate_type() {
+    local type="$1" value="$2"
+
+    if ! declare -F "validate_type_$type" >/dev/null; then
+        VALIDATION_MESSAGE="Type inconnu: $type"
+        return 2
+    fi
+    if "validate_type_$type" "$value"; then
+        VALIDATION_MESSAGE=""
+        return 0
+    fi
+    VALIDATION_MESSAGE="${_VT_MESSAGES[$type]}"
+    return 1
+}
+
+# Validation en une passe: validate_param_set [libellé:]type[|type...]=valeur ...
+# Toutes les erreurs sont collectées dans VALIDATION_ERRORS
+validate_param_set() {
+    local spec key label type value alternative valid
+
+    VALIDATION_ERRORS=()
+    for spec in "$@"; do
+        key="${spec%%=*}"
+        value="${spec#*=}"
+        type="${key##*:}"
+        label="${key%%:*}"
+        if [[ $type == *"|"* ]]; then
+            # Types alternatifs (ex: ip|ipv6|hostname): valide si l'un d'eux accepte la valeur
+            valid=false
+            for alternative in ${type//|/ }; do
+                validate_type "$alternative" "$value" && { valid=true; break; }
+            done
+            [[ $valid == true ]] || VALIDATION_ERRORS+=("$label: Aucun des types $type ($value)")
+            continue
+        fi
+        validate_type "$type" "$value" || VALIDATION_ERRORS+=("$label: $VALIDATION_MESSAGE ($value)")
+    done
+
+    [[ ${#VALIDATION_ERRORS[@]} -eq 0 ]] || return "${EXIT_ERROR_VALIDATION:-8}"
+}
+
+# Paramètres d'un script du catalogue: validate_script_params <script> nom=valeur ...
+validate_script_params() {
+    local script="$1"
+    shift
+    local -A given=()
+    local spec param key value
+
+    VALIDATION_ERRORS=()
+    for spec in "$@"; do
+        given["${spec%%=*}"]="${spec#*=}"
+    done
+
+    for param in ${_VP_SCRIPT_PARAMS[$script]:-}; do
+        key="$script:$param"
+        value="${given[$param]:-}"
+        if [[ -z "$value" ]]; then
+            [[ -n "${_VP_REQUIRED[$key]:-}" ]] && VALIDATION_ERRORS+=("$param: paramètre obligatoire manquant")
+            continue
+        fi
+        if ! validate_type "${_VP_TYPES[$key]}" "$value"; then
+            VALIDATION_ERRORS+=("$param: $VALIDATION_MESSAGE ($value)")
+        elif [[ -n "${_VP_PATTERNS[$key]:-}" && ! $value =~ ${_VP_PATTERNS[$key]} ]]; then
+            VALIDATION_ERRORS+=("$param: ne respecte pas ${_VP_PATTERNS[$key]} ($value)")
+        fi
+    done
+
+    [[ ${#VALIDATION_ERRORS[@]} -eq 0 ]] || return "${EXIT_ERROR_VALIDATION:-8}"
+}
+export -f validate_type_ip validate_type_hostname validate_type_url validate_type_email validate_type_port validate_type_username validate_type_password validate_type_token validate_type_device validate_type_path validate_type_iqn validate_type_size validate_type_timeout validate_type_integer validate_type_boolean validate_type_string validate_type_ipv6 validate_type validate_param_set validate_script_params
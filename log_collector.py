@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Collecteur de logs local pour AtomicOps-Suite (backend "collector" de lib/logger.sh)
+
+Les scripts ouvrent une seule connexion TCP par exécution, annoncent leur flux avec
+"@stream <chemin relatif>" puis écrivent une ligne par entrée. Le collecteur regroupe les
+lignes par flux, les écrit par lots, fait tourner les fichiers trop gros (fichier.1.gz,
+fichier.2.gz, ...) et compresse les rotations en tâche de fond.
+
+La sous-commande ingest charge en masse des logs NDJSON (LOG_FORMAT=json, .gz compris)
+dans une base SQLite.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import signal
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("ATOMICOPS_LOG_COLLECTOR_PORT", "7782"))
+DEFAULT_LOG_DIR = os.environ.get(
+    "LOG_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+)
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_BACKUPS = 7
+INGEST_BATCH = 5000
+
+
+class LogCollector:
+    def __init__(self, log_dir=DEFAULT_LOG_DIR, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS,
+                 flush_interval=1.0, batch_lines=1000):
+        self.log_dir = os.path.abspath(log_dir)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.batch_lines = batch_lines
+        self.lock = threading.Lock()
+        self.buffers = {}
+        # Un verrou d'écriture par flux: flushs concurrents et rotation sérialisés
+        self.path_locks = {}
+        self.compressions = []
+        self.stats = {"lines": 0, "batches": 0, "rotations": 0, "connections": 0}
+        self.stop_event = threading.Event()
+
+    def resolve_stream(self, stream):
+        """Chemin absolu d'un flux, confiné au répertoire de logs"""
+        path = os.path.abspath(os.path.join(self.log_dir, stream.strip().lstrip("/")))
+        if not path.startswith(self.log_dir + os.sep):
+            raise ValueError(f"Flux hors du répertoire de logs: {stream}")
+        return path
+
+    def append(self, path, lines):
+        with self.lock:
+            buffer = self.buffers.setdefault(path, [])
+            buffer.extend(lines)
+            self.stats["lines"] += len(lines)
+            full = len(buffer) >= self.batch_lines
+        if full:
+            self.flush(path)
+
+    def flush(self, only=None):
+        """Écrit les lignes en attente, un seul write par flux"""
+        with self.lock:
+            paths = [only] if only is not None else list(self.buffers)
+
+        for path in paths:
+            with self.lock:
+                path_lock = self.path_locks.setdefault(path, threading.Lock())
+            # Lignes retirées sous le verrou du flux: l'ordre des lots est conservé
+            with path_lock:
+                with self.lock:
+                    lines = self.buffers.pop(path, [])
+                if not lines:
+                    continue
+                data = "".join(lines).encode("utf-8", "replace")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._rotate_if_needed(path, len(data))
+                with open(path, "ab") as f:
+                    f.write(data)
+            with self.lock:
+                self.stats["batches"] += 1
+
+    def _rotate_if_needed(self, path, incoming):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if size + incoming <= self.max_bytes or os.path.exists(f"{path}.1"):
+            return
+
+        for n in range(self.backups - 1, 0, -1):
+            src = f"{path}.{n}.gz"
+            if os.path.exists(src):
+                os.replace(src, f"{path}.{n + 1}.gz")
+        overflow = f"{path}.{self.backups + 1}.gz"
+        if os.path.exists(overflow):
+            os.remove(overflow)
+
+        rotated = f"{path}.1"
+        os.replace(path, rotated)
+        thread = threading.Thread(target=self._compress, args=(rotated,), daemon=True)
+        thread.start()
+        with self.lock:
+            self.stats["rotations"] += 1
+            self.compressions = [t for t in self.compressions if t.is_alive()] + [thread]
+
+    @staticmethod
+    def _compress(path):
+        with open(path, "rb") as src, gzip.open(path + ".gz.tmp", "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(path + ".gz.tmp", path + ".gz")
+        os.remove(path)
+
+    def flusher(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        collector = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                with collector.lock:
+                    collector.stats["connections"] += 1
+                path = None
+                partial = b""
+                # Un lot par recv: aucune ligne complète n'attend dans le handler
+                # (un arrêt du collecteur n'écrit que ce qui est dans les tampons)
+                while True:
+                    chunk = self.request.recv(65536)
+                    if not chunk:
+                        break
+                    *lines, partial = (partial + chunk).split(b"\n")
+                    path = self.dispatch(path, lines)
+                if partial:
+                    self.dispatch(path, [partial])
+
+            @staticmethod
+            def dispatch(path, lines):
+                pending = []
+                for raw in lines:
+                    line = raw.decode("utf-8", "replace")
+                    if line.startswith("@stream "):
+                        if path and pending:
+                            collector.append(path, pending)
+                            pending = []
+                        try:
+                            path = collector.resolve_stream(line[len("@stream "):])
+                        except ValueError:
+                            path = None
+                        continue
+                    if path is not None:
+                        pending.append(line + "\n")
+                if path and pending:
+                    collector.append(path, pending)
+                return path
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        socketserver.ThreadingTCPServer.daemon_threads = True
+        server = socketserver.ThreadingTCPServer((host, port), Handler)
+        threading.Thread(target=self.flusher, daemon=True).start()
+        # Arrêt normal (systemd, kill): shutdown() depuis un autre thread que serve_forever
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+        print(f"📝 Collecteur de logs sur {host}:{port} -> {self.log_dir}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop_event.set()
+            server.server_close()
+            self.flush()
+            for thread in self.compressions:
+                thread.join()
+
+
+def iter_log_lines(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        yield from f
+
+
+def ingest(files, db_path):
+    """Charge des logs NDJSON en masse dans SQLite; retourne (insérées, ignorées)"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS log_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT,
+        level TEXT,
+        script TEXT,
+        pid INTEGER,
+        function TEXT,
+        message TEXT,
+        extra TEXT,
+        source_file TEXT
+    )''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_log_entries_ts ON log_entries(timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_log_entries_script ON log_entries(script, level)")
+
+    known = {"timestamp", "level", "script", "pid", "function", "message"}
+    inserted = skipped = 0
+    batch = []
+
+    def flush():
+        conn.executemany('''
+            INSERT INTO log_entries (timestamp, level, script, pid, function, message, extra, source_file)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        batch.clear()
+
+    with conn:
+        for path in files:
+            for line in iter_log_lines(path):
+                if not line.startswith("{"):
+                    skipped += 1
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    skipped += 1
+                    continue
+                extra = {k: v for k, v in entry.items() if k not in known}
+                batch.append((
+                    entry.get("timestamp"), entry.get("level"), entry.get("script"), entry.get("pid"),
+                    entry.get("function"), entry.get("message"),
+                    json.dumps(extra) if extra else None, path,
+                ))
+                inserted += 1
+                if len(batch) >= INGEST_BATCH:
+                    flush()
+        if batch:
+            flush()
+    conn.close()
+    return inserted, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collecteur de logs AtomicOps-Suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="Démarrer le collecteur")
+    p.add_argument("--host", default=DEFAULT_HOST)
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--log-dir", default=DEFAULT_LOG_DIR)
+    p.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES)
+    p.add_argument("--backups", type=int, default=DEFAULT_BACKUPS)
+    p.add_argument("--flush-interval", type=float, default=1.0)
+    p.add_argument("--batch-lines", type=int, default=1000)
+
+    p = sub.add_parser("ingest", help="Charger des logs NDJSON dans SQLite")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--db", default=os.path.join(DEFAULT_LOG_DIR, "logs.db"))
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        LogCollector(args.log_dir, args.max_bytes, args.backups, args.flush_interval, args.batch_lines).serve(
+            args.host, args.port
+        )
+        return 0
+
+    start = time.time()
+    inserted, skipped = ingest(args.files, args.db)
+    print(f"✅ {inserted} entrées importées, {skipped} lignes ignorées ({time.time() - start:.2f}s) -> {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,644 @@
+#!/usr/bin/env python3
+"""
+Moteur de recherche de logs indexé et parallèle pour AtomicOps-Suite (utilisé par search-log.pattern.sh)
+
+- Les fichiers texte sont projetés en mémoire (mmap) et découpés en blocs alignés sur les fins de
+  ligne, recherchés en parallèle sur tous les cœurs.
+- Les rotations compressées (.gz) sont décompressées en flux, par morceaux.
+- Un index incrémental optionnel (SQLite) conserve pour chaque bloc l'offset, le nombre de lignes,
+  la plage horodatée et un filtre de Bloom des trigrammes : les recherches bornées dans le temps et
+  les recherches littérales sautent les blocs qui ne peuvent pas correspondre.
+
+La sortie JSON conserve la forme de search-log.pattern.sh.
+"""
+
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+SCRIPT_NAME = "search-log.pattern.sh"
+
+BLOCK_SIZE = 1024 * 1024
+GZIP_CHUNK_SIZE = 4 * 1024 * 1024
+BLOOM_BITS = 128 * 1024
+BLOOM_HASHES = 2
+PARALLEL_THRESHOLD = 4 * BLOCK_SIZE
+FINGERPRINT_SIZE = 4096
+
+DEFAULT_INDEX_PATH = os.path.join(
+    os.environ.get("ATOMICOPS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "atomicops")),
+    "logindex.db",
+)
+DEFAULT_LOG_FILES = ["/var/log/syslog", "/var/log/messages", "/var/log/auth.log"]
+
+ISO_TS = re.compile(rb'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})')
+SYSLOG_TS = re.compile(rb'^([A-Z][a-z]{2}) +(\d{1,2}) (\d{2}):(\d{2}):(\d{2})')
+MONTHS = {m: i for i, m in enumerate(
+    [b"Jan", b"Feb", b"Mar", b"Apr", b"May", b"Jun", b"Jul", b"Aug", b"Sep", b"Oct", b"Nov", b"Dec"], 1)}
+
+
+# =============================================================================
+# Horodatages
+# =============================================================================
+
+def parse_line_timestamp(line, now=None):
+    """Retourne (epoch, texte) pour un horodatage ISO ou syslog en début de ligne, sinon (None, None)"""
+    match = ISO_TS.search(line, 0, 64)
+    if match:
+        try:
+            parts = [int(g) for g in match.groups()]
+            return time.mktime((*parts, 0, 0, -1)), match.group(0).decode()
+        except (ValueError, OverflowError):
+            return None, None
+
+    match = SYSLOG_TS.match(line)
+    if match and match.group(1) in MONTHS:
+        now = now or time.time()
+        year = time.localtime(now).tm_year
+        month = MONTHS[match.group(1)]
+        day, hour, minute, second = (int(g) for g in match.groups()[1:])
+        try:
+            epoch = time.mktime((year, month, day, hour, minute, second, 0, 0, -1))
+            if epoch > now + 86400:
+                epoch = time.mktime((year - 1, month, day, hour, minute, second, 0, 0, -1))
+        except (ValueError, OverflowError):
+            return None, None
+        return epoch, match.group(0).decode()
+
+    return None, None
+
+
+def parse_time_bound(value):
+    """Accepte un horodatage ISO ou une durée relative (30m, 2h, 7d) ; retourne un epoch"""
+    if value is None:
+        return None
+    relative = re.fullmatch(r'(\d+)([smhd])', value.strip())
+    if relative:
+        factor = {"s": 1, "m": 60, "h": 3600, "d": 86400}[relative.group(2)]
+        return time.time() - int(relative.group(1)) * factor
+    return datetime.fromisoformat(value).timestamp()
+
+
+def block_time_range(data):
+    """Plage horodatée d'un bloc à partir des premières et dernières lignes datées"""
+    lines = data.split(b"\n", 50)[:50]
+    tail = data[-8192:].split(b"\n")[-50:]
+    ts_min = ts_max = None
+    for line in lines:
+        ts_min, _ = parse_line_timestamp(line)
+        if ts_min is not None:
+            break
+    for line in reversed(tail):
+        ts_max, _ = parse_line_timestamp(line)
+        if ts_max is not None:
+            break
+    return ts_min, ts_max
+
+
+# =============================================================================
+# Filtre de Bloom des trigrammes
+# =============================================================================
+
+def _bloom_positions(trigram, bits):
+    value = int.from_bytes(trigram, "little")
+    yield value % bits
+    yield (value * 2654435761 + 40503) % bits
+
+
+def build_bloom(data, bits=BLOOM_BITS):
+    bloom = bytearray(bits // 8)
+    lowered = data.lower()
+    for trigram in {lowered[i:i + 3] for i in range(len(lowered) - 2)}:
+        for pos in _bloom_positions(trigram, bits):
+            bloom[pos >> 3] |= 1 << (pos & 7)
+    return bytes(bloom)
+
+
+def bloom_may_contain(bloom, literal):
+    """Faux uniquement si le littéral est certainement absent du bloc"""
+    if bloom is None or len(literal) < 3:
+        return True
+    bits = len(bloom) * 8
+    lowered = literal.lower()
+    for i in range(len(lowered) - 2):
+        for pos in _bloom_positions(lowered[i:i + 3], bits):
+            if not bloom[pos >> 3] & (1 << (pos & 7)):
+                return False
+    return True
+
+
+# =============================================================================
+# Tâches exécutées dans les processus de travail
+# =============================================================================
+
+def _compile(options):
+    pattern = options["pattern"].encode("utf-8")
+    if not options["regex"]:
+        pattern = re.escape(pattern)
+    # ^ et $ ancrés sur chaque ligne, comme grep
+    flags = re.MULTILINE if options["case_sensitive"] else re.MULTILINE | re.IGNORECASE
+    return re.compile(pattern, flags)
+
+
+def _scan_buffer(buf, start, end, regex, options):
+    """Recherche dans buf[start:end] ; retourne (nb_lignes, correspondances en numéros relatifs)"""
+    since, until = options["since"], options["until"]
+    context = options["context"]
+    max_detail = options["max_results"]
+    matches = []
+    counted_to = start
+    rel_line = 0
+    pos = start
+
+    while pos < end:
+        match = regex.search(buf, pos, end)
+        # Correspondance vide après le dernier saut de ligne du bloc: pas une ligne
+        if match is None or (match.start() == end and buf[end - 1:end] == b"\n"):
+            break
+        line_start = buf.rfind(b"\n", start, match.start()) + 1
+        if line_start < start:
+            line_start = start
+        line_end = buf.find(b"\n", match.start(), end)
+        if line_end < 0:
+            line_end = end
+        pos = line_end + 1
+
+        # Une correspondance qui franchit un saut de ligne ([^x], \s...) ne compte pas:
+        # la ligne n'est retenue que si le motif y correspond seul, comme avec grep
+        if match.end() > line_end and regex.search(buf, line_start, line_end) is None:
+            continue
+        line = buf[line_start:line_end]
+
+        rel_line += buf[counted_to:line_start].count(b"\n")
+        counted_to = line_start
+
+        epoch, ts_text = parse_line_timestamp(line)
+        if epoch is not None and ((since and epoch < since) or (until and epoch > until)):
+            continue
+
+        entry = {"line": rel_line, "ts": ts_text}
+        if len(matches) < max_detail:
+            entry["text"] = line.decode("utf-8", "replace")
+            if context:
+                entry["before"] = _context_lines(buf, line_start, context, backwards=True)
+                entry["after"] = _context_lines(buf, line_end, context, backwards=False)
+        matches.append(entry)
+
+    line_count = buf[start:end].count(b"\n")
+    if end > start and buf[end - 1:end] != b"\n":
+        line_count += 1
+    return line_count, matches
+
+
+def _context_lines(buf, offset, count, backwards):
+    lines = []
+    if backwards:
+        pos = offset - 1
+        while len(lines) < count and pos > 0:
+            prev = buf.rfind(b"\n", 0, pos)
+            lines.append(buf[prev + 1:pos].decode("utf-8", "replace"))
+            pos = prev
+        lines.reverse()
+    else:
+        pos = offset
+        size = len(buf)
+        while len(lines) < count and pos < size - 1:
+            nxt = buf.find(b"\n", pos + 1)
+            if nxt < 0:
+                nxt = size
+            lines.append(buf[pos + 1:nxt].decode("utf-8", "replace"))
+            pos = nxt
+    return lines
+
+
+def search_plain_block(task):
+    """Recherche dans un bloc d'un fichier texte projeté en mémoire"""
+    path, offset, length, options = task
+    regex = _compile(options)
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            line_count, matches = _scan_buffer(mm, offset, offset + length, regex, options)
+    return line_count, matches
+
+
+def search_gzip_file(task):
+    """Recherche en flux dans une rotation compressée, par morceaux alignés sur les lignes"""
+    path, options = task
+    regex = _compile(options)
+    total_lines = 0
+    all_matches = []
+    remainder = b""
+
+    with gzip.open(path, "rb") as f:
+        while True:
+            chunk = f.read(GZIP_CHUNK_SIZE)
+            if not chunk:
+                data = remainder
+            else:
+                data = remainder + chunk
+                cut = data.rfind(b"\n")
+                if cut < 0:
+                    remainder = data
+                    continue
+                data, remainder = data[:cut + 1], data[cut + 1:]
+
+            if data:
+                detail = dict(options, max_results=max(options["max_results"] - len(all_matches), 0))
+                line_count, matches = _scan_buffer(data, 0, len(data), regex, detail)
+                for entry in matches:
+                    entry["line"] += total_lines
+                all_matches.extend(matches)
+                total_lines += line_count
+
+            if not chunk:
+                break
+
+    return total_lines, all_matches
+
+
+def index_plain_block(task):
+    """Calcule les métadonnées d'index d'un bloc"""
+    path, offset, length = task
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[offset:offset + length]
+    ts_min, ts_max = block_time_range(data)
+    return offset, length, data.count(b"\n"), ts_min, ts_max, build_bloom(data)
+
+
+# =============================================================================
+# Index incrémental
+# =============================================================================
+
+class LogIndex:
+    def __init__(self, db_path=DEFAULT_INDEX_PATH):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript('''
+        CREATE TABLE IF NOT EXISTS indexed_files (
+            path TEXT PRIMARY KEY,
+            inode INTEGER NOT NULL,
+            indexed_size INTEGER NOT NULL,
+            fingerprint TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS indexed_blocks (
+            path TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            line_count INTEGER NOT NULL,
+            ts_min REAL,
+            ts_max REAL,
+            bloom BLOB,
+            PRIMARY KEY (path, offset)
+        );
+        ''')
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def fingerprint(path):
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read(FINGERPRINT_SIZE)).hexdigest()
+
+    def blocks(self, path):
+        return self.conn.execute('''
+            SELECT offset, length, line_count, ts_min, ts_max, bloom
+            FROM indexed_blocks WHERE path = ? ORDER BY offset
+        ''', (path,)).fetchall()
+
+    def update(self, path, executor=None):
+        """Indexe la partie non indexée d'un fichier ; reconstruit après rotation ou troncature"""
+        st = os.stat(path)
+        row = self.conn.execute(
+            "SELECT inode, indexed_size, fingerprint FROM indexed_files WHERE path = ?", (path,)
+        ).fetchone()
+
+        start = 0
+        if row:
+            inode, indexed_size, fingerprint = row
+            if inode == st.st_ino and st.st_size >= indexed_size and fingerprint == self.fingerprint(path):
+                start = indexed_size
+            else:
+                self.conn.execute("DELETE FROM indexed_blocks WHERE path = ?", (path,))
+
+        ranges = [r for r in split_blocks(path, start, st.st_size) if r[2]]
+        if ranges:
+            tasks = [(path, offset, length) for offset, length, complete in ranges]
+            results = executor.map(index_plain_block, tasks) if executor else map(index_plain_block, tasks)
+            self.conn.executemany('''
+                INSERT OR REPLACE INTO indexed_blocks (path, offset, length, line_count, ts_min, ts_max, bloom)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(path, *r) for r in results])
+            start = ranges[-1][0] + ranges[-1][1]
+
+        self.conn.execute('''
+            INSERT OR REPLACE INTO indexed_files (path, inode, indexed_size, fingerprint, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (path, st.st_ino, start, self.fingerprint(path) if st.st_size else "", time.time()))
+        self.conn.commit()
+        return start
+
+
+def split_blocks(path, start, size):
+    """Découpe [start, size) en blocs terminés par une fin de ligne : (offset, longueur, complet)"""
+    ranges = []
+    if size <= start:
+        return ranges
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offset = start
+            while offset < size:
+                end = min(offset + BLOCK_SIZE, size)
+                newline = mm.rfind(b"\n", offset, end)
+                if end < size and newline < 0:
+                    newline = mm.find(b"\n", end)
+                if newline < 0:
+                    ranges.append((offset, size - offset, False))
+                    break
+                ranges.append((offset, newline + 1 - offset, True))
+                offset = newline + 1
+    return ranges
+
+
+# =============================================================================
+# Moteur de recherche
+# =============================================================================
+
+class LogSearchEngine:
+    def __init__(self, pattern, case_sensitive=False, regex=False, context=3, max_results=100,
+                 since=None, until=None, use_index=False, index_path=DEFAULT_INDEX_PATH, workers=None):
+        self.options = {
+            "pattern": pattern,
+            "case_sensitive": case_sensitive,
+            "regex": regex,
+            "context": context,
+            "max_results": max_results,
+            "since": since,
+            "until": until,
+        }
+        self.use_index = use_index
+        self.index_path = index_path
+        self.workers = workers or os.cpu_count() or 1
+        self.literal = None if regex else pattern.encode("utf-8")
+        self.stats = {"blocks_total": 0, "blocks_scanned": 0, "blocks_skipped": 0, "bytes_scanned": 0}
+
+    def _block_may_match(self, ts_min, ts_max, bloom):
+        since, until = self.options["since"], self.options["until"]
+        if since and ts_max is not None and ts_max < since:
+            return False
+        if until and ts_min is not None and ts_min > until:
+            return False
+        if self.literal is not None and not bloom_may_contain(bloom, self.literal):
+            return False
+        return True
+
+    def _plan_plain_file(self, path, index, executor):
+        """Liste des blocs à rechercher : (offset, longueur, lignes connues | None, à rechercher)"""
+        size = os.path.getsize(path)
+        plan = []
+        start = 0
+        if index is not None:
+            start = index.update(path, executor)
+            for offset, length, line_count, ts_min, ts_max, bloom in index.blocks(path):
+                plan.append((offset, length, line_count, self._block_may_match(ts_min, ts_max, bloom)))
+        for offset, length, _ in split_blocks(path, start, size):
+            plan.append((offset, length, None, True))
+        return plan
+
+    def search(self, files):
+        """Recherche dans les fichiers ; retourne (résultats par fichier, avertissements)"""
+        readable, warnings = [], []
+        for path in files:
+            if not os.path.isfile(path):
+                warnings.append(f"Log file not found: {path}")
+            elif not os.access(path, os.R_OK):
+                warnings.append(f"Log file not readable: {path}")
+            else:
+                readable.append(path)
+
+        total_bytes = sum(os.path.getsize(p) for p in readable)
+        executor = None
+        if self.workers > 1 and (total_bytes > PARALLEL_THRESHOLD or len(readable) > 1):
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+        index = LogIndex(self.index_path) if self.use_index else None
+
+        try:
+            jobs = []
+            for path in readable:
+                if path.endswith(".gz"):
+                    self.stats["blocks_total"] += 1
+                    self.stats["blocks_scanned"] += 1
+                    self.stats["bytes_scanned"] += os.path.getsize(path)
+                    jobs.append((path, "gzip", None, self._submit(executor, search_gzip_file, (path, self.options))))
+                    continue
+
+                plan = self._plan_plain_file(path, index, executor)
+                blocks = []
+                for offset, length, line_count, wanted in plan:
+                    self.stats["blocks_total"] += 1
+                    if wanted:
+                        self.stats["blocks_scanned"] += 1
+                        self.stats["bytes_scanned"] += length
+                        future = self._submit(executor, search_plain_block, (path, offset, length, self.options))
+                    else:
+                        self.stats["blocks_skipped"] += 1
+                        future = None
+                    blocks.append((line_count, future))
+                jobs.append((path, "plain", blocks, None))
+
+            results = []
+            for path, kind, blocks, future in jobs:
+                if kind == "gzip":
+                    _, matches = self._result(future)
+                else:
+                    matches = []
+                    line_base = 0
+                    for known_lines, block_future in blocks:
+                        if block_future is None:
+                            line_base += known_lines
+                            continue
+                        line_count, block_matches = self._result(block_future)
+                        for entry in block_matches:
+                            entry["line"] += line_base + 1
+                        matches.extend(block_matches)
+                        line_base += known_lines if known_lines is not None else line_count
+                    results.append(self._format_file_result(path, matches))
+                    continue
+                for entry in matches:
+                    entry["line"] += 1
+                results.append(self._format_file_result(path, matches))
+            return results, warnings
+        finally:
+            if executor:
+                executor.shutdown()
+            if index:
+                index.close()
+
+    @staticmethod
+    def _submit(executor, func, task):
+        return executor.submit(func, task) if executor else func(task)
+
+    @staticmethod
+    def _result(future):
+        return future.result() if hasattr(future, "result") else future
+
+    def _format_file_result(self, path, matches):
+        """Entrée de résultat au format de search-log.pattern.sh"""
+        max_results = self.options["max_results"]
+        sample = []
+        for entry in matches:
+            if "text" not in entry or len(sample) >= max_results:
+                break
+            line_no = entry["line"]
+            before = entry.get("before", [])
+            for i, text in enumerate(before):
+                sample.append(f"{line_no - len(before) + i}-{text}")
+            sample.append(f"{line_no}:{entry['text']}")
+            for i, text in enumerate(entry.get("after", [])):
+                sample.append(f"{line_no + i + 1}-{text}")
+        return {
+            "file": path,
+            "matches": len(matches),
+            "lines": ",".join(str(e["line"]) for e in matches),
+            "timestamps": ",".join(e["ts"] for e in matches if e.get("ts")),
+            "sample_matches": "|".join(sample[:max_results]),
+        }
+
+
+def expand_rotations(files):
+    """Ajoute les rotations d'un journal (fichier.1, fichier.2.gz, ...) dans l'ordre chronologique"""
+    expanded = []
+    for path in files:
+        rotated = [p for p in glob.glob(glob.escape(path) + ".*") if re.search(r'\.\d+(\.gz)?$', p)]
+        rotated.sort(key=lambda p: int(re.search(r'\.(\d+)(\.gz)?$', p).group(1)), reverse=True)
+        expanded.extend(rotated)
+        expanded.append(path)
+    return expanded
+
+
+def build_output(engine, results, warnings, files_searched):
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    options = engine.options
+    if files_searched == 0:
+        return {
+            "status": "error",
+            "code": 1,
+            "timestamp": now,
+            "script": SCRIPT_NAME,
+            "message": "Log pattern search failed",
+            "data": {},
+            "errors": ["No log files could be searched"],
+            "warnings": warnings,
+        }
+    return {
+        "status": "success",
+        "code": 0,
+        "timestamp": now,
+        "script": SCRIPT_NAME,
+        "message": "Log pattern search completed",
+        "data": {
+            "pattern": options["pattern"],
+            "search_options": {
+                "case_sensitive": options["case_sensitive"],
+                "regex_mode": options["regex"],
+                "context_lines": options["context"],
+                "max_results": options["max_results"],
+                "since": options["since"],
+                "until": options["until"],
+                "indexed": engine.use_index,
+                "workers": engine.workers,
+            },
+            "summary": {
+                "total_matches": sum(r["matches"] for r in results),
+                "files_searched": files_searched,
+                "files_with_matches": sum(1 for r in results if r["matches"] > 0),
+                **engine.stats,
+            },
+            "results": results,
+        },
+        "errors": [],
+        "warnings": warnings,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Recherche de motifs dans les logs (mmap, parallèle, index)")
+    parser.add_argument("pattern", nargs="?")
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("-c", "--context", type=int, default=3)
+    parser.add_argument("-m", "--max", dest="max_results", type=int, default=100)
+    parser.add_argument("-s", "--case-sensitive", action="store_true")
+    parser.add_argument("-r", "--regex", action="store_true")
+    parser.add_argument("--since", help="Début (ISO 8601 ou relatif: 30m, 2h, 7d)")
+    parser.add_argument("--until", help="Fin (ISO 8601 ou relatif)")
+    parser.add_argument("--rotated", action="store_true", help="Inclure les rotations (.1, .2.gz, ...)")
+    parser.add_argument("--index", action="store_true", help="Utiliser et mettre à jour l'index incrémental")
+    parser.add_argument("--index-path", default=DEFAULT_INDEX_PATH)
+    parser.add_argument("--index-only", action="store_true", help="Mettre à jour l'index sans rechercher")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    return parser.parse_intermixed_args(argv)
+
+
+def run(args):
+    files = args.files or ([] if args.index_only else DEFAULT_LOG_FILES)
+    if args.index_only and args.pattern:
+        files = [args.pattern] + files
+    if args.rotated:
+        files = expand_rotations(files)
+
+    if args.index_only:
+        index = LogIndex(args.index_path)
+        try:
+            for path in files:
+                if os.path.isfile(path) and not path.endswith(".gz"):
+                    print(json.dumps({"file": path, "indexed_bytes": index.update(path)}))
+        finally:
+            index.close()
+        return 0
+
+    if not args.pattern:
+        print("Pattern manquant", file=sys.stderr)
+        return 2
+
+    try:
+        since, until = parse_time_bound(args.since), parse_time_bound(args.until)
+    except ValueError as e:
+        print(f"Borne temporelle invalide: {e}", file=sys.stderr)
+        return 2
+
+    engine = LogSearchEngine(
+        args.pattern, args.case_sensitive, args.regex, args.context, args.max_results,
+        since, until, args.index, args.index_path, args.workers,
+    )
+    results, warnings = engine.search(files)
+    output = build_output(engine, results, warnings, len(results))
+    print(json.dumps(output, indent=2, ensure_ascii=False))
+    return output["code"]
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        return run(args)
+    except BrokenPipeError:
+        # Lecteur fermé (| head): pas de trace, ni d'erreur au flush de sortie
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -34,6 +34,14 @@ readonly ATOMICS_DIR="$(realpath "$SCRIPT_DIR/../../atomics")"
 readonly CHECK_SSH_SCRIPT="$ATOMICS_DIR/network/check-ssh.connection.sh"
 readonly COPY_FILE_SCRIPT="$ATOMICS_DIR/network/copy-file.remote.sh"
 readonly EXECUTE_SSH_SCRIPT="$ATOMICS_DIR/network/execute-ssh.remote.sh"
+readonly LIB_DIR="$(realpath "$SCRIPT_DIR/../../lib")"
+readonly WORKFLOW_PLANNER="$(realpath "$SCRIPT_DIR/../..")/workflow_planner.py"
+
+# Traçage des étapes (actif avec ATOMICOPS_TRACE=1 ou une trace héritée, voir lib/trace.sh)
+source "$LIB_DIR/trace.sh"
+
+# Validateurs compilés depuis input_parameter_types (optionnel, voir param_validator.py)
+[[ -f "$LIB_DIR/validators.generated.sh" ]] && source "$LIB_DIR/validators.generated.sh"
 
 # === CONFIGURATION PAR DÉFAUT ===
 readonly DEFAULT_SSH_PORT=22
@@ -58,6 +66,7 @@ DRY_RUN=false
 QUIET_MODE=false
 DEBUG_MODE=false
 VERBOSE_MODE=false
+WORKFLOW_START_US=0
 
 # === FONCTIONS D'AIDE ===
 show_help() {
@@ -252,8 +261,18 @@ validate_parameters() {
         fi
     done
     
-    # Validation du port SSH
-    if [[ ! "$TARGET_PORT" =~ ^[0-9]+$ ]] || [[ "$TARGET_PORT" -lt 1 ]] || [[ "$TARGET_PORT" -gt 65535 ]]; then
+    # Validation en une passe des paramètres typés, avant toute connexion distante
+    if declare -F validate_param_set >/dev/null; then
+        local typed_params=("user:username=$TARGET_USER" "port:port=$TARGET_PORT")
+        [[ -n "$TARGET_HOST" ]] && typed_params+=("host:ip|ipv6|hostname=$TARGET_HOST")
+        local validation_error
+        if ! validate_param_set "${typed_params[@]}"; then
+            for validation_error in "${VALIDATION_ERRORS[@]}"; do
+                log_error "Paramètre invalide : $validation_error"
+                ((errors++))
+            done
+        fi
+    elif [[ ! "$TARGET_PORT" =~ ^[0-9]+$ ]] || [[ "$TARGET_PORT" -lt 1 ]] || [[ "$TARGET_PORT" -gt 65535 ]]; then
         log_error "Port SSH invalide : $TARGET_PORT"
         ((errors++))
     fi
@@ -287,7 +306,7 @@ validate_ssh_connectivity() {
     
     log_info "Étape 1/6 : Validation de la connectivité SSH"
     
-    local connectivity_start=$(date +%s.%N)
+    local connectivity_start=${EPOCHREALTIME/[.,]/}
     local ssh_check_cmd=("$CHECK_SSH_SCRIPT")
     
     # Construction des arguments pour check-ssh.connection.sh
@@ -308,7 +327,7 @@ validate_ssh_connectivity() {
         log_info "MODE DRY-RUN : Validation SSH simulée"
         check_result='{"status": "success", "data": {"ssh_connection": {"status": "success"}}}'
     else
-        if check_result=$("${ssh_check_cmd[@]}" 2>/dev/null); then
+        if check_result=$(trace_run "check-ssh.connection.sh" "${ssh_check_cmd[@]}" 2>/dev/null); then
             local ssh_status=$(echo "$check_result" | jq -r '.data.ssh_connection.status' 2>/dev/null || echo "failed")
             
             if [[ "$ssh_status" == "success" ]]; then
@@ -324,8 +343,7 @@ validate_ssh_connectivity() {
         fi
     fi
     
-    local connectivity_end=$(date +%s.%N)
-    local connectivity_time=$(echo "($connectivity_end - $connectivity_start) * 1000" | bc -l 2>/dev/null || echo "0")
+    local connectivity_time=$(( (${EPOCHREALTIME/[.,]/} - connectivity_start) / 1000 ))
     
     # Extraction du temps de connexion depuis le résultat
     local connection_time_ms=$(echo "$check_result" | jq -r '.data.performance.connection_latency' 2>/dev/null || echo "0")
@@ -346,7 +364,7 @@ EOF
 transfer_main_script() {
     log_info "Étape 2/6 : Transfert du script principal"
     
-    local transfer_start=$(date +%s.%N)
+    local transfer_start=${EPOCHREALTIME/[.,]/}
     local script_name=$(basename "$LOCAL_SCRIPT_PATH")
     local remote_script_path="$REMOTE_WORKDIR/$script_name"
     
@@ -367,7 +385,7 @@ transfer_main_script() {
     log_debug "Commande de transfert : ${copy_cmd[*]}"
     
     local transfer_result
-    if transfer_result=$("${copy_cmd[@]}" 2>/dev/null); then
+    if transfer_result=$(trace_run "copy-file.remote.sh" "${copy_cmd[@]}" 2>/dev/null); then
         local copy_status=$(echo "$transfer_result" | jq -r '.status' 2>/dev/null || echo "error")
         
         if [[ "$copy_status" == "success" ]]; then
@@ -382,8 +400,7 @@ transfer_main_script() {
         return 3
     fi
     
-    local transfer_end=$(date +%s.%N)
-    local transfer_time=$(echo "($transfer_end - $transfer_start) * 1000" | bc -l 2>/dev/null || echo "0")
+    local transfer_time=$(( (${EPOCHREALTIME/[.,]/} - transfer_start) / 1000 ))
     
     # Stockage du résultat avec le chemin distant
     echo "$transfer_result" | jq --arg remote_path "$remote_script_path" '. + {"remote_script_path": $remote_path}' > /tmp/main_transfer_result_$$ 2>/dev/null || echo "$transfer_result" > /tmp/main_transfer_result_$$
@@ -401,7 +418,7 @@ transfer_dependencies() {
     fi
     
     local transfer_results=()
-    local transfer_start=$(date +%s.%N)
+    local transfer_start=${EPOCHREALTIME/[.,]/}
     
     for dep_file in "${DEPENDENCY_PATHS[@]}"; do
         local dep_name=$(basename "$dep_file")
@@ -426,7 +443,7 @@ transfer_dependencies() {
         copy_cmd+=("$TARGET_HOST" "$dep_file" "$remote_dep_path")
         
         local dep_result
-        if dep_result=$("${copy_cmd[@]}" 2>/dev/null); then
+        if dep_result=$(trace_run "copy-file.remote.sh" "${copy_cmd[@]}" 2>/dev/null); then
             local dep_status=$(echo "$dep_result" | jq -r '.status' 2>/dev/null || echo "error")
             
             if [[ "$dep_status" == "success" ]]; then
@@ -442,8 +459,7 @@ transfer_dependencies() {
         fi
     done
     
-    local transfer_end=$(date +%s.%N)
-    local transfer_time=$(echo "($transfer_end - $transfer_start) * 1000" | bc -l 2>/dev/null || echo "0")
+    local transfer_time=$(( (${EPOCHREALTIME/[.,]/} - transfer_start) / 1000 ))
     
     # Stockage des résultats de transfert des dépendances
     local deps_json="[$(IFS=,; echo "${transfer_results[*]}")]"
@@ -539,7 +555,7 @@ execute_remote_script() {
     log_info "Exécution de : $execution_command"
     
     local execution_result
-    if execution_result=$("${exec_cmd[@]}" 2>/dev/null); then
+    if execution_result=$(trace_run "execute-ssh.remote.sh" "${exec_cmd[@]}" 2>/dev/null); then
         local exec_status=$(echo "$execution_result" | jq -r '.status' 2>/dev/null || echo "error")
         local exit_code=$(echo "$execution_result" | jq -r '.data.result.exit_code' 2>/dev/null || echo "1")
         
@@ -596,7 +612,7 @@ cleanup_remote_files() {
     log_debug "Commande de nettoyage : ${exec_cmd[*]}"
     
     local cleanup_result
-    if cleanup_result=$("${exec_cmd[@]}" 2>/dev/null); then
+    if cleanup_result=$(trace_run "execute-ssh.remote.sh" "${exec_cmd[@]}" 2>/dev/null); then
         local cleanup_status=$(echo "$cleanup_result" | jq -r '.status' 2>/dev/null || echo "error")
         
         if [[ "$cleanup_status" == "success" ]]; then
@@ -627,9 +643,7 @@ generate_output() {
     local cleanup_result=$(cat /tmp/cleanup_result_$$ 2>/dev/null || echo '{"status": "skipped"}')
     
     # Extraction des métriques de performance
-    local start_time_sec=$(date -d "$start_time" +%s.%N 2>/dev/null || echo "0")
-    local end_time_sec=$(date -d "$end_time" +%s.%N 2>/dev/null || echo "0")
-    local total_duration_ms=$(echo "($end_time_sec - $start_time_sec) * 1000" | bc -l 2>/dev/null || echo "0")
+    local total_duration_ms=$(( (${EPOCHREALTIME/[.,]/} - WORKFLOW_START_US) / 1000 ))
     
     local connectivity_time_ms=$(echo "$connectivity_result" | jq -r '.connection_time_ms' 2>/dev/null || echo "0")
     local transfer_time_ms=$(echo "$main_transfer_result" | jq -r '.data.performance.transfer_time_ms' 2>/dev/null || echo "0")
@@ -688,7 +702,7 @@ generate_output() {
             "cleanup_performed": $(echo "$cleanup_result" | jq -r '.status' 2>/dev/null | grep -q "success" && echo "true" || echo "false")
         },
         "performance": {
-            "total_duration_ms": $(printf "%.0f" "$total_duration_ms"),
+            "total_duration_ms": $total_duration_ms,
             "connectivity_time_ms": $(printf "%.0f" "$connectivity_time_ms"),
             "transfer_time_ms": $(printf "%.0f" "$transfer_time_ms"),
             "execution_time_ms": $(printf "%.0f" "$execution_time_ms")
@@ -806,6 +820,7 @@ parse_args() {
 # === FONCTION PRINCIPALE ===
 main() {
     local start_time=$(date -Iseconds)
+    WORKFLOW_START_US=${EPOCHREALTIME/[.,]/}
     
     # Configuration du piégeage pour nettoyage
     trap cleanup EXIT INT TERM
@@ -825,49 +840,58 @@ main() {
     fi
     
     log_debug "Début du déploiement de script distant : $LOCAL_SCRIPT_PATH → $TARGET_USER@$TARGET_HOST"
+
+    # En simulation: estimation d'après l'historique du catalogue (durée, octets à transférer)
+    if [[ "$DRY_RUN" == true && "$QUIET_MODE" == false ]] && command -v python3 >/dev/null 2>&1 && [[ -f "$WORKFLOW_PLANNER" ]]; then
+        python3 "$WORKFLOW_PLANNER" --host "$TARGET_HOST" "$(basename "$LOCAL_SCRIPT_PATH")" "$LOCAL_SCRIPT_PATH" >&2 || true
+    fi
+    
+    # Span racine du workflow; chaque étape et chaque atomique en deviennent les enfants
+    declare -F trace_init >/dev/null && trace_init "$SCRIPT_NAME" && trace_span_start "$SCRIPT_NAME"
     
     # Workflow orchestré en 6 étapes
     local workflow_success=true
     local exit_code=0
     
     # Étape 1 : Validation de la connectivité SSH
-    if ! validate_ssh_connectivity; then
+    if ! trace_run "step:ssh_connectivity" validate_ssh_connectivity; then
         workflow_success=false
         exit_code=2
     fi
     
     # Étape 2 : Transfert du script principal
-    if [[ "$workflow_success" == true ]] && ! transfer_main_script; then
+    if [[ "$workflow_success" == true ]] && ! trace_run "step:main_transfer" transfer_main_script; then
         workflow_success=false
         exit_code=3
     fi
     
     # Étape 3 : Transfert des dépendances
-    if [[ "$workflow_success" == true ]] && ! transfer_dependencies; then
+    if [[ "$workflow_success" == true ]] && ! trace_run "step:dependency_transfer" transfer_dependencies; then
         workflow_success=false
         exit_code=3
     fi
     
     # Étape 4 : Préparation de l'environnement distant
-    if [[ "$workflow_success" == true ]] && ! prepare_remote_environment; then
+    if [[ "$workflow_success" == true ]] && ! trace_run "step:remote_preparation" prepare_remote_environment; then
         workflow_success=false
         exit_code=4
     fi
     
     # Étape 5 : Exécution du script distant
-    if [[ "$workflow_success" == true ]] && ! execute_remote_script; then
+    if [[ "$workflow_success" == true ]] && ! trace_run "step:remote_execution" execute_remote_script; then
         workflow_success=false
         exit_code=4
     fi
     
     # Étape 6 : Nettoyage (toujours tenté, même en cas d'échec)
-    cleanup_remote_files
+    trace_run "step:cleanup" cleanup_remote_files
     
     local end_time=$(date -Iseconds)
     
     # Génération du rapport final
     local final_status=$([ "$workflow_success" == true ] && echo "success" || echo "error")
     generate_output "$final_status" "$start_time" "$end_time"
+    declare -F trace_span_end >/dev/null && trace_span_end "$([[ "$workflow_success" == true ]] && echo ok || echo error)" "$exit_code"
     
     if [[ "$workflow_success" == true ]]; then
         log_info "Déploiement et exécution terminés avec succès"
@@ -34,6 +34,16 @@ readonly SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 readonly ORCHESTRATORS_DIR="$(realpath "$SCRIPT_DIR/..")"
 readonly ATOMICS_DIR="$(realpath "$SCRIPT_DIR/../../atomics")"
 readonly LIB_DIR="$(realpath "$SCRIPT_DIR/../../lib")"
+readonly WORKFLOW_PLANNER="$(realpath "$SCRIPT_DIR/../..")/workflow_planner.py"
+
+# Cache des résultats des scripts en lecture seule (optionnel)
+[[ -f "$LIB_DIR/cache.sh" ]] && source "$LIB_DIR/cache.sh"
+
+# Traçage des phases et des scripts (actif avec ATOMICOPS_TRACE=1 ou une trace héritée, voir lib/trace.sh)
+source "$LIB_DIR/trace.sh"
+
+# Validateurs compilés depuis input_parameter_types (optionnel, voir param_validator.py)
+[[ -f "$LIB_DIR/validators.generated.sh" ]] && source "$LIB_DIR/validators.generated.sh"
 
 # Scripts atomiques
 readonly GENERATE_SSH_KEY_SCRIPT="$ATOMICS_DIR/generate-ssh.keypair.sh"
@@ -65,9 +75,11 @@ EXECUTION_MODE="sequential"  # sequential|parallel
 SETUP_SSH_ACCESS=false
 ROLLBACK_ON_FAILURE=true
 PERSIST_RESULTS=true
+USE_CACHE=true
 GLOBAL_TIMEOUT="$DEFAULT_TIMEOUT"
 MAX_RETRIES=3
 DRY_RUN=false
+WORKFLOW_START_US=0
 QUIET_MODE=false
 DEBUG_MODE=false
 VERBOSE_MODE=false
@@ -113,6 +125,7 @@ OPTIONS DE WORKFLOW:
     --parallel              Exécution parallèle des scripts (défaut: séquentiel)
     --no-rollback           Désactiver le rollback automatique
     --no-persist            Ne pas persister les résultats sur le serveur
+    --no-cache              Ne pas servir les scripts en lecture seule depuis le cache
     -d, --dependency FILE   Fichier de dépendance global (répétable)
     -e, --env "VAR=value"   Variables d'environnement (répétable)
     
@@ -310,8 +323,18 @@ validate_parameters() {
         fi
     done
     
-    # Validation du port SSH
-    if [[ ! "$TARGET_PORT" =~ ^[0-9]+$ ]] || [[ "$TARGET_PORT" -lt 1 ]] || [[ "$TARGET_PORT" -gt 65535 ]]; then
+    # Validation en une passe des paramètres typés, avant toute connexion distante
+    if declare -F validate_param_set >/dev/null; then
+        local typed_params=("user:username=$TARGET_USER" "port:port=$TARGET_PORT")
+        [[ -n "$TARGET_HOST" ]] && typed_params+=("host:ip|ipv6|hostname=$TARGET_HOST")
+        local validation_error
+        if ! validate_param_set "${typed_params[@]}"; then
+            for validation_error in "${VALIDATION_ERRORS[@]}"; do
+                log_error "Paramètre invalide : $validation_error"
+                ((errors++))
+            done
+        fi
+    elif [[ ! "$TARGET_PORT" =~ ^[0-9]+$ ]] || [[ "$TARGET_PORT" -lt 1 ]] || [[ "$TARGET_PORT" -gt 65535 ]]; then
         log_error "Port SSH invalide : $TARGET_PORT"
         ((errors++))
     fi
@@ -355,7 +378,7 @@ setup_ssh_access() {
     
     log_workflow "PHASE 1/5 : Configuration de l'accès SSH"
     
-    local setup_start=$(date +%s.%N)
+    local setup_start=${EPOCHREALTIME/[.,]/}
     
     if [[ ! -f "$SETUP_SSH_ACCESS_SCRIPT" ]]; then
         log_error "Script setup-ssh.access.sh non disponible"
@@ -380,7 +403,7 @@ setup_ssh_access() {
         log_info "MODE DRY-RUN : Configuration SSH simulée"
         setup_result='{"status": "success", "data": {"ssh_key_generated": true, "access_configured": true}}'
     else
-        if setup_result=$("${setup_cmd[@]}" 2>/dev/null); then
+        if setup_result=$(trace_run "setup-ssh.access.sh" "${setup_cmd[@]}" 2>/dev/null); then
             local setup_status=$(echo "$setup_result" | jq -r '.status' 2>/dev/null || echo "error")
             
             if [[ "$setup_status" == "success" ]]; then
@@ -404,8 +427,7 @@ setup_ssh_access() {
         fi
     fi
     
-    local setup_end=$(date +%s.%N)
-    local setup_time=$(echo "($setup_end - $setup_start) * 1000" | bc -l 2>/dev/null || echo "0")
+    local setup_time=$(( (${EPOCHREALTIME/[.,]/} - setup_start) / 1000 ))
     
     # Enrichissement du résultat avec les métriques
     echo "$setup_result" | jq --arg setup_time "$setup_time" '. + {"setup_time_ms": ($setup_time | tonumber)}' > /tmp/ssh_setup_result_$$ 2>/dev/null || echo "$setup_result" > /tmp/ssh_setup_result_$$
@@ -417,7 +439,7 @@ setup_ssh_access() {
 validate_workflow_prerequisites() {
     log_workflow "PHASE 2/5 : Validation des prérequis du workflow"
     
-    local validation_start=$(date +%s.%N)
+    local validation_start=${EPOCHREALTIME/[.,]/}
     
     # Test de connectivité SSH
     local check_cmd=("$CHECK_SSH_SCRIPT")
@@ -439,7 +461,7 @@ validate_workflow_prerequisites() {
         log_info "MODE DRY-RUN : Validation des prérequis simulée"
         check_result='{"status": "success", "data": {"ssh_connection": {"status": "success"}}}'
     else
-        if check_result=$("${check_cmd[@]}" 2>/dev/null); then
+        if check_result=$(trace_run "check-ssh.connection.sh" "${check_cmd[@]}" 2>/dev/null); then
             local check_status=$(echo "$check_result" | jq -r '.data.ssh_connection.status' 2>/dev/null || echo "failed")
             
             if [[ "$check_status" == "success" ]]; then
@@ -455,8 +477,7 @@ validate_workflow_prerequisites() {
         fi
     fi
     
-    local validation_end=$(date +%s.%N)
-    local validation_time=$(echo "($validation_end - $validation_start) * 1000" | bc -l 2>/dev/null || echo "0")
+    local validation_time=$(( (${EPOCHREALTIME/[.,]/} - validation_start) / 1000 ))
     
     echo "$check_result" | jq --arg validation_time "$validation_time" '. + {"validation_time_ms": ($validation_time | tonumber)}' > /tmp/validation_result_$$ 2>/dev/null || echo "$check_result" > /tmp/validation_result_$$
     
@@ -467,7 +488,7 @@ validate_workflow_prerequisites() {
 deploy_workflow_scripts() {
     log_workflow "PHASE 3/5 : Déploiement des scripts du workflow (${#WORKFLOW_SCRIPTS[@]} script(s))"
     
-    local deployment_start=$(date +%s.%N)
+    local deployment_start=${EPOCHREALTIME/[.,]/}
     local deployment_results=()
     local successful_deployments=0
     local failed_deployments=0
@@ -504,7 +525,7 @@ deploy_workflow_scripts() {
         log_debug "Commande de déploiement : ${deploy_cmd[*]}"
         
         local deploy_result
-        if deploy_result=$("${deploy_cmd[@]}" 2>/dev/null); then
+        if deploy_result=$(trace_run "deploy-script.remote.sh" "${deploy_cmd[@]}" 2>/dev/null); then
             local deploy_status=$(echo "$deploy_result" | jq -r '.status' 2>/dev/null || echo "error")
             
             if [[ "$deploy_status" == "success" ]]; then
@@ -523,8 +544,7 @@ deploy_workflow_scripts() {
         fi
     done
     
-    local deployment_end=$(date +%s.%N)
-    local deployment_time=$(echo "($deployment_end - $deployment_start) * 1000" | bc -l 2>/dev/null || echo "0")
+    local deployment_time=$(( (${EPOCHREALTIME/[.,]/} - deployment_start) / 1000 ))
     
     # Stockage des résultats de déploiement
     local deployments_json="[$(IFS=,; echo "${deployment_results[*]}")]"
@@ -559,6 +579,20 @@ execute_scripts_sequential() {
         local script_name=$(basename "$script_path")
         log_info "Exécution du script : $script_name"
         
+        # Scripts en lecture seule (en-tête Cache-TTL) : réutiliser un résultat récent
+        local cache_ttl=""
+        if [[ "$USE_CACHE" == true && "$DRY_RUN" == false ]] && declare -F cache_ttl_for >/dev/null; then
+            cache_ttl=$(cache_ttl_for "$script_path") || cache_ttl=""
+        fi
+        
+        local cached_result
+        if [[ -n "$cache_ttl" ]] && cached_result=$(cache_lookup "$TARGET_HOST" "$script_name" "$WORKFLOW_ARGUMENTS" 2>/dev/null); then
+            log_verbose "Résultat servi depuis le cache : $script_name"
+            execution_results+=("$cached_result")
+            successful_executions=$((successful_executions + 1))
+            continue
+        fi
+        
         # Commande d'exécution via SSH
         local exec_command="cd '$REMOTE_WORKDIR' && ./$script_name"
         
@@ -586,13 +620,16 @@ execute_scripts_sequential() {
         exec_cmd+=("$TARGET_HOST" "$exec_command")
         
         local exec_result
-        if exec_result=$("${exec_cmd[@]}" 2>/dev/null); then
+        if exec_result=$(trace_run "$script_name" "${exec_cmd[@]}" 2>/dev/null); then
             local exec_status=$(echo "$exec_result" | jq -r '.status' 2>/dev/null || echo "error")
             local exit_code=$(echo "$exec_result" | jq -r '.data.result.exit_code' 2>/dev/null || echo "1")
             
             if [[ "$exec_status" == "success" && "$exit_code" == "0" ]]; then
                 log_verbose "Script exécuté avec succès : $script_name (code: $exit_code)"
                 execution_results+=("$exec_result")
+                if [[ -n "$cache_ttl" ]]; then
+                    printf '%s' "$exec_result" | cache_store "$TARGET_HOST" "$script_name" "$cache_ttl" "$WORKFLOW_ARGUMENTS" 2>/dev/null || true
+                fi
                 ((successful_executions++))
             else
                 log_error "Échec d'exécution : $script_name (code: $exit_code)"
@@ -670,7 +707,7 @@ execute_scripts_parallel() {
         exec_cmd+=("$TARGET_HOST" "$exec_command")
         
         # Lancement en arrière-plan avec redirection vers fichier temporaire
-        "${exec_cmd[@]}" > "$temp_result" 2>&1 &
+        trace_run "$script_name" "${exec_cmd[@]}" > "$temp_result" 2>&1 &
         pids+=($!)
     done
     
@@ -718,7 +755,7 @@ EOF
 execute_workflow_scripts() {
     log_workflow "PHASE 4/5 : Exécution des scripts du workflow ($EXECUTION_MODE)"
     
-    local execution_start=$(date +%s.%N)
+    local execution_start=${EPOCHREALTIME/[.,]/}
     local execution_result=0
     
     case "$EXECUTION_MODE" in
@@ -732,8 +769,7 @@ execute_workflow_scripts() {
             ;;
     esac
     
-    local execution_end=$(date +%s.%N)
-    local execution_time=$(echo "($execution_end - $execution_start) * 1000" | bc -l 2>/dev/null || echo "0")
+    local execution_time=$(( (${EPOCHREALTIME/[.,]/} - execution_start) / 1000 ))
     
     # Enrichissement du résultat avec les métriques de temps
     local current_result=$(cat /tmp/execution_results_$$ 2>/dev/null || echo '{}')
@@ -746,7 +782,7 @@ execute_workflow_scripts() {
 cleanup_and_persist() {
     log_workflow "PHASE 5/5 : Nettoyage et persistence des résultats"
     
-    local cleanup_start=$(date +%s.%N)
+    local cleanup_start=${EPOCHREALTIME/[.,]/}
     
     if [[ "$PERSIST_RESULTS" == true ]]; then
         # Création d'un rapport de résultats sur le serveur distant
@@ -788,8 +824,7 @@ cleanup_and_persist() {
         "${exec_cmd[@]}" "$TARGET_HOST" "$cleanup_command" >/dev/null 2>&1 || true
     fi
     
-    local cleanup_end=$(date +%s.%N)
-    local cleanup_time=$(echo "($cleanup_end - $cleanup_start) * 1000" | bc -l 2>/dev/null || echo "0")
+    local cleanup_time=$(( (${EPOCHREALTIME/[.,]/} - cleanup_start) / 1000 ))
     
     echo '{"status": "success", "cleanup_time_ms": '$cleanup_time'}' > /tmp/cleanup_result_$$
     
@@ -810,9 +845,7 @@ generate_output() {
     local cleanup_result=$(cat /tmp/cleanup_result_$$ 2>/dev/null || echo '{"status": "skipped"}')
     
     # Extraction des métriques de performance
-    local start_time_sec=$(date -d "$start_time" +%s.%N 2>/dev/null || echo "0")
-    local end_time_sec=$(date -d "$end_time" +%s.%N 2>/dev/null || echo "0")
-    local total_duration_ms=$(echo "($end_time_sec - $start_time_sec) * 1000" | bc -l 2>/dev/null || echo "0")
+    local total_duration_ms=$(( (${EPOCHREALTIME/[.,]/} - WORKFLOW_START_US) / 1000 ))
     
     local setup_time_ms=$(echo "$ssh_setup_result" | jq -r '.setup_time_ms' 2>/dev/null || echo "0")
     local deployment_time_ms=$(echo "$deployment_results" | jq -r '.deployment_time_ms' 2>/dev/null || echo "0")
@@ -933,6 +966,10 @@ parse_args() {
                 PERSIST_RESULTS=false
                 shift
                 ;;
+            --no-cache)
+                USE_CACHE=false
+                shift
+                ;;
             -d|--dependency)
                 WORKFLOW_DEPENDENCIES+=("$2")
                 shift 2
@@ -991,6 +1028,7 @@ parse_args() {
 # === FONCTION PRINCIPALE ===
 main() {
     local start_time=$(date -Iseconds)
+    WORKFLOW_START_US=${EPOCHREALTIME/[.,]/}
     
     # Configuration du piégeage pour nettoyage
     trap cleanup EXIT INT TERM
@@ -1010,32 +1048,42 @@ main() {
     fi
     
     log_debug "Début de l'exécution du workflow '$WORKFLOW_NAME' sur $TARGET_HOST"
+
+    # En simulation: plan estimé d'après l'historique du catalogue (chemin critique, octets à transférer)
+    if [[ "$DRY_RUN" == true && "$QUIET_MODE" == false ]] && command -v python3 >/dev/null 2>&1 && [[ -f "$WORKFLOW_PLANNER" ]]; then
+        local plan_args=(--host "$TARGET_HOST")
+        [[ "$EXECUTION_MODE" == "parallel" ]] && plan_args+=(--parallel)
+        python3 "$WORKFLOW_PLANNER" "${plan_args[@]}" "$WORKFLOW_NAME" "${WORKFLOW_SCRIPTS[@]}" >&2 || true
+    fi
     log_workflow "Orchestration de workflow : $WORKFLOW_NAME (${#WORKFLOW_SCRIPTS[@]} script(s), mode: $EXECUTION_MODE)"
     
+    # Span racine du workflow; phases et scripts en deviennent les enfants
+    declare -F trace_init >/dev/null && trace_init "$SCRIPT_NAME" && trace_span_start "workflow:$WORKFLOW_NAME"
+    
     # Workflow orchestré en 5 phases
     local workflow_success=true
     local exit_code=0
     
     # Phase 1 : Configuration SSH (optionnelle)
-    if ! setup_ssh_access; then
+    if ! trace_run "phase:ssh_setup" setup_ssh_access; then
         workflow_success=false
         exit_code=2
     fi
     
     # Phase 2 : Validation des prérequis
-    if [[ "$workflow_success" == true ]] && ! validate_workflow_prerequisites; then
+    if [[ "$workflow_success" == true ]] && ! trace_run "phase:validation" validate_workflow_prerequisites; then
         workflow_success=false
         exit_code=2
     fi
     
     # Phase 3 : Déploiement des scripts
-    if [[ "$workflow_success" == true ]] && ! deploy_workflow_scripts; then
+    if [[ "$workflow_success" == true ]] && ! trace_run "phase:deployment" deploy_workflow_scripts; then
         workflow_success=false
         exit_code=3
     fi
     
     # Phase 4 : Exécution des scripts
-    if [[ "$workflow_success" == true ]] && ! execute_workflow_scripts; then
+    if [[ "$workflow_success" == true ]] && ! trace_run "phase:execution" execute_workflow_scripts; then
         workflow_success=false
         exit_code=4
         
@@ -1051,7 +1099,7 @@ main() {
     fi
     
     # Phase 5 : Nettoyage et persistence (toujours tenté)
-    cleanup_and_persist
+    trace_run "phase:cleanup" cleanup_and_persist
     
     local end_time=$(date -Iseconds)
     
@@ -1066,6 +1114,7 @@ main() {
     fi
     
     generate_output "$final_status" "$start_time" "$end_time"
+    declare -F trace_span_end >/dev/null && trace_span_end "$([[ "$workflow_success" == true ]] && echo ok || echo error)" "$exit_code"
     
     if [[ "$workflow_success" == true ]]; then
         log_workflow "Workflow '$WORKFLOW_NAME' exécuté avec succès"
@@ -27,6 +27,10 @@ JSON_ONLY=${JSON_ONLY:-0}
 # Chemin vers les scripts atomiques
 ATOMIC_SCRIPTS_DIR="${ATOMIC_SCRIPTS_DIR:-$(dirname "$0")/../../atomics/network}"
 
+# Retry partagé: backoff exponentiel avec jitter et disjoncteur par hôte
+LIB_DIR="${LIB_DIR:-$(dirname "$0")/../../lib}"
+[[ -f "$LIB_DIR/retry.sh" ]] && source "$LIB_DIR/retry.sh"
+
 # Configuration de connexion
 CONNECTION_TYPE=""  # ssh, ftp, http, scp
 TARGET_HOST=""
@@ -415,6 +419,24 @@ validate_prerequisites() {
 # Fonctions d'Orchestration par Type
 # =============================================================================
 
+# Port du service ciblé, pour la sonde du disjoncteur
+get_service_port() {
+    if [[ -n "$TARGET_PORT" ]]; then
+        echo "$TARGET_PORT"
+        return
+    fi
+    case "$CONNECTION_TYPE" in
+        ftp) echo 21 ;;
+        http) [[ "$HTTP_ENDPOINT" == https://* ]] && echo 443 || echo 80 ;;
+        *) echo 22 ;;
+    esac
+}
+
+# Exécution d'un atomique, sorties standard et d'erreur fusionnées
+run_atomic_merged() {
+    "$@" 2>&1
+}
+
 # Exécution d'un script atomique avec retry
 execute_atomic_with_retry() {
     local script_name="$1"
@@ -424,6 +446,13 @@ execute_atomic_with_retry() {
     local script_path="$ATOMIC_SCRIPTS_DIR/$script_name"
     log_debug "Exécution avec retry: $script_path ${script_args[*]}"
     
+    # Échec immédiat si l'hôte est connu hors service (disjoncteur ouvert)
+    if declare -F retry_run >/dev/null; then
+        retry_run --host "$TARGET_HOST" --port "$(get_service_port)" --attempts "$RETRY_ATTEMPTS" \
+            -- run_atomic_merged "$script_path" --json-only "${script_args[@]}"
+        return
+    fi
+    
     local attempt=1
     local max_attempts=$RETRY_ATTEMPTS
     local result=""
@@ -27,6 +27,10 @@ JSON_ONLY=${JSON_ONLY:-0}
 # Chemin vers les scripts atomiques
 ATOMIC_SCRIPTS_DIR="${ATOMIC_SCRIPTS_DIR:-$(dirname "$0")/../../atomics/network}"
 
+# Traçage des étapes (actif avec ATOMICOPS_TRACE=1 ou une trace héritée, voir lib/trace.sh)
+LIB_DIR="$(dirname "$0")/../../lib"
+source "$LIB_DIR/trace.sh"
+
 # Variables de configuration serveur cible
 TARGET_HOST=""
 TARGET_USER=""
@@ -340,17 +344,17 @@ execute_atomic_script() {
     local script_path="$ATOMIC_SCRIPTS_DIR/$script_name"
     log_debug "Exécution: $script_path ${script_args[*]}"
     
-    local start_time=$(date +%s%3N)
+    local start_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
     local result=""
     local exit_code=0
     
-    if result=$("$script_path" --json-only "${script_args[@]}" 2>&1); then
+    if result=$(trace_run "$script_name" "$script_path" --json-only "${script_args[@]}" 2>&1); then
         exit_code=0
     else
         exit_code=$?
     fi
     
-    local end_time=$(date +%s%3N)
+    local end_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
     local duration=$((end_time - start_time))
     
     log_debug "Script $script_name terminé (code: $exit_code, durée: ${duration}ms)"
@@ -364,7 +368,7 @@ execute_atomic_script() {
 step_ssh_connectivity() {
     log_info "=== ÉTAPE 1: Test de connectivité SSH ==="
     
-    local start_time=$(date +%s%3N)
+    local start_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
     local ssh_args=(
         --host "$TARGET_HOST"
         --user "$TARGET_USER"
@@ -377,7 +381,7 @@ step_ssh_connectivity() {
     
     local ssh_result
     if ssh_result=$(execute_atomic_script "ssh-connect.sh" "${ssh_args[@]}"); then
-        local end_time=$(date +%s%3N)
+        local end_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
         local duration=$((end_time - start_time))
         
         SSH_CONNECTION_OK=1
@@ -385,7 +389,7 @@ step_ssh_connectivity() {
         log_info "Connectivité SSH établie avec succès"
         return 0
     else
-        local end_time=$(date +%s%3N)
+        local end_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
         local duration=$((end_time - start_time))
         
         update_step_status "ssh_connectivity" "error" "$duration"
@@ -399,7 +403,7 @@ step_ssh_connectivity() {
 step_environment_preparation() {
     log_info "=== ÉTAPE 2: Préparation environnement distant ==="
     
-    local start_time=$(date +%s%3N)
+    local start_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
     
     # Commandes de préparation
     local prep_commands=(
@@ -423,7 +427,7 @@ step_environment_preparation() {
         
         local exec_result
         if ! exec_result=$(execute_atomic_script "ssh-execute-command.sh" "${exec_args[@]}"); then
-            local end_time=$(date +%s%3N)
+            local end_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
             local duration=$((end_time - start_time))
             
             update_step_status "environment_prep" "error" "$duration"
@@ -435,7 +439,7 @@ step_environment_preparation() {
         log_debug "Commande réussie: $cmd"
     done
     
-    local end_time=$(date +%s%3N)
+    local end_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
     local duration=$((end_time - start_time))
     
     update_step_status "environment_prep" "success" "$duration"
@@ -447,7 +451,7 @@ step_environment_preparation() {
 step_backup_existing() {
     log_info "=== ÉTAPE 3: Sauvegarde de l'existant ==="
     
-    local start_time=$(date +%s%3N)
+    local start_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
     
     # Vérifier si le répertoire de déploiement existe déjà
     local check_args=(
@@ -489,7 +493,7 @@ step_backup_existing() {
         fi
     fi
     
-    local end_time=$(date +%s%3N)
+    local end_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
     local duration=$((end_time - start_time))
     
     update_step_status "backup_existing" "success" "$duration"
@@ -500,7 +504,7 @@ step_backup_existing() {
 step_deployment_transfer() {
     log_info "=== ÉTAPE 4: Transfert du package ==="
     
-    local start_time=$(date +%s%3N)
+    local start_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
     
     local transfer_args=(
         --host "$TARGET_HOST"
@@ -521,7 +525,7 @@ step_deployment_transfer() {
     
     local transfer_result
     if transfer_result=$(execute_atomic_script "scp-transfer.sh" "${transfer_args[@]}"); then
-        local end_time=$(date +%s%3N)
+        local end_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
         local duration=$((end_time - start_time))
         
         DEPLOYMENT_OK=1
@@ -534,7 +538,7 @@ step_deployment_transfer() {
         log_info "Transfert réussi: $transfer_size octets à ${transfer_speed} KB/s"
         return 0
     else
-        local end_time=$(date +%s%3N)
+        local end_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
         local duration=$((end_time - start_time))
         
         update_step_status "deployment_transfer" "error" "$duration"
@@ -554,7 +558,7 @@ step_service_health_check() {
         return 0
     fi
     
-    local start_time=$(date +%s%3N)
+    local start_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
     
     # Attendre quelques secondes pour que le service démarre
     log_info "Attente du démarrage du service (10s)..."
@@ -568,7 +572,7 @@ step_service_health_check() {
     
     local health_result
     if health_result=$(execute_atomic_script "http-request.sh" "${health_args[@]}"); then
-        local end_time=$(date +%s%3N)
+        local end_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
         local duration=$((end_time - start_time))
         
         local status_code=$(echo "$health_result" | jq -r '.data.response.status_code // 0')
@@ -585,7 +589,7 @@ step_service_health_check() {
             return 4
         fi
     else
-        local end_time=$(date +%s%3N)
+        local end_time=$(( ${EPOCHREALTIME/[.,]/} / 1000 ))
         local duration=$((end_time - start_time))
         
         update_step_status "service_health" "error" "$duration"
@@ -630,31 +634,31 @@ orchestrate() {
     local failed_step=""
     
     # Étape 1: Connectivité SSH
-    if ! step_ssh_connectivity; then
+    if ! trace_run "step:ssh_connectivity" step_ssh_connectivity; then
         overall_success=0
         failed_step="ssh_connectivity"
     fi
     
     # Étape 2: Préparation environnement (si SSH OK)
-    if [[ $overall_success -eq 1 ]] && ! step_environment_preparation; then
+    if [[ $overall_success -eq 1 ]] && ! trace_run "step:environment_prep" step_environment_preparation; then
         overall_success=0
         failed_step="environment_prep"
     fi
     
     # Étape 3: Sauvegarde existant
-    if [[ $overall_success -eq 1 ]] && ! step_backup_existing; then
+    if [[ $overall_success -eq 1 ]] && ! trace_run "step:backup_existing" step_backup_existing; then
         overall_success=0
         failed_step="backup_existing"
     fi
     
     # Étape 4: Transfert déploiement
-    if [[ $overall_success -eq 1 ]] && ! step_deployment_transfer; then
+    if [[ $overall_success -eq 1 ]] && ! trace_run "step:deployment_transfer" step_deployment_transfer; then
         overall_success=0
         failed_step="deployment_transfer"
     fi
     
     # Étape 5: Vérification santé (si transfert OK)
-    if [[ $overall_success -eq 1 ]] && ! step_service_health_check; then
+    if [[ $overall_success -eq 1 ]] && ! trace_run "step:service_health" step_service_health_check; then
         overall_success=0
         failed_step="service_health"
     fi
@@ -772,11 +776,13 @@ main() {
     # Validation des prérequis
     validate_prerequisites
     
-    # Exécution de l'orchestration
+    # Exécution de l'orchestration (span racine du workflow si le traçage est actif)
     local exit_code=0
     local result_message="Déploiement orchestré avec succès"
     
-    if orchestrate; then
+    declare -F trace_init >/dev/null && trace_init "$SCRIPT_NAME"
+    
+    if trace_run "$SCRIPT_NAME" orchestrate; then
         result_message="Déploiement réseau complété avec succès ($CURRENT_STEP/$TOTAL_STEPS étapes)"
         exit_code=0
     else
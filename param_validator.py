@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Compilateur de validation des paramètres pour AtomicOps-Suite
+
+Source unique: la table input_parameter_types (database/input_parameter_types.sql ou la base
+du catalogue) et script_parameters. Les règles sont compilées une fois:
+- en validateurs Python (regex précompilées, longueurs, bornes numériques)
+- en bibliothèque bash générée (lib/validators.generated.sh) n'utilisant que [[ =~ ]] et (( ))
+
+La validation en masse (paramètres d'un workflow, inventaire de flotte) se fait en une passe.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+
+from trace_collector import DEFAULT_CATALOG_DB
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TYPES_SQL = os.path.join(BASE_DIR, "database", "input_parameter_types.sql")
+GENERATED_BASH = os.path.join(BASE_DIR, "lib", "validators.generated.sh")
+
+# Compléments aux lignes de la table: regex absentes (NULL) et bornes numériques
+# annoncées dans validation_message mais non exprimables en regex
+TYPE_OVERRIDES = {
+    "url": {"regex": r"^(https?|ftp)://[^\s/?#]+[^\s]*$"},
+    "timeout": {"min_value": 1, "max_value": 86400},
+    # Noms de connexion POSIX réels (john.doe, compte machine$), pas seulement [a-zA-Z0-9_-]
+    "username": {"regex": r"^[a-zA-Z0-9_][a-zA-Z0-9_.-]{0,31}[$]?$",
+                 "validation_message": "Username invalide (lettres, chiffres, ., _ et -)"},
+}
+
+# Types de script_parameters.param_type sans équivalent dans input_parameter_types
+BUILTIN_TYPES = [
+    {"type_name": "integer", "validation_regex": r"^-?[0-9]+$", "validation_message": "Entier invalide"},
+    {"type_name": "boolean", "validation_regex": r"^(true|false|yes|no|0|1)$",
+     "validation_message": "Booléen invalide (true/false, yes/no, 0/1)"},
+    {"type_name": "string", "validation_regex": None, "validation_message": "Chaîne invalide"},
+    {"type_name": "ipv6",
+     "validation_regex": r"^(([0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}|(([0-9a-fA-F]{1,4}:){1,7}|:)"
+                         r":(([0-9a-fA-F]{1,4}:){0,6}[0-9a-fA-F]{1,4})?)(%[0-9a-zA-Z_.-]+)?$",
+     "validation_message": "Adresse IPv6 invalide (ex: 2001:db8::10, fe80::1%eth0)", "max_length": 64},
+]
+
+# script_parameters.param_type -> type d'input
+PARAM_TYPE_MAP = {
+    "ip_address": "ip",
+    "file_path": "path",
+    "directory_path": "path",
+    "url": "url",
+    "email": "email",
+    "integer": "integer",
+    "boolean": "boolean",
+    "string": "string",
+}
+
+# Noms de colonnes d'inventaire reconnus sans --field
+FIELD_ALIASES = {
+    "ip": "ip", "ip_address": "ip", "address": "ip", "host_ip": "ip",
+    "hostname": "hostname", "host": "hostname", "fqdn": "hostname",
+    "port": "port", "ssh_port": "port",
+    "user": "username", "username": "username", "ssh_user": "username",
+    "email": "email", "url": "url", "device": "device", "path": "path",
+    "iqn": "iqn", "size": "size", "timeout": "timeout", "token": "token",
+}
+
+
+class ValidationRule:
+    """Règle compilée d'un type d'input"""
+
+    __slots__ = ("name", "pattern", "regex", "message", "min_length", "max_length", "min_value", "max_value")
+
+    def __init__(self, name, pattern=None, message=None, min_length=None, max_length=None,
+                 min_value=None, max_value=None):
+        self.name = name
+        self.pattern = pattern
+        self.regex = re.compile(pattern) if pattern else None
+        self.message = message or f"Valeur invalide pour {name}"
+        self.min_length = min_length
+        self.max_length = max_length
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def __call__(self, value):
+        """None si valide, sinon le message d'erreur"""
+        value = "" if value is None else str(value)
+        if "\n" in value:
+            return self.message
+        if self.min_length is not None and len(value) < self.min_length:
+            return self.message
+        if self.max_length is not None and len(value) > self.max_length:
+            return self.message
+        if self.regex is not None and not self.regex.match(value):
+            return self.message
+        if self.min_value is not None or self.max_value is not None:
+            try:
+                number = int(value)
+            except ValueError:
+                return self.message
+            if (self.min_value is not None and number < self.min_value) or \
+                    (self.max_value is not None and number > self.max_value):
+                return self.message
+        return None
+
+
+def to_ere(pattern):
+    """Traduit une regex Python de la table en ERE POSIX pour [[ =~ ]]"""
+    out = []
+    i = 0
+    in_bracket = False
+    bracket_dash = False
+    while i < len(pattern):
+        c = pattern[i]
+        if in_bracket:
+            if c == "\\" and i + 1 < len(pattern):
+                n = pattern[i + 1]
+                if n == "-":
+                    bracket_dash = True
+                elif n == "d":
+                    out.append("0-9")
+                elif n == "s":
+                    out.append("[:space:]")
+                elif n == "w":
+                    out.append("[:alnum:]_")
+                elif n == "0":
+                    pass  # NUL: impossible dans une variable bash
+                else:
+                    out.append(n)
+                i += 2
+                continue
+            if c == "]" and out[-1] not in ("[", "[^"):
+                if bracket_dash:
+                    out.append("-")
+                out.append("]")
+                in_bracket = False
+                i += 1
+                continue
+            out.append(c)
+            i += 1
+            continue
+
+        if c == "[":
+            in_bracket, bracket_dash = True, False
+            if pattern[i + 1:i + 2] == "^":
+                out.append("[^")
+                i += 2
+            else:
+                out.append("[")
+                i += 1
+            continue
+        if pattern.startswith("(?:", i):
+            out.append("(")
+            i += 3
+            continue
+        if c == "\\" and i + 1 < len(pattern):
+            n = pattern[i + 1]
+            out.append({"d": "[0-9]", "s": "[[:space:]]", "S": "[^[:space:]]", "w": "[[:alnum:]_]",
+                        "-": "-"}.get(n, "\\" + n))
+            i += 2
+            continue
+        out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def _load_type_rows(db_path=DEFAULT_CATALOG_DB):
+    """Lignes input_parameter_types: base du catalogue si présente, sinon le script SQL"""
+    rows = None
+    if db_path and os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = [dict(r) for r in conn.execute("SELECT * FROM input_parameter_types")]
+        except sqlite3.OperationalError:
+            rows = None
+        finally:
+            conn.close()
+    if not rows:
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        with open(TYPES_SQL, encoding="utf-8") as f:
+            conn.executescript(f.read())
+        rows = [dict(r) for r in conn.execute("SELECT * FROM input_parameter_types")]
+        conn.close()
+    return rows
+
+
+def _load_script_parameters(db_path=DEFAULT_CATALOG_DB):
+    if not db_path or not os.path.exists(db_path):
+        return []
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(r) for r in conn.execute("""
+            SELECT s.name AS script, p.param_name, p.param_type, p.is_required, p.validation_pattern
+            FROM script_parameters p JOIN scripts s ON s.id = p.script_id
+            ORDER BY s.name, p.id
+        """)]
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+
+class ValidatorRegistry:
+    """Ensemble des validateurs compilés (types et paramètres de scripts)"""
+
+    def __init__(self, type_rows, param_rows=()):
+        self.rules = {}
+        for row in list(type_rows) + BUILTIN_TYPES:
+            spec = dict(row)
+            spec.update(TYPE_OVERRIDES.get(spec["type_name"], {}))
+            self.rules[spec["type_name"]] = ValidationRule(
+                spec["type_name"],
+                spec.get("regex", spec.get("validation_regex")),
+                spec.get("validation_message"),
+                spec.get("min_length"),
+                spec.get("max_length"),
+                spec.get("min_value"),
+                spec.get("max_value"),
+            )
+
+        # script -> [(param, type, requis, regex propre au paramètre)]
+        self.script_params = {}
+        for row in param_rows:
+            pattern = row.get("validation_pattern")
+            self.script_params.setdefault(row["script"], []).append((
+                row["param_name"],
+                PARAM_TYPE_MAP.get(row["param_type"], "string"),
+                bool(row["is_required"]),
+                re.compile(pattern) if pattern else None,
+            ))
+
+    @classmethod
+    def from_catalog(cls, db_path=DEFAULT_CATALOG_DB):
+        return cls(_load_type_rows(db_path), _load_script_parameters(db_path))
+
+    def validate(self, type_name, value):
+        """Message d'erreur, ou None; "ip|ipv6|hostname" accepte l'un des types"""
+        if "|" in type_name:
+            messages = [self.validate(name, value) for name in type_name.split("|")]
+            if None in messages:
+                return None
+            return f"Aucun des types {type_name}"
+        rule = self.rules.get(type_name)
+        if rule is None:
+            return f"Type inconnu: {type_name}"
+        return rule(value)
+
+    def validate_pairs(self, pairs):
+        """[(libellé, type, valeur)] -> erreurs, en une passe"""
+        errors = []
+        for label, type_name, value in pairs:
+            message = self.validate(type_name, value)
+            if message:
+                errors.append({"field": label, "type": type_name, "value": value, "message": message})
+        return errors
+
+    def validate_script(self, script, values):
+        """Valide les paramètres fournis à un script selon script_parameters"""
+        params = self.script_params.get(script)
+        if params is None:
+            return [{"field": None, "type": None, "value": None, "message": f"Script sans paramètres connus: {script}"}]
+        errors = []
+        for name, type_name, required, pattern in params:
+            value = values.get(name)
+            if value in (None, ""):
+                if required:
+                    errors.append({"field": name, "type": type_name, "value": value,
+                                   "message": "Paramètre obligatoire manquant"})
+                continue
+            message = self.validate(type_name, value)
+            if not message and pattern and not pattern.match(str(value)):
+                message = f"Ne respecte pas le motif {pattern.pattern}"
+            if message:
+                errors.append({"field": name, "type": type_name, "value": value, "message": message})
+        return errors
+
+    def validate_rows(self, rows, field_types=None):
+        """Inventaire de flotte: chaque ligne est un dict, colonnes typées par field_types ou alias"""
+        errors = []
+        checked = 0
+        mapping_cache = {}
+        for index, row in enumerate(rows):
+            for field, value in row.items():
+                if field not in mapping_cache:
+                    mapping_cache[field] = (field_types or {}).get(field) or FIELD_ALIASES.get(field.lower())
+                type_name = mapping_cache[field]
+                if not type_name or value in (None, ""):
+                    continue
+                checked += 1
+                message = self.validate(type_name, value)
+                if message:
+                    errors.append({"row": index, "field": field, "type": type_name, "value": value,
+                                   "message": message})
+        return checked, errors
+
+    # ------------------------------------------------------------------
+    # Génération bash
+    # ------------------------------------------------------------------
+
+    def generate_bash(self):
+        def quote(value):
+            return "'" + str(value).replace("'", "'\\''") + "'"
+
+        lines = [
+            "#!/bin/bash",
+            "#",
+            "# Bibliothèque: validators.generated.sh",
+            "# Description: Validateurs compilés depuis input_parameter_types et script_parameters",
+            "#              (builtins [[ =~ ]] et (( )) uniquement, aucun sous-shell)",
+            "# Usage: source \"$PROJECT_ROOT/lib/validators.generated.sh\"",
+            "#",
+            "# FICHIER GÉNÉRÉ par param_validator.py compile-bash - ne pas éditer à la main",
+            "#",
+            "",
+            "[[ \"${VALIDATORS_GENERATED_LIB_LOADED:-}\" == \"1\" ]] && return 0",
+            "readonly VALIDATORS_GENERATED_LIB_LOADED=1",
+            "",
+            "declare -gA _VT_MESSAGES=()",
+            "declare -gA _VP_TYPES=() _VP_REQUIRED=() _VP_PATTERNS=() _VP_SCRIPT_PARAMS=()",
+            "declare -ga VALIDATION_ERRORS=()",
+            "VALIDATION_MESSAGE=\"\"",
+            "",
+        ]
+
+        for name, rule in self.rules.items():
+            var = f"_VT_RE_{name}"
+            body = ['    local v="$1"']
+            if rule.pattern:
+                lines.append(f"{var}={quote(to_ere(rule.pattern))}")
+            lines.append(f"_VT_MESSAGES[{name}]={quote(rule.message)}")
+            body.append('    [[ $v == *$\'\\n\'* ]] && return 1')
+            if rule.min_length is not None:
+                body.append(f"    (( ${{#v}} >= {rule.min_length} )) || return 1")
+            if rule.max_length is not None:
+                body.append(f"    (( ${{#v}} <= {rule.max_length} )) || return 1")
+            if rule.pattern:
+                body.append(f"    [[ $v =~ ${var} ]] || return 1")
+            if rule.min_value is not None or rule.max_value is not None:
+                body.append("    [[ $v =~ ^-?[0-9]{1,18}$ ]] || return 1")
+                body.append("    local n=$(( 10#${v#-} ))")
+                body.append("    [[ $v == -* ]] && n=$(( -n ))")
+                if rule.min_value is not None:
+                    body.append(f"    (( n >= {rule.min_value} )) || return 1")
+                if rule.max_value is not None:
+                    body.append(f"    (( n <= {rule.max_value} )) || return 1")
+            body.append("    return 0")
+            lines += [f"validate_type_{name}() {{"] + body + ["}", ""]
+
+        for script, params in sorted(self.script_params.items()):
+            lines.append(f"_VP_SCRIPT_PARAMS[{quote(script)}]={quote(' '.join(p[0] for p in params))}")
+            for name, type_name, required, pattern in params:
+                key = quote(f"{script}:{name}")
+                lines.append(f"_VP_TYPES[{key}]={type_name}")
+                if required:
+                    lines.append(f"_VP_REQUIRED[{key}]=1")
+                if pattern:
+                    lines.append(f"_VP_PATTERNS[{key}]={quote(to_ere(pattern.pattern))}")
+        if self.script_params:
+            lines.append("")
+
+        lines += BASH_RUNTIME.splitlines()
+        lines.append("export -f " + " ".join(
+            [f"validate_type_{name}" for name in self.rules] + ["validate_type", "validate_param_set",
+                                                                 "validate_script_params"]))
+        return "\n".join(lines) + "\n"
+
+
+BASH_RUNTIME = r'''# Valide une valeur selon un type; message dans VALIDATION_MESSAGE
+validate_type() {
+    local type="$1" value="$2"
+
+    if ! declare -F "validate_type_$type" >/dev/null; then
+        VALIDATION_MESSAGE="Type inconnu: $type"
+        return 2
+    fi
+    if "validate_type_$type" "$value"; then
+        VALIDATION_MESSAGE=""
+        return 0
+    fi
+    VALIDATION_MESSAGE="${_VT_MESSAGES[$type]}"
+    return 1
+}
+
+# Validation en une passe: validate_param_set [libellé:]type[|type...]=valeur ...
+# Toutes les erreurs sont collectées dans VALIDATION_ERRORS
+validate_param_set() {
+    local spec key label type value alternative valid
+
+    VALIDATION_ERRORS=()
+    for spec in "$@"; do
+        key="${spec%%=*}"
+        value="${spec#*=}"
+        type="${key##*:}"
+        label="${key%%:*}"
+        if [[ $type == *"|"* ]]; then
+            # Types alternatifs (ex: ip|ipv6|hostname): valide si l'un d'eux accepte la valeur
+            valid=false
+            for alternative in ${type//|/ }; do
+                validate_type "$alternative" "$value" && { valid=true; break; }
+            done
+            [[ $valid == true ]] || VALIDATION_ERRORS+=("$label: Aucun des types $type ($value)")
+            continue
+        fi
+        validate_type "$type" "$value" || VALIDATION_ERRORS+=("$label: $VALIDATION_MESSAGE ($value)")
+    done
+
+    [[ ${#VALIDATION_ERRORS[@]} -eq 0 ]] || return "${EXIT_ERROR_VALIDATION:-8}"
+}
+
+# Paramètres d'un script du catalogue: validate_script_params <script> nom=valeur ...
+validate_script_params() {
+    local script="$1"
+    shift
+    local -A given=()
+    local spec param key value
+
+    VALIDATION_ERRORS=()
+    for spec in "$@"; do
+        given["${spec%%=*}"]="${spec#*=}"
+    done
+
+    for param in ${_VP_SCRIPT_PARAMS[$script]:-}; do
+        key="$script:$param"
+        value="${given[$param]:-}"
+        if [[ -z "$value" ]]; then
+            [[ -n "${_VP_REQUIRED[$key]:-}" ]] && VALIDATION_ERRORS+=("$param: paramètre obligatoire manquant")
+            continue
+        fi
+        if ! validate_type "${_VP_TYPES[$key]}" "$value"; then
+            VALIDATION_ERRORS+=("$param: $VALIDATION_MESSAGE ($value)")
+        elif [[ -n "${_VP_PATTERNS[$key]:-}" && ! $value =~ ${_VP_PATTERNS[$key]} ]]; then
+            VALIDATION_ERRORS+=("$param: ne respecte pas ${_VP_PATTERNS[$key]} ($value)")
+        fi
+    done
+
+    [[ ${#VALIDATION_ERRORS[@]} -eq 0 ]] || return "${EXIT_ERROR_VALIDATION:-8}"
+}
+'''
+
+
+def read_inventory(path):
+    """Lignes d'un inventaire CSV, JSON (liste ou {hosts: [...]}) ou NDJSON"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            return list(csv.DictReader(f))
+        text = f.read()
+    text = text.strip()
+    if not text:
+        return []
+    if text[0] in "[{":
+        try:
+            data = json.loads(text)
+            if isinstance(data, dict):
+                data = data.get("hosts") or data.get("inventory") or [data]
+            return data
+        except json.JSONDecodeError:
+            pass
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _parse_assignments(items):
+    values = {}
+    for item in items:
+        if "=" not in item:
+            raise ValueError(f"Affectation invalide (nom=valeur attendu): {item}")
+        key, value = item.split("=", 1)
+        values[key] = value
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compilateur de validation des paramètres AtomicOps-Suite")
+    parser.add_argument("--db", default=DEFAULT_CATALOG_DB, help="Base du catalogue")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("compile-bash", help="Générer la bibliothèque bash de validateurs")
+    p.add_argument("-o", "--output", default=GENERATED_BASH)
+
+    sub.add_parser("types", help="Lister les types compilés")
+
+    p = sub.add_parser("check", help="Valider [libellé:]type=valeur ... ou les paramètres d'un script")
+    p.add_argument("--script", help="Valider nom=valeur selon script_parameters de ce script")
+    p.add_argument("values", nargs="+")
+
+    p = sub.add_parser("inventory", help="Valider un inventaire de flotte (CSV/JSON/NDJSON) en une passe")
+    p.add_argument("file")
+    p.add_argument("--field", action="append", default=[], help="colonne=type (répétable)")
+
+    args = parser.parse_args(argv)
+    registry = ValidatorRegistry.from_catalog(args.db)
+
+    if args.command == "compile-bash":
+        content = registry.generate_bash()
+        tmp = args.output + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, args.output)
+        print(f"✅ {len(registry.rules)} types, {len(registry.script_params)} scripts -> {args.output}")
+        return 0
+
+    if args.command == "types":
+        print(json.dumps({
+            name: {"regex": rule.pattern, "ere": to_ere(rule.pattern) if rule.pattern else None,
+                   "min_length": rule.min_length, "max_length": rule.max_length, "message": rule.message}
+            for name, rule in registry.rules.items()
+        }, indent=2, ensure_ascii=False))
+        return 0
+
+    try:
+        if args.command == "check":
+            values = _parse_assignments(args.values)
+            if args.script:
+                errors = registry.validate_script(args.script, values)
+            else:
+                errors = registry.validate_pairs(
+                    (key.split(":", 1)[0], key.rsplit(":", 1)[-1], value) for key, value in values.items()
+                )
+            result = {"checked": len(values), "valid": not errors, "errors": errors}
+        else:
+            field_types = _parse_assignments(args.field)
+            checked, errors = registry.validate_rows(read_inventory(args.file), field_types)
+            result = {"file": args.file, "checked": checked, "valid": not errors, "errors": errors}
+    except (OSError, ValueError) as e:
+        print(json.dumps({"error": str(e)}, ensure_ascii=False), file=sys.stderr)
+        return 2
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0 if result["valid"] else 8
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Baselines de performance par hôte pour AtomicOps-Suite
+
+Les sorties des atomiques de atomics/performance/ (JSON, ou texte clé: valeur) sont
+ingérées dans la table host_perf_samples de la base du catalogue. Pour chaque
+hôte/métrique/cible, la baseline est la médiane glissante de l'historique de l'hôte:
+un échantillon nettement moins bon que sa propre baseline est signalé comme régression.
+La commande capable filtre une liste d'hôtes selon leurs capacités mesurées, pour le
+fan-out et l'ordonnancement des workflows.
+"""
+
+import argparse
+import json
+import re
+import socket
+import sqlite3
+import statistics
+import sys
+from datetime import datetime, timedelta
+
+from trace_collector import DEFAULT_CATALOG_DB
+
+SCHEMA_SQL = '''
+CREATE TABLE IF NOT EXISTS host_perf_samples (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    host TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    target TEXT NOT NULL DEFAULT '',
+    value REAL NOT NULL,
+    source_script TEXT,
+    sampled_at DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_perf_samples_series ON host_perf_samples(host, metric, target, sampled_at);
+'''
+
+# Métrique -> (unité, sens favorable, catégorie)
+METRICS = {
+    "disk.write_mbps": ("MB/s", "higher", "disk"),
+    "disk.read_mbps": ("MB/s", "higher", "disk"),
+    "disk.latency_avg_ms": ("ms", "lower", "disk"),
+    "disk.latency_max_ms": ("ms", "lower", "disk"),
+    "io.avg_wait_ms": ("ms", "lower", "disk"),
+    "net.iperf_received_bps": ("bit/s", "higher", "network"),
+    "net.iperf_sent_bps": ("bit/s", "higher", "network"),
+    "net.iperf_retransmits": ("", "lower", "network"),
+    "net.download_mbps": ("Mbit/s", "higher", "network"),
+    "net.upload_mbps": ("Mbit/s", "higher", "network"),
+    "net.ping_avg_ms": ("ms", "lower", "network"),
+    "cpu.threads": ("", "higher", "cpu"),
+    "cpu.max_mhz": ("MHz", "higher", "cpu"),
+}
+
+# Champ de sortie des atomiques -> (métrique, champs donnant la cible)
+FIELD_METRICS = {
+    "write_speed_mbps": ("disk.write_mbps", ("target_path",)),
+    "read_speed_mbps": ("disk.read_mbps", ("target_path",)),
+    "avg_latency_ms": ("disk.latency_avg_ms", ("target",)),
+    "max_latency_ms": ("disk.latency_max_ms", ("target",)),
+    "received_bits_per_sec": ("net.iperf_received_bps", ("server",)),
+    "sent_bits_per_sec": ("net.iperf_sent_bps", ("server",)),
+    "retransmits": ("net.iperf_retransmits", ("server",)),
+    "speed_mbps": ("net.download_mbps", ("test_url",)),
+    "download_mbps": ("net.download_mbps", ("test_server",)),
+    "upload_mbps": ("net.upload_mbps", ("test_server",)),
+    "ping_avg_ms": ("net.ping_avg_ms", ("ping_host",)),
+    "ping_ms": ("net.ping_avg_ms", ("test_server",)),
+    "total_threads": ("cpu.threads", ()),
+    "max_mhz": ("cpu.max_mhz", ()),
+}
+
+WINDOW = 20
+MIN_SAMPLES = 3
+MAX_AGE_DAYS = 30
+TOLERANCE = 0.2
+MAD_FACTOR = 3.0
+
+PAIR_RE = re.compile(r'"([A-Za-z_][\w.]*)"\s*:\s*"?([^",}\]\n]*)"?')
+LINE_RE = re.compile(r'^\s*([A-Za-z_][\w.]*)\s*:\s*(.*?)\s*$')
+NUMBER_RE = re.compile(r'^-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?')
+
+
+# ----------------------------------------------------------------------
+# Lecture des sorties
+# ----------------------------------------------------------------------
+
+def _walk_json(node, record, records):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(value, (dict, list)):
+                _walk_json(value, record, records)
+            else:
+                record[key] = "" if value is None else str(value)
+    elif isinstance(node, list):
+        for item in node:
+            if isinstance(item, (dict, list)):
+                child = {}
+                records.append(child)
+                _walk_json(item, child, records)
+
+
+def parse_records(text):
+    """Découpe une sortie d'atomique en enregistrements {champ: valeur}"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, (dict, list)):
+        root = {}
+        records = [root]
+        _walk_json(data, root, records)
+        return [r for r in records if r]
+
+    # JSON approximatif des atomiques ou texte clé: valeur ('---' ou ligne vide entre blocs)
+    pairs = PAIR_RE.findall(text)
+    if not pairs:
+        pairs = []
+        for line in text.splitlines():
+            if line.strip() in ("", "---"):
+                pairs.append(None)
+                continue
+            match = LINE_RE.match(line)
+            if match:
+                pairs.append(match.groups())
+
+    records = [{}]
+    for pair in pairs:
+        if pair is None:
+            if records[-1]:
+                records.append({})
+            continue
+        key, value = pair
+        # Une clé répétée ouvre un nouvel enregistrement
+        if key in records[-1]:
+            records.append({})
+        records[-1][key] = value.strip()
+    return [r for r in records if r]
+
+
+def _number(value):
+    match = NUMBER_RE.match(value or "")
+    return float(match.group(0)) if match else None
+
+
+def extract_metrics(records):
+    """[(métrique, cible, valeur)] à partir des enregistrements"""
+    metrics = []
+    context = {}
+    for record in records:
+        # Les champs communs (target_path, server...) valent pour les blocs suivants
+        context.update(record)
+        for field, raw in record.items():
+            if field not in FIELD_METRICS:
+                continue
+            value = _number(raw)
+            if value is None:
+                continue
+            metric, target_fields = FIELD_METRICS[field]
+            target = next((record.get(f) or context.get(f) for f in target_fields
+                           if record.get(f) or context.get(f)), "")
+            metrics.append((metric, target, value))
+
+        # Attente moyenne par E/S depuis le démarrage (get-io.stats.sh)
+        if "device" in record:
+            ops = sum(_number(record.get(f)) or 0 for f in ("reads", "writes"))
+            wait = sum(_number(record.get(f)) or 0 for f in ("read_time_ms", "write_time_ms"))
+            if ops > 0:
+                metrics.append(("io.avg_wait_ms", record["device"], round(wait / ops, 3)))
+    return metrics
+
+
+def _parse_timestamp(records):
+    for record in records:
+        stamp = record.get("timestamp")
+        if stamp:
+            try:
+                parsed = datetime.fromisoformat(stamp)
+            except ValueError:
+                continue
+            if parsed.tzinfo:
+                parsed = parsed.astimezone().replace(tzinfo=None)
+            return parsed
+    return None
+
+
+# ----------------------------------------------------------------------
+# Stockage et baselines
+# ----------------------------------------------------------------------
+
+class PerfBaselineStore:
+    def __init__(self, db_path=DEFAULT_CATALOG_DB):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA_SQL)
+
+    def close(self):
+        self.conn.close()
+
+    def ingest(self, text, host, script=None, sampled_at=None):
+        records = parse_records(text)
+        metrics = extract_metrics(records)
+        when = sampled_at or _parse_timestamp(records) or datetime.now()
+        stamp = when.strftime("%Y-%m-%d %H:%M:%S")
+        with self.conn:
+            self.conn.executemany(
+                """INSERT INTO host_perf_samples (host, metric, target, value, source_script, sampled_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                [(host, metric, target, value, script, stamp) for metric, target, value in metrics],
+            )
+        return metrics
+
+    def _series(self, hosts=None, metrics=None, max_age_days=MAX_AGE_DAYS):
+        """{(hôte, métrique, cible): [valeurs, de la plus récente à la plus ancienne]}"""
+        since = (datetime.now() - timedelta(days=max_age_days)).strftime("%Y-%m-%d %H:%M:%S")
+        sql = "SELECT host, metric, target, value FROM host_perf_samples WHERE sampled_at >= ?"
+        params = [since]
+        for column, values in (("host", hosts), ("metric", metrics)):
+            if values:
+                sql += f" AND {column} IN ({','.join('?' * len(values))})"
+                params.extend(values)
+        sql += " ORDER BY host, metric, target, sampled_at DESC, id DESC"
+
+        series = {}
+        for host, metric, target, value in self.conn.execute(sql, params):
+            series.setdefault((host, metric, target), []).append(value)
+        return series
+
+    def baselines(self, hosts=None, metrics=None, window=WINDOW, min_samples=MIN_SAMPLES,
+                  tolerance=TOLERANCE, max_age_days=MAX_AGE_DAYS):
+        """Compare le dernier échantillon de chaque série à la médiane des précédents"""
+        report = []
+        for (host, metric, target), values in sorted(self._series(hosts, metrics, max_age_days).items()):
+            latest, history = values[0], values[1:window + 1]
+            direction = METRICS.get(metric, ("", "higher", "other"))[1]
+            entry = {
+                "host": host,
+                "metric": metric,
+                "target": target,
+                "latest": latest,
+                "samples": len(history) + 1,
+                "baseline": None,
+                "delta_pct": None,
+                "status": "insufficient",
+            }
+            if len(history) >= min_samples:
+                baseline = statistics.median(history)
+                spread = statistics.median(abs(v - baseline) for v in history) * 1.4826
+                delta = latest - baseline
+                worse = -delta if direction == "higher" else delta
+                entry["baseline"] = baseline
+                entry["delta_pct"] = round(100.0 * delta / baseline, 1) if baseline else None
+                # Régression: au-delà de la tolérance relative et du bruit habituel de l'hôte
+                regressed = worse > abs(baseline) * tolerance and worse > MAD_FACTOR * spread
+                entry["status"] = "regressed" if regressed else "ok"
+            report.append(entry)
+        return report
+
+    def host_profile(self, hosts=None, window=WINDOW, max_age_days=MAX_AGE_DAYS, **kwargs):
+        """{hôte: {"metrics": {métrique: médiane récente}, "regressed": [...]}}"""
+        profile = {}
+        values = {}
+        for (host, metric, _), series in self._series(hosts, None, max_age_days).items():
+            values.setdefault(host, {}).setdefault(metric, []).extend(series[:window])
+        for host, metrics in values.items():
+            profile[host] = {
+                "metrics": {m: statistics.median(v) for m, v in metrics.items()},
+                "regressed": [],
+            }
+        for entry in self.baselines(hosts, window=window, max_age_days=max_age_days, **kwargs):
+            if entry["status"] == "regressed":
+                profile[entry["host"]]["regressed"].append(
+                    f"{entry['metric']}{'@' + entry['target'] if entry['target'] else ''}")
+        return profile
+
+    def capable(self, hosts, requirements=(), exclude_regressed=True, strict=False, rank=None):
+        """Hôtes satisfaisant les exigences [(métrique, opérateur, seuil)], les meilleurs d'abord"""
+        profile = self.host_profile(hosts or None)
+        candidates = hosts or sorted(profile)
+        selected = []
+        rejected = {}
+        for host in candidates:
+            info = profile.get(host)
+            if info is None:
+                if strict:
+                    rejected[host] = "aucune mesure"
+                else:
+                    selected.append(host)
+                continue
+            if exclude_regressed and info["regressed"]:
+                rejected[host] = "régression: " + ", ".join(info["regressed"])
+                continue
+            reason = None
+            for metric, op, threshold in requirements:
+                value = info["metrics"].get(metric)
+                if value is None:
+                    if strict:
+                        reason = f"{metric} inconnu"
+                        break
+                    continue
+                if not OPERATORS[op](value, threshold):
+                    reason = f"{metric}={value:g} (exigé {op} {threshold:g})"
+                    break
+            if reason:
+                rejected[host] = reason
+            else:
+                selected.append(host)
+
+        if rank:
+            higher = METRICS.get(rank, ("", "higher", ""))[1] == "higher"
+
+            def key(host):
+                value = profile.get(host, {}).get("metrics", {}).get(rank)
+                if value is None:
+                    return (1, 0)
+                return (0, -value if higher else value)
+            selected.sort(key=key)
+        return selected, rejected
+
+
+OPERATORS = {
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+}
+REQUIREMENT_RE = re.compile(r"^([\w.]+)\s*(>=|<=|>|<)\s*(-?[\d.]+)$")
+
+
+def parse_requirement(text):
+    match = REQUIREMENT_RE.match(text.strip())
+    if not match or match.group(1) not in METRICS:
+        raise argparse.ArgumentTypeError(f"exigence invalide: {text} (ex: disk.write_mbps>=200)")
+    return match.group(1), match.group(2), float(match.group(3))
+
+
+def _format_value(value):
+    return "-" if value is None else f"{value:g}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Baselines de performance par hôte")
+    parser.add_argument("--db", default=DEFAULT_CATALOG_DB, help="Base du catalogue")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="Ingérer la sortie d'un atomique de performance")
+    p_ingest.add_argument("file", nargs="?", default="-", help="Fichier de sortie (défaut: stdin)")
+    p_ingest.add_argument("--host", default=socket.gethostname())
+    p_ingest.add_argument("--script", help="Atomique ayant produit la sortie")
+
+    for name, help_text in (("report", "Baselines et écarts par hôte"),
+                            ("regressions", "Séries en régression (code 1 si au moins une)")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("hosts", nargs="*")
+        p.add_argument("--metric", action="append")
+        p.add_argument("--window", type=int, default=WINDOW)
+        p.add_argument("--tolerance", type=float, default=TOLERANCE, help="Écart relatif toléré (0.2 = 20%%)")
+        p.add_argument("--json", action="store_true")
+
+    p_capable = sub.add_parser("capable", help="Filtrer des hôtes selon leurs capacités mesurées")
+    p_capable.add_argument("hosts", nargs="*", help="Hôtes candidats (défaut: tous les hôtes connus)")
+    p_capable.add_argument("-r", "--require", action="append", type=parse_requirement, default=[],
+                           help="Exigence, ex: disk.write_mbps>=200 (répétable)")
+    p_capable.add_argument("--rank", choices=sorted(METRICS), help="Trier du meilleur au moins bon")
+    p_capable.add_argument("--include-regressed", action="store_true")
+    p_capable.add_argument("--strict", action="store_true", help="Rejeter les hôtes sans mesure")
+    p_capable.add_argument("--json", action="store_true")
+
+    args = parser.parse_args(argv)
+    store = PerfBaselineStore(args.db)
+    try:
+        if args.command == "ingest":
+            if args.file == "-":
+                text = sys.stdin.read()
+            else:
+                with open(args.file, encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+            metrics = store.ingest(text, args.host, args.script)
+            if not metrics:
+                print("❌ Aucune métrique reconnue dans la sortie", file=sys.stderr)
+                return 8
+            print(f"✅ {len(metrics)} mesures enregistrées pour {args.host}", file=sys.stderr)
+            return 0
+
+        if args.command in ("report", "regressions"):
+            report = store.baselines(args.hosts or None, args.metric, args.window, tolerance=args.tolerance)
+            if args.command == "regressions":
+                report = [e for e in report if e["status"] == "regressed"]
+            if args.json:
+                print(json.dumps(report, indent=2, ensure_ascii=False))
+            else:
+                for e in report:
+                    icon = {"ok": "✅", "regressed": "🔻"}.get(e["status"], "…")
+                    delta = "" if e["delta_pct"] is None else f"{e['delta_pct']:+.1f}%"
+                    unit = METRICS.get(e["metric"], ("",))[0]
+                    print(f"{icon} {e['host']:<20} {e['metric']:<24} {e['target'][:24]:<24} "
+                          f"{_format_value(e['latest']):>12} {unit:<7} baseline {_format_value(e['baseline']):>12} "
+                          f"{delta:>8}  ({e['samples']} éch.)")
+            if args.command == "regressions" and report:
+                return 1
+            return 0
+
+        if args.command == "capable":
+            selected, rejected = store.capable(args.hosts, args.require, not args.include_regressed,
+                                               args.strict, args.rank)
+            if args.json:
+                print(json.dumps({"selected": selected, "rejected": rejected}, indent=2, ensure_ascii=False))
+            else:
+                for host in selected:
+                    print(host)
+                for host, reason in rejected.items():
+                    print(f"⚠️  {host} écarté: {reason}", file=sys.stderr)
+            return 0 if selected else 4
+    finally:
+        store.close()
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
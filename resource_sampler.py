@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Échantillonneur de ressources système à faible coût pour AtomicOps-Suite
+
+Le démon garde ouverts les fichiers /proc et les relit avec os.pread à intervalle fixe.
+Il calcule les deltas CPU, mémoire, IO, swap et réseau dans un tampon circulaire de taille
+fixe (array). Les scripts atomiques l'interrogent via une socket TCP locale (accessible en bash
+sans fork par /dev/tcp, voir lib/sampler.sh) au lieu de relancer grep/awk/cut sur /proc.
+
+Protocole (une requête par ligne, une réponse par ligne) :
+    snapshot [kv]          dernier échantillon (JSON, ou "clé=valeur" séparés par des espaces)
+    window <sec> [kv]      moyenne/min/max sur la fenêtre (kv: moyennes uniquement)
+    fields                 liste des champs échantillonnés
+    stats                  état du démon
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from array import array
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("ATOMICOPS_SAMPLER_PORT", "7781"))
+DEFAULT_INTERVAL = float(os.environ.get("ATOMICOPS_SAMPLER_INTERVAL", "1.0"))
+DEFAULT_CAPACITY = int(os.environ.get("ATOMICOPS_SAMPLER_CAPACITY", "3600"))
+
+FIELDS = (
+    "timestamp",
+    "cpu_usage_pct", "cpu_user_pct", "cpu_system_pct", "cpu_iowait_pct",
+    "load_1m", "load_5m", "load_15m", "procs_running",
+    "mem_total_kb", "mem_available_kb", "mem_used_kb", "mem_used_pct",
+    "mem_free_kb", "mem_buffers_kb", "mem_cached_kb",
+    "swap_total_kb", "swap_free_kb", "swap_used_kb", "swap_used_pct",
+    "swap_in_pages_s", "swap_out_pages_s",
+    "disk_read_bytes_s", "disk_write_bytes_s", "disk_busy_pct",
+    "net_rx_bytes_s", "net_tx_bytes_s",
+    "uptime_s",
+)
+FIELD_INDEX = {name: i for i, name in enumerate(FIELDS)}
+
+SECTOR_SIZE = 512
+READ_SIZE = 65536
+
+
+class ProcFile:
+    """Fichier /proc ouvert une seule fois et relu par pread"""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            self.fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            self.fd = None
+
+    def read(self):
+        if self.fd is None:
+            return ""
+        chunks = []
+        offset = 0
+        while True:
+            data = os.pread(self.fd, READ_SIZE, offset)
+            if not data:
+                break
+            chunks.append(data)
+            offset += len(data)
+            if len(data) < READ_SIZE:
+                break
+        return b"".join(chunks).decode("ascii", "replace")
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class RingBuffer:
+    """Tampon circulaire d'échantillons de largeur fixe (array de doubles)"""
+
+    def __init__(self, capacity, width=len(FIELDS)):
+        self.capacity = capacity
+        self.width = width
+        self.data = array('d', bytes(8 * capacity * width))
+        self.head = 0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def append(self, sample):
+        with self.lock:
+            start = self.head * self.width
+            self.data[start:start + self.width] = array('d', sample)
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def latest(self):
+        with self.lock:
+            if self.count == 0:
+                return None
+            start = ((self.head - 1) % self.capacity) * self.width
+            return self.data[start:start + self.width].tolist()
+
+    def since(self, timestamp):
+        """Échantillons dont l'horodatage est >= timestamp, du plus ancien au plus récent"""
+        samples = []
+        with self.lock:
+            for i in range(1, self.count + 1):
+                start = ((self.head - i) % self.capacity) * self.width
+                if self.data[start] < timestamp:
+                    break
+                samples.append(self.data[start:start + self.width].tolist())
+        samples.reverse()
+        return samples
+
+
+class ResourceSampler:
+    def __init__(self, interval=DEFAULT_INTERVAL, capacity=DEFAULT_CAPACITY):
+        self.interval = interval
+        self.buffer = RingBuffer(capacity)
+        self.files = {
+            "stat": ProcFile("/proc/stat"),
+            "meminfo": ProcFile("/proc/meminfo"),
+            "loadavg": ProcFile("/proc/loadavg"),
+            "uptime": ProcFile("/proc/uptime"),
+            "vmstat": ProcFile("/proc/vmstat"),
+            "diskstats": ProcFile("/proc/diskstats"),
+            "netdev": ProcFile("/proc/net/dev"),
+        }
+        self.block_devices = self._list_block_devices()
+        self.previous = None
+        self.samples_taken = 0
+        self.started_at = time.time()
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _list_block_devices():
+        """Disques entiers uniquement (les partitions ne figurent pas dans /sys/block)"""
+        try:
+            names = os.listdir("/sys/block")
+        except OSError:
+            return set()
+        return {n for n in names if not n.startswith(("loop", "ram", "zram"))}
+
+    def close(self):
+        for proc_file in self.files.values():
+            proc_file.close()
+
+    # === Lecture des compteurs bruts ===
+
+    def _read_counters(self):
+        counters = {"time": time.monotonic()}
+
+        for line in self.files["stat"].read().splitlines():
+            if line.startswith("cpu "):
+                values = [int(v) for v in line.split()[1:]]
+                values += [0] * (8 - len(values))
+                user, nice, system, idle, iowait, irq, softirq, steal = values[:8]
+                counters["cpu_user"] = user + nice
+                counters["cpu_system"] = system + irq + softirq
+                counters["cpu_iowait"] = iowait
+                counters["cpu_idle"] = idle + iowait
+                counters["cpu_total"] = user + nice + system + idle + iowait + irq + softirq + steal
+            elif line.startswith("procs_running"):
+                counters["procs_running"] = int(line.split()[1])
+
+        meminfo = {}
+        for line in self.files["meminfo"].read().splitlines():
+            key, _, rest = line.partition(":")
+            parts = rest.split()
+            if parts:
+                meminfo[key] = int(parts[0])
+        counters["meminfo"] = meminfo
+
+        loadavg = self.files["loadavg"].read().split()
+        counters["loadavg"] = [float(v) for v in loadavg[:3]] if len(loadavg) >= 3 else [0.0, 0.0, 0.0]
+
+        uptime = self.files["uptime"].read().split()
+        counters["uptime"] = float(uptime[0]) if uptime else 0.0
+
+        vmstat = {}
+        for line in self.files["vmstat"].read().splitlines():
+            key, _, value = line.partition(" ")
+            if key in ("pswpin", "pswpout"):
+                vmstat[key] = int(value)
+        counters["vmstat"] = vmstat
+
+        read_sectors = write_sectors = io_ms = 0
+        for line in self.files["diskstats"].read().splitlines():
+            parts = line.split()
+            if len(parts) >= 13 and parts[2] in self.block_devices:
+                read_sectors += int(parts[5])
+                write_sectors += int(parts[9])
+                io_ms += int(parts[12])
+        counters["disk"] = (read_sectors, write_sectors, io_ms)
+
+        rx_bytes = tx_bytes = 0
+        for line in self.files["netdev"].read().splitlines()[2:]:
+            name, _, rest = line.partition(":")
+            if name.strip() == "lo":
+                continue
+            parts = rest.split()
+            if len(parts) >= 9:
+                rx_bytes += int(parts[0])
+                tx_bytes += int(parts[8])
+        counters["net"] = (rx_bytes, tx_bytes)
+
+        return counters
+
+    # === Calcul d'un échantillon ===
+
+    def sample(self):
+        """Relit /proc, calcule les deltas et ajoute un échantillon au tampon"""
+        current = self._read_counters()
+        previous = self.previous or current
+        self.previous = current
+
+        elapsed = max(current["time"] - previous["time"], 1e-9)
+        values = [0.0] * len(FIELDS)
+
+        def put(name, value):
+            values[FIELD_INDEX[name]] = round(float(value), 3)
+
+        put("timestamp", time.time())
+
+        cpu_total = current.get("cpu_total", 0) - previous.get("cpu_total", 0)
+        if cpu_total > 0:
+            cpu_idle = current["cpu_idle"] - previous["cpu_idle"]
+            put("cpu_usage_pct", 100.0 * (cpu_total - cpu_idle) / cpu_total)
+            put("cpu_user_pct", 100.0 * (current["cpu_user"] - previous["cpu_user"]) / cpu_total)
+            put("cpu_system_pct", 100.0 * (current["cpu_system"] - previous["cpu_system"]) / cpu_total)
+            put("cpu_iowait_pct", 100.0 * (current["cpu_iowait"] - previous["cpu_iowait"]) / cpu_total)
+
+        load_1m, load_5m, load_15m = current["loadavg"]
+        put("load_1m", load_1m)
+        put("load_5m", load_5m)
+        put("load_15m", load_15m)
+        put("procs_running", current.get("procs_running", 0))
+
+        meminfo = current["meminfo"]
+        mem_total = meminfo.get("MemTotal", 0)
+        mem_available = meminfo.get("MemAvailable", meminfo.get("MemFree", 0))
+        put("mem_total_kb", mem_total)
+        put("mem_available_kb", mem_available)
+        put("mem_used_kb", mem_total - mem_available)
+        put("mem_used_pct", 100.0 * (mem_total - mem_available) / mem_total if mem_total else 0)
+        put("mem_free_kb", meminfo.get("MemFree", 0))
+        put("mem_buffers_kb", meminfo.get("Buffers", 0))
+        put("mem_cached_kb", meminfo.get("Cached", 0))
+
+        swap_total = meminfo.get("SwapTotal", 0)
+        swap_free = meminfo.get("SwapFree", 0)
+        put("swap_total_kb", swap_total)
+        put("swap_free_kb", swap_free)
+        put("swap_used_kb", swap_total - swap_free)
+        put("swap_used_pct", 100.0 * (swap_total - swap_free) / swap_total if swap_total else 0)
+
+        vm_now, vm_prev = current["vmstat"], previous["vmstat"]
+        put("swap_in_pages_s", (vm_now.get("pswpin", 0) - vm_prev.get("pswpin", 0)) / elapsed)
+        put("swap_out_pages_s", (vm_now.get("pswpout", 0) - vm_prev.get("pswpout", 0)) / elapsed)
+
+        (rd_now, wr_now, io_now), (rd_prev, wr_prev, io_prev) = current["disk"], previous["disk"]
+        put("disk_read_bytes_s", (rd_now - rd_prev) * SECTOR_SIZE / elapsed)
+        put("disk_write_bytes_s", (wr_now - wr_prev) * SECTOR_SIZE / elapsed)
+        busy_pct = (io_now - io_prev) / (elapsed * 10.0) / max(len(self.block_devices), 1)
+        put("disk_busy_pct", min(busy_pct, 100.0))
+
+        (rx_now, tx_now), (rx_prev, tx_prev) = current["net"], previous["net"]
+        put("net_rx_bytes_s", (rx_now - rx_prev) / elapsed)
+        put("net_tx_bytes_s", (tx_now - tx_prev) / elapsed)
+
+        put("uptime_s", current["uptime"])
+
+        self.buffer.append(values)
+        self.samples_taken += 1
+        return values
+
+    def run(self):
+        """Boucle d'échantillonnage à cadence fixe"""
+        if self.previous is None:
+            self.previous = self._read_counters()
+        next_tick = time.monotonic()
+        while True:
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0
+            if self._stop.wait(delay):
+                break
+            self.sample()
+
+    def stop(self):
+        self._stop.set()
+
+    # === Requêtes ===
+
+    def snapshot(self):
+        latest = self.buffer.latest()
+        if latest is None:
+            latest = self.sample()
+        return dict(zip(FIELDS, latest))
+
+    def window(self, seconds):
+        samples = self.buffer.since(time.time() - seconds)
+        result = {"window_s": seconds, "samples": len(samples), "avg": {}, "min": {}, "max": {}}
+        if not samples:
+            return result
+        for name, column in zip(FIELDS[1:], list(zip(*samples))[1:]):
+            result["avg"][name] = round(sum(column) / len(column), 3)
+            result["min"][name] = min(column)
+            result["max"][name] = max(column)
+        result["from"] = samples[0][0]
+        result["to"] = samples[-1][0]
+        return result
+
+    def stats(self):
+        return {
+            "interval_s": self.interval,
+            "capacity": self.buffer.capacity,
+            "buffered": self.buffer.count,
+            "samples_taken": self.samples_taken,
+            "uptime_s": round(time.time() - self.started_at, 3),
+            "block_devices": sorted(self.block_devices),
+        }
+
+    def handle(self, request):
+        """Traite une requête texte et retourne la réponse (une ligne)"""
+        parts = request.split()
+        if not parts:
+            return json.dumps({"error": "empty request"})
+
+        command, args = parts[0], parts[1:]
+        as_kv = "kv" in args
+
+        if command == "snapshot":
+            data = self.snapshot()
+            return format_kv(data) if as_kv else json.dumps(data)
+        if command == "window":
+            try:
+                seconds = float(args[0])
+            except (IndexError, ValueError):
+                return json.dumps({"error": "usage: window <seconds> [kv]"})
+            data = self.window(seconds)
+            return format_kv(data["avg"]) if as_kv else json.dumps(data)
+        if command == "fields":
+            return json.dumps(list(FIELDS))
+        if command == "stats":
+            return json.dumps(self.stats())
+
+        return json.dumps({"error": f"unknown command: {command}"})
+
+
+def format_kv(data):
+    """Format 'clé=valeur' lisible par bash sans fork (read -a)"""
+    def fmt(value):
+        if isinstance(value, float):
+            return str(int(value)) if value.is_integer() else f"{value:.3f}".rstrip("0").rstrip(".")
+        return str(value)
+    return " ".join(f"{key}={fmt(value)}" for key, value in data.items())
+
+
+class SamplerRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            line = raw.decode("ascii", "replace").strip()
+            if not line:
+                break
+            self.wfile.write((self.server.sampler.handle(line) + "\n").encode("ascii"))
+            self.wfile.flush()
+
+
+class SamplerServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, sampler):
+        self.sampler = sampler
+        super().__init__(address, SamplerRequestHandler)
+
+
+def query(command, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=2.0):
+    """Client minimal : envoie une requête et retourne la réponse"""
+    import socket
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((command + "\n").encode("ascii"))
+        return sock.makefile("r").readline().rstrip("\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Échantillonneur de ressources système (démon /proc)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_p = sub.add_parser("serve", help="Lance le démon d'échantillonnage")
+    serve_p.add_argument("--host", default=DEFAULT_HOST)
+    serve_p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_p.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Période en secondes")
+    serve_p.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="Taille du tampon circulaire")
+
+    query_p = sub.add_parser("query", help="Interroge un démon en cours d'exécution")
+    query_p.add_argument("--host", default=DEFAULT_HOST)
+    query_p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    query_p.add_argument("request", nargs="+", help="snapshot [kv] | window <sec> [kv] | fields | stats")
+
+    once_p = sub.add_parser("once", help="Échantillon unique sans démon")
+    once_p.add_argument("--delay", type=float, default=0.5, help="Intervalle de mesure des deltas")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "query":
+        try:
+            print(query(" ".join(args.request), args.host, args.port))
+        except OSError as e:
+            print(f"Sampler unreachable on {args.host}:{args.port}: {e}", file=sys.stderr)
+            return 4
+        return 0
+
+    if args.command == "once":
+        sampler = ResourceSampler()
+        sampler.sample()
+        time.sleep(args.delay)
+        print(json.dumps(dict(zip(FIELDS, sampler.sample())), indent=2))
+        sampler.close()
+        return 0
+
+    sampler = ResourceSampler(args.interval, args.capacity)
+    thread = threading.Thread(target=sampler.run, name="sampler", daemon=True)
+    thread.start()
+
+    server = SamplerServer((args.host, args.port), sampler)
+    print(f"📈 Resource sampler listening on {args.host}:{args.port} "
+          f"(interval {args.interval}s, capacity {args.capacity})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.stop()
+        server.server_close()
+        sampler.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Cache de résultats pour les scripts atomiques idempotents en lecture seule (AtomicOps-Suite)
+
+Les scripts déclarent leur durée de validité dans leur en-tête (`# Cache-TTL: <secondes>`).
+Les résultats sont stockés dans une base SQLite locale, indexés par (hôte, script, hash des
+arguments), avec expiration par TTL et éviction LRU bornée en nombre d'entrées et en taille.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("ATOMICOPS_CACHE_DIR", Path.home() / ".cache" / "atomicops"))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("ATOMICOPS_CACHE_MAX_ENTRIES", "1000"))
+DEFAULT_MAX_BYTES = int(os.environ.get("ATOMICOPS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+CACHE_TTL_PATTERN = re.compile(r'^#\s*Cache-TTL:\s*(\d+)\s*$', re.MULTILINE | re.IGNORECASE)
+
+# Codes de sortie alignés sur lib/common.sh
+EXIT_SUCCESS = 0
+EXIT_ERROR_USAGE = 2
+EXIT_ERROR_NOT_FOUND = 4
+
+
+def read_cache_ttl(script_path):
+    """Lit la directive Cache-TTL dans l'en-tête d'un script (None si non cacheable)"""
+    try:
+        with open(script_path, 'r', encoding='utf-8', errors='ignore') as f:
+            header = f.read(4096)
+    except OSError:
+        return None
+
+    match = CACHE_TTL_PATTERN.search(header)
+    if not match:
+        return None
+    ttl = int(match.group(1))
+    return ttl if ttl > 0 else None
+
+
+class ResultCache:
+    def __init__(self, db_path=None, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.db_path = Path(db_path) if db_path else DEFAULT_CACHE_DIR / "results.db"
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=10, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """Crée les tables du cache si nécessaire"""
+        self.conn.executescript('''
+        CREATE TABLE IF NOT EXISTS cached_results (
+            cache_key TEXT PRIMARY KEY,
+            host TEXT NOT NULL,
+            script TEXT NOT NULL,
+            args_hash TEXT NOT NULL,
+            output TEXT NOT NULL,
+            exit_code INTEGER DEFAULT 0,
+            size_bytes INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS cache_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER DEFAULT 0
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_cached_results_access ON cached_results(last_access);
+        CREATE INDEX IF NOT EXISTS idx_cached_results_script ON cached_results(host, script);
+        ''')
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def hash_args(args):
+        """Hash stable d'une liste d'arguments"""
+        return hashlib.sha256("\0".join(args).encode('utf-8')).hexdigest()[:32]
+
+    def make_key(self, host, script, args):
+        """Construit la clé (hôte, script, hash des arguments)"""
+        return f"{host}|{os.path.basename(script)}|{self.hash_args(args)}"
+
+    def _bump(self, counter, amount=1):
+        self.conn.execute('''
+            INSERT INTO cache_counters (name, value) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+        ''', (counter, amount))
+
+    def get(self, host, script, args):
+        """Retourne (output, exit_code) si une entrée valide existe, sinon None"""
+        key = self.make_key(host, script, args)
+        now = time.time()
+
+        row = self.conn.execute(
+            "SELECT output, exit_code, expires_at FROM cached_results WHERE cache_key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            self._bump("misses")
+            return None
+
+        output, exit_code, expires_at = row
+        if expires_at <= now:
+            self.conn.execute("DELETE FROM cached_results WHERE cache_key = ?", (key,))
+            self._bump("expired")
+            self._bump("misses")
+            return None
+
+        self.conn.execute("UPDATE cached_results SET last_access = ? WHERE cache_key = ?", (now, key))
+        self._bump("hits")
+        return output, exit_code
+
+    def put(self, host, script, args, output, ttl, exit_code=0):
+        """Enregistre un résultat puis applique l'éviction LRU"""
+        now = time.time()
+        size_bytes = len(output.encode('utf-8'))
+        if size_bytes > self.max_bytes:
+            return False
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO cached_results (
+                    cache_key, host, script, args_hash, output, exit_code,
+                    size_bytes, created_at, expires_at, last_access
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                self.make_key(host, script, args), host, os.path.basename(script),
+                self.hash_args(args), output, exit_code, size_bytes, now, now + ttl, now
+            ))
+            self._bump("stores")
+            self._evict(now)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def _evict(self, now):
+        """Supprime les entrées expirées puis les moins récemment utilisées au-delà des limites"""
+        self.conn.execute("DELETE FROM cached_results WHERE expires_at <= ?", (now,))
+
+        count, total = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM cached_results"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        evicted = 0
+        cursor = self.conn.execute(
+            "SELECT cache_key, size_bytes FROM cached_results ORDER BY last_access ASC"
+        )
+        victims = []
+        for cache_key, size_bytes in cursor.fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((cache_key,))
+            count -= 1
+            total -= size_bytes
+            evicted += 1
+
+        self.conn.executemany("DELETE FROM cached_results WHERE cache_key = ?", victims)
+        self._bump("evictions", evicted)
+
+    def invalidate(self, host=None, script=None):
+        """Invalide les entrées d'un hôte et/ou d'un script (tout si aucun filtre)"""
+        query = "DELETE FROM cached_results WHERE 1 = 1"
+        params = []
+        if host:
+            query += " AND host = ?"
+            params.append(host)
+        if script:
+            query += " AND script = ?"
+            params.append(os.path.basename(script))
+        return self.conn.execute(query, params).rowcount
+
+    def stats(self):
+        """Retourne les compteurs hit/miss et l'occupation du cache"""
+        counters = dict(self.conn.execute("SELECT name, value FROM cache_counters").fetchall())
+        entries, total = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM cached_results"
+        ).fetchone()
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "entries": entries,
+            "size_bytes": total,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "stores": counters.get("stores", 0),
+            "evictions": counters.get("evictions", 0),
+            "expired": counters.get("expired", 0),
+        }
+
+    def run(self, script_path, args, host="localhost", ttl=None):
+        """Exécute un script local en servant les appels répétés depuis le cache"""
+        if ttl is None:
+            ttl = read_cache_ttl(script_path)
+
+        if ttl:
+            cached = self.get(host, script_path, args)
+            if cached is not None:
+                return cached[0], cached[1], True
+
+        result = subprocess.run([str(script_path)] + list(args), stdout=subprocess.PIPE, text=True)
+        if ttl and result.returncode == 0:
+            self.put(host, script_path, args, result.stdout, ttl)
+        return result.stdout, result.returncode, False
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cache de résultats des scripts atomiques en lecture seule")
+    parser.add_argument("--db", help="Chemin de la base du cache (défaut: $ATOMICOPS_CACHE_DIR/results.db)")
+    parser.add_argument("--max-entries", type=int, default=DEFAULT_MAX_ENTRIES)
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES)
+
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Exécute un script en passant par le cache")
+    run_p.add_argument("--host", default="localhost")
+    run_p.add_argument("--ttl", type=int, help="Force le TTL (défaut: en-tête Cache-TTL du script)")
+    run_p.add_argument("script")
+    run_p.add_argument("args", nargs=argparse.REMAINDER)
+
+    get_p = sub.add_parser("get", help="Lit une entrée (code 4 si absente)")
+    get_p.add_argument("--host", default="localhost")
+    get_p.add_argument("script")
+    get_p.add_argument("args", nargs=argparse.REMAINDER)
+
+    put_p = sub.add_parser("put", help="Enregistre la sortie lue sur stdin")
+    put_p.add_argument("--host", default="localhost")
+    put_p.add_argument("--ttl", type=int, required=True)
+    put_p.add_argument("script")
+    put_p.add_argument("args", nargs=argparse.REMAINDER)
+
+    ttl_p = sub.add_parser("ttl", help="Affiche le TTL déclaré par un script")
+    ttl_p.add_argument("script")
+
+    inv_p = sub.add_parser("invalidate", help="Invalide des entrées")
+    inv_p.add_argument("--host")
+    inv_p.add_argument("--script")
+
+    sub.add_parser("stats", help="Compteurs hit/miss et occupation")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "ttl":
+        ttl = read_cache_ttl(args.script)
+        if ttl is None:
+            return EXIT_ERROR_NOT_FOUND
+        print(ttl)
+        return EXIT_SUCCESS
+
+    cache = ResultCache(args.db, args.max_entries, args.max_bytes)
+    try:
+        script_args = getattr(args, "args", None) or []
+        if script_args and script_args[0] == "--":
+            script_args = script_args[1:]
+
+        if args.command == "run":
+            output, exit_code, _ = cache.run(args.script, script_args, args.host, args.ttl)
+            sys.stdout.write(output)
+            return exit_code
+
+        if args.command == "get":
+            cached = cache.get(args.host, args.script, script_args)
+            if cached is None:
+                return EXIT_ERROR_NOT_FOUND
+            sys.stdout.write(cached[0])
+            return EXIT_SUCCESS
+
+        if args.command == "put":
+            cache.put(args.host, args.script, script_args, sys.stdin.read(), args.ttl)
+            return EXIT_SUCCESS
+
+        if args.command == "invalidate":
+            removed = cache.invalidate(args.host, args.script)
+            print(json.dumps({"invalidated": removed}))
+            return EXIT_SUCCESS
+
+        if args.command == "stats":
+            stats = cache.stats()
+            stats["db_path"] = str(cache.db_path)
+            print(json.dumps(stats, indent=2))
+            return EXIT_SUCCESS
+    finally:
+        cache.close()
+
+    return EXIT_ERROR_USAGE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Lanceur de tests parallèle et isolé pour les scripts AtomicOps-Suite
+
+- Découverte des atomiques et orchestrateurs depuis le catalogue (et le disque)
+- Vérifications par script: syntaxe (bash -n), --help, shellcheck optionnel
+- Exécution en parallèle, chaque script dans un répertoire temporaire isolé
+  (HOME, TMPDIR, logs et cache redirigés), ou dans des namespaces user+net avec unshare
+- Résultats en cache par empreinte du script et des lib/*.sh qu'il source
+  (transitivement): seuls les scripts modifiés sont relancés
+- Écriture en masse des résultats et de last_tested dans le catalogue
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from trace_collector import DEFAULT_CATALOG_DB
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LIB_DIR = os.path.join(BASE_DIR, "lib")
+SEARCH_DIRS = ("atomics", "orchestrators")
+CACHE_DB = os.path.join(
+    os.environ.get("ATOMICOPS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "atomicops")),
+    "testcache.db",
+)
+
+# À incrémenter quand les vérifications ou le calcul des empreintes changent: invalide tout le cache
+# (2: SOURCE_RE reconnaît les sources gardées, les empreintes v1 ignoraient ces bibliothèques)
+CHECKS_VERSION = 2
+
+# source/. en début de ligne ou après &&, ; ou then ([[ -f "$LIB_DIR/x.sh" ]] && source ...)
+SOURCE_RE = re.compile(
+    r"""(?:^|&&|;|\bthen)\s*(?:source|\.)\s+["']?[^"'\s]*?(?:lib/|LIB_DIR}?/)([\w.-]+\.sh)""", re.M)
+
+RESULTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS script_test_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script_id INTEGER,
+    script_name TEXT NOT NULL,
+    script_path TEXT,
+    tested_at DATETIME NOT NULL,
+    status TEXT NOT NULL,
+    duration_ms INTEGER,
+    content_hash TEXT,
+    checks TEXT,
+    output TEXT,
+    FOREIGN KEY (script_id) REFERENCES scripts(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_test_results_script ON script_test_results(script_name, tested_at);
+"""
+
+
+class ScriptTestRunner:
+    def __init__(self, db_path=DEFAULT_CATALOG_DB, cache_path=CACHE_DB, jobs=None, timeout=15,
+                 sandbox="tmpdir", shellcheck=False):
+        self.db_path = db_path
+        self.cache_path = cache_path
+        self.jobs = jobs or (os.cpu_count() or 1) * 2
+        self.timeout = timeout
+        self.sandbox = sandbox
+        self.shellcheck = shellcheck and shutil.which("shellcheck") is not None
+        self._lib_closure = {}
+        self._file_hashes = {}
+
+        if sandbox == "namespace" and not self._namespaces_available():
+            print("⚠️  unshare indisponible, repli sur le mode tmpdir", file=sys.stderr)
+            self.sandbox = "tmpdir"
+
+    @staticmethod
+    def _namespaces_available():
+        if not shutil.which("unshare"):
+            return False
+        return subprocess.run(["unshare", "--user", "--map-root-user", "--net", "true"],
+                              capture_output=True).returncode == 0
+
+    # ------------------------------------------------------------------
+    # Découverte
+    # ------------------------------------------------------------------
+
+    def discover(self, source="both", script_type=None, patterns=()):
+        """[(chemin relatif, chemin, script_id, type)] depuis le catalogue et/ou le disque
+
+        Les scripts sont identifiés par leur chemin relatif au dépôt: plusieurs scripts
+        peuvent porter le même nom (atomique et orchestrateur deploy-script.remote.sh...)"""
+        on_disk, by_name = {}, {}
+        for top in SEARCH_DIRS:
+            for root, dirs, files in os.walk(os.path.join(BASE_DIR, top)):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(".sh"):
+                        rel = os.path.relpath(os.path.join(root, name), BASE_DIR)
+                        on_disk[rel] = os.path.join(root, name)
+                        by_name.setdefault(name, []).append(rel)
+
+        scripts = {}
+        if source in ("catalog", "both") and os.path.exists(self.db_path):
+            conn = sqlite3.connect(self.db_path)
+            try:
+                for script_id, name, kind, path in conn.execute("SELECT id, name, type, path FROM scripts"):
+                    rel = self._catalog_match(name, kind, path, by_name)
+                    if rel:
+                        scripts[rel] = (rel, on_disk.get(rel, path), script_id, kind)
+            finally:
+                conn.close()
+        if source in ("disk", "both"):
+            for rel, path in on_disk.items():
+                if rel not in scripts:
+                    kind = "atomic" if rel.startswith("atomics" + os.sep) else "orchestrator"
+                    scripts[rel] = (rel, path, None, kind)
+
+        selected = []
+        for entry in sorted(scripts.values()):
+            if script_type and not entry[3].startswith(script_type):
+                continue
+            if patterns and not any(fnmatch.fnmatch(os.path.basename(entry[0]), p)
+                                    or fnmatch.fnmatch(entry[0], p) for p in patterns):
+                continue
+            selected.append(entry)
+        return selected
+
+    @staticmethod
+    def _catalog_match(name, kind, path, by_name):
+        """Chemin relatif d'une entrée du catalogue; ses chemins peuvent venir d'un autre poste
+        (C:\\...\\atomics\\x.sh): parmi les homonymes, même type puis plus long suffixe commun"""
+        if path and os.path.isfile(path):
+            return os.path.relpath(path, BASE_DIR)
+        tail = (path or "").replace("\\", "/").split("/")
+
+        def score(rel):
+            parts = rel.split(os.sep)
+            common = 0
+            while common < min(len(parts), len(tail)) and parts[-1 - common] == tail[-1 - common]:
+                common += 1
+            return rel.startswith("atomics" + os.sep) == (kind == "atomic"), common
+
+        candidates = by_name.get(name, [])
+        return max(candidates, key=score) if candidates else None
+
+    def locate(self, name, entries=None):
+        """Entrée de discover() pour un chemin ou un nom de script; None si introuvable ou
+        ambigu (homonymes: préciser le chemin)"""
+        entries = self.discover("both") if entries is None else entries
+        if os.path.isfile(name):
+            rel = os.path.relpath(os.path.abspath(name), BASE_DIR)
+            return next((e for e in entries if e[0] == rel), (rel, name, None, None))
+        rel = os.path.normpath(name)
+        matches = [e for e in entries if e[0] == rel] or [e for e in entries if os.path.basename(e[0]) == name]
+        return matches[0] if len(matches) == 1 else None
+
+    # ------------------------------------------------------------------
+    # Empreintes
+    # ------------------------------------------------------------------
+
+    def _hash_file(self, path):
+        if path not in self._file_hashes:
+            with open(path, "rb") as f:
+                self._file_hashes[path] = hashlib.sha256(f.read()).hexdigest()
+        return self._file_hashes[path]
+
+    def _sourced_libs(self, path):
+        try:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                return set(SOURCE_RE.findall(f.read()))
+        except OSError:
+            return set()
+
+    def lib_closure(self, path):
+        """Bibliothèques lib/*.sh sourcées, transitivement"""
+        pending = list(self._sourced_libs(path))
+        seen = set()
+        while pending:
+            lib = pending.pop()
+            if lib in seen:
+                continue
+            lib_path = os.path.join(LIB_DIR, lib)
+            if not os.path.isfile(lib_path):
+                continue
+            seen.add(lib)
+            if lib not in self._lib_closure:
+                self._lib_closure[lib] = self._sourced_libs(lib_path)
+            pending.extend(self._lib_closure[lib])
+        return sorted(seen)
+
+    def content_hash(self, path):
+        digest = hashlib.sha256(f"v{CHECKS_VERSION}:{self.shellcheck}".encode())
+        digest.update(self._hash_file(path).encode())
+        for lib in self.lib_closure(path):
+            digest.update(lib.encode())
+            digest.update(self._hash_file(os.path.join(LIB_DIR, lib)).encode())
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _cache_conn(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        conn = sqlite3.connect(self.cache_path)
+        # Cache antérieur indexé par nom (homonymes confondus): reconstruit
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(test_cache)")}
+        if columns and "script_path" not in columns:
+            conn.execute("DROP TABLE test_cache")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS test_cache (
+                script_path TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                duration_ms INTEGER,
+                checks TEXT,
+                output TEXT,
+                tested_at TEXT
+            )
+        """)
+        return conn
+
+    # ------------------------------------------------------------------
+    # Exécution
+    # ------------------------------------------------------------------
+
+    def _sandbox_env(self, sandbox_dir):
+        env = {
+            "PATH": os.environ.get("PATH", "/usr/local/bin:/usr/bin:/bin"),
+            "HOME": sandbox_dir,
+            "TMPDIR": sandbox_dir,
+            "LANG": os.environ.get("LANG", "C.UTF-8"),
+            "TERM": "dumb",
+            "LOG_DIR": os.path.join(sandbox_dir, "logs"),
+            "ATOMICOPS_CACHE_DIR": os.path.join(sandbox_dir, "cache"),
+            "XDG_CACHE_HOME": os.path.join(sandbox_dir, "cache"),
+            "BACKUP_DIR": os.path.join(sandbox_dir, "backups"),
+            "ATOMICOPS_TRACE": "0",
+        }
+        return env
+
+    def _run(self, cmd, sandbox_dir):
+        if self.sandbox == "namespace":
+            cmd = ["unshare", "--user", "--map-root-user", "--net", "--"] + cmd
+        started = time.monotonic()
+        try:
+            proc = subprocess.run(cmd, cwd=sandbox_dir, env=self._sandbox_env(sandbox_dir),
+                                  stdin=subprocess.DEVNULL, capture_output=True, timeout=self.timeout)
+            rc, out = proc.returncode, (proc.stdout + proc.stderr).decode("utf-8", "replace")
+        except subprocess.TimeoutExpired as e:
+            rc, out = 124, ((e.stdout or b"") + (e.stderr or b"")).decode("utf-8", "replace")
+            out += f"\n[timeout après {self.timeout}s]"
+        return rc, out, int((time.monotonic() - started) * 1000)
+
+    def run_checks(self, name, path):
+        """Exécute les vérifications d'un script dans un répertoire isolé"""
+        sandbox_dir = tempfile.mkdtemp(prefix=f"atomicops-test-{os.path.basename(name)}-")
+        checks = {}
+        outputs = []
+        started = time.monotonic()
+        try:
+            rc, out, _ = self._run(["bash", "-n", path], sandbox_dir)
+            checks["syntax"] = rc == 0
+            if rc:
+                outputs.append(out)
+
+            if checks["syntax"]:
+                rc, out, _ = self._run(["bash", path, "--help"], sandbox_dir)
+                checks["help"] = rc == 0 and bool(out.strip())
+                if not checks["help"]:
+                    outputs.append(f"--help (code {rc}):\n{out}")
+
+            if self.shellcheck:
+                rc, out, _ = self._run(["shellcheck", "-S", "error", path], sandbox_dir)
+                checks["shellcheck"] = rc == 0
+                if rc:
+                    outputs.append(out)
+        finally:
+            shutil.rmtree(sandbox_dir, ignore_errors=True)
+
+        status = "passed" if all(checks.values()) else "failed"
+        return status, checks, "\n".join(outputs)[-4000:], int((time.monotonic() - started) * 1000)
+
+    def run(self, scripts, force=False, write_catalog=True):
+        started = time.monotonic()
+        cache = self._cache_conn()
+        cached = {row[0]: row for row in cache.execute(
+            "SELECT script_path, content_hash, status, duration_ms, checks, output, tested_at FROM test_cache")}
+
+        results = []
+        to_run = []
+        for name, path, script_id, kind in scripts:
+            digest = self.content_hash(path)
+            hit = cached.get(name)
+            if not force and hit and hit[1] == digest:
+                results.append({"script": name, "type": kind, "status": hit[2], "duration_ms": hit[3],
+                                "checks": json.loads(hit[4] or "{}"), "output": hit[5], "cached": True,
+                                "tested_at": hit[6]})
+            else:
+                to_run.append((name, path, script_id, kind, digest))
+
+        fresh = []
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            futures = [(entry, pool.submit(self.run_checks, entry[0], entry[1])) for entry in to_run]
+            for (name, path, script_id, kind, digest), future in futures:
+                status, checks, output, duration = future.result()
+                tested_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                fresh.append((name, script_id, digest, status, duration, checks, output, tested_at))
+                results.append({"script": name, "type": kind, "status": status, "duration_ms": duration,
+                                "checks": checks, "output": output, "cached": False, "tested_at": tested_at})
+
+        # Écritures groupées: une transaction pour le cache, une pour le catalogue
+        with cache:
+            cache.executemany(
+                "INSERT OR REPLACE INTO test_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(n, d, s, ms, json.dumps(c), o, t) for n, _, d, s, ms, c, o, t in fresh],
+            )
+        cache.close()
+        if write_catalog and fresh and os.path.exists(self.db_path):
+            self.write_catalog(fresh)
+
+        results.sort(key=lambda r: r["script"])
+        summary = {
+            "total": len(results),
+            "passed": sum(r["status"] == "passed" for r in results),
+            "failed": sum(r["status"] == "failed" for r in results),
+            "cached": len(results) - len(fresh),
+            "executed": len(fresh),
+            "sandbox": self.sandbox,
+            "jobs": self.jobs,
+            "duration_ms": int((time.monotonic() - started) * 1000),
+        }
+        return summary, results
+
+    def write_catalog(self, fresh):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executescript(RESULTS_SCHEMA)
+                if "script_path" not in {r[1] for r in conn.execute("PRAGMA table_info(script_test_results)")}:
+                    conn.execute("ALTER TABLE script_test_results ADD COLUMN script_path TEXT")
+                conn.executemany(
+                    "UPDATE scripts SET last_tested = ? WHERE id = ?",
+                    [(t, sid) for _, sid, _, _, _, _, _, t in fresh if sid is not None],
+                )
+                conn.executemany(
+                    """INSERT INTO script_test_results
+                       (script_id, script_name, script_path, tested_at, status, duration_ms, content_hash,
+                        checks, output)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    [(sid, os.path.basename(n), n, t, s, ms, d, json.dumps(c), o)
+                     for n, sid, d, s, ms, c, o, t in fresh],
+                )
+        finally:
+            conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tests parallèles et isolés des scripts AtomicOps-Suite")
+    parser.add_argument("patterns", nargs="*",
+                        help="Filtres sur le nom ou le chemin relatif (glob), ex: 'check-*', 'orchestrators/*'")
+    parser.add_argument("--db", default=DEFAULT_CATALOG_DB, help="Base du catalogue")
+    parser.add_argument("--cache", default=CACHE_DB, help="Base du cache de résultats")
+    parser.add_argument("--source", choices=["catalog", "disk", "both"], default="both")
+    parser.add_argument("--type", choices=["atomic", "orchestrator"])
+    parser.add_argument("-j", "--jobs", type=int)
+    parser.add_argument("--timeout", type=int, default=15, help="Délai par vérification (s)")
+    parser.add_argument("--sandbox", choices=["tmpdir", "namespace"], default="tmpdir")
+    parser.add_argument("--shellcheck", action="store_true", help="Ajouter shellcheck -S error si installé")
+    parser.add_argument("--force", action="store_true", help="Ignorer le cache")
+    parser.add_argument("--no-write", action="store_true", help="Ne pas écrire dans le catalogue")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--failed-only", action="store_true", help="N'afficher que les échecs")
+    args = parser.parse_args(argv)
+
+    runner = ScriptTestRunner(args.db, args.cache, args.jobs, args.timeout, args.sandbox, args.shellcheck)
+    scripts = runner.discover(args.source, args.type, args.patterns)
+    if not scripts:
+        print("❌ Aucun script à tester", file=sys.stderr)
+        return 4
+
+    summary, results = runner.run(scripts, args.force, not args.no_write)
+
+    if args.json:
+        shown = [r for r in results if r["status"] == "failed"] if args.failed_only else results
+        print(json.dumps({"summary": summary, "results": shown}, indent=2, ensure_ascii=False))
+    else:
+        for r in results:
+            if args.failed_only and r["status"] != "failed":
+                continue
+            icon = "✅" if r["status"] == "passed" else "❌"
+            origin = "cache" if r["cached"] else f"{r['duration_ms']}ms"
+            failed = [c for c, ok in r["checks"].items() if not ok]
+            print(f"{icon} {r['script']:<60} {origin:>8}  {'échec: ' + ', '.join(failed) if failed else ''}")
+        print(f"\n📊 {summary['passed']}/{summary['total']} réussis, {summary['failed']} échecs, "
+              f"{summary['cached']} depuis le cache, {summary['executed']} exécutés "
+              f"({summary['jobs']} workers, {summary['sandbox']}) en {summary['duration_ms']}ms")
+
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Collecteur de traces pour AtomicOps-Suite (spans émis par lib/trace.sh)
+
+Les spans sont stockés dans la table trace_spans de la base du catalogue. Les spans
+d'atomiques connus du catalogue alimentent aussi script_usage_stats. Rapports:
+timeline d'un workflow, chemin critique et classement des étapes les plus lentes.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("ATOMICOPS_TRACE_PORT", "7783"))
+DEFAULT_CATALOG_DB = os.environ.get(
+    "ATOMICOPS_CATALOG_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts-catalog.db"),
+)
+DEFAULT_SPOOL = os.environ.get(
+    "ATOMICOPS_TRACE_SPOOL",
+    os.path.join(
+        os.environ.get("ATOMICOPS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "atomicops")),
+        "spans.ndjson",
+    ),
+)
+
+SCHEMA_SQL = '''
+CREATE TABLE IF NOT EXISTS trace_spans (
+    span_id TEXT PRIMARY KEY,
+    trace_id TEXT NOT NULL,
+    parent_id TEXT,
+    name TEXT NOT NULL,
+    service TEXT,
+    host TEXT,
+    start_us INTEGER NOT NULL,
+    end_us INTEGER NOT NULL,
+    duration_ms REAL NOT NULL,
+    status TEXT,
+    exit_code INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_trace_spans_trace ON trace_spans(trace_id);
+CREATE INDEX IF NOT EXISTS idx_trace_spans_name ON trace_spans(name, start_us);
+'''
+
+
+class TraceStore:
+    def __init__(self, db_path=DEFAULT_CATALOG_DB):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA_SQL)
+        self.lock = threading.Lock()
+
+    def close(self):
+        self.conn.close()
+
+    def _script_ids(self):
+        try:
+            return {row["name"]: row["id"] for row in self.conn.execute("SELECT id, name FROM scripts")}
+        except sqlite3.OperationalError:
+            return {}
+
+    def insert(self, spans):
+        """Insère un lot de spans (idempotent par span_id); retourne le nombre de nouveaux spans"""
+        rows = []
+        for span in spans:
+            try:
+                start_us, end_us = int(span["start_us"]), int(span["end_us"])
+                rows.append((
+                    span["span_id"], span["trace_id"], span.get("parent_id") or None, span["name"],
+                    span.get("service"), span.get("host"), start_us, end_us, (end_us - start_us) / 1000.0,
+                    span.get("status"), span.get("exit_code"),
+                ))
+            except (KeyError, TypeError, ValueError):
+                continue
+        if not rows:
+            return 0
+
+        with self.lock, self.conn:
+            # Insertion ligne à ligne: seuls les spans réellement nouveaux (rowcount 1)
+            # alimentent les statistiques, un lot rejoué ne compte pas deux fois
+            new_rows = []
+            for row in rows:
+                cursor = self.conn.execute('''
+                    INSERT OR IGNORE INTO trace_spans
+                        (span_id, trace_id, parent_id, name, service, host, start_us, end_us, duration_ms, status, exit_code)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', row)
+                if cursor.rowcount == 1:
+                    new_rows.append(row)
+            inserted = len(new_rows)
+
+            # Les spans d'atomiques du catalogue alimentent les statistiques d'exécution
+            script_ids = self._script_ids()
+            usage = [
+                (script_ids[r[3]], time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r[6] / 1e6)),
+                 int(r[8]), r[9] == "ok", f"host={r[5]} trace={r[1]}")
+                for r in new_rows if r[3] in script_ids
+            ]
+            if usage:
+                self.conn.executemany('''
+                    INSERT INTO script_usage_stats (script_id, execution_date, execution_time_ms, success, user_context)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', usage)
+        return inserted
+
+    def spans(self, trace_id):
+        return [dict(r) for r in self.conn.execute(
+            "SELECT * FROM trace_spans WHERE trace_id = ? ORDER BY start_us", (trace_id,)
+        )]
+
+    def latest_trace(self, workflow=None):
+        sql = "SELECT trace_id FROM trace_spans WHERE parent_id IS NULL"
+        params = ()
+        if workflow:
+            sql += " AND name = ?"
+            params = (workflow,)
+        row = self.conn.execute(sql + " ORDER BY start_us DESC LIMIT 1", params).fetchone()
+        return row["trace_id"] if row else None
+
+    def slowest(self, workflow=None, days=None, limit=20):
+        """Classement des étapes par temps cumulé, avec la part du temps des workflows"""
+        where, params = [], []
+        if days:
+            where.append("s.start_us >= ?")
+            params.append(int((time.time() - days * 86400) * 1e6))
+        if workflow:
+            where.append("s.trace_id IN (SELECT trace_id FROM trace_spans WHERE parent_id IS NULL AND name = ?)")
+            params.append(workflow)
+        clause = ("WHERE " + " AND ".join(where)) if where else ""
+
+        root_total = self.conn.execute(f'''
+            SELECT COALESCE(SUM(duration_ms), 0) FROM trace_spans s {clause}
+            {"AND" if clause else "WHERE"} s.parent_id IS NULL
+        ''', params).fetchone()[0]
+
+        rows = self.conn.execute(f'''
+            SELECT s.name, COUNT(*) AS count, SUM(s.duration_ms) AS total_ms, AVG(s.duration_ms) AS avg_ms,
+                   MAX(s.duration_ms) AS max_ms, COUNT(DISTINCT s.host) AS hosts,
+                   SUM(CASE WHEN s.status = 'ok' THEN 0 ELSE 1 END) AS errors
+            FROM trace_spans s {clause}
+            {"AND" if clause else "WHERE"} s.parent_id IS NOT NULL
+            GROUP BY s.name ORDER BY total_ms DESC LIMIT ?
+        ''', params + [limit]).fetchall()
+
+        results = []
+        for row in rows:
+            durations = [r[0] for r in self.conn.execute(
+                f"SELECT s.duration_ms FROM trace_spans s {clause} {'AND' if clause else 'WHERE'} s.name = ? "
+                "ORDER BY s.duration_ms", params + [row["name"]]
+            )]
+            entry = dict(row)
+            entry["p95_ms"] = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+            entry["pct_of_workflows"] = round(100.0 * row["total_ms"] / root_total, 1) if root_total else None
+            results.append(entry)
+        return results
+
+
+def build_tree(spans):
+    by_id = {s["span_id"]: dict(s, children=[]) for s in spans}
+    roots = []
+    for span in by_id.values():
+        parent = by_id.get(span["parent_id"])
+        if parent:
+            parent["children"].append(span)
+        else:
+            roots.append(span)
+    for span in by_id.values():
+        span["children"].sort(key=lambda s: s["start_us"])
+    roots.sort(key=lambda s: s["start_us"])
+    return roots
+
+
+def critical_path(span):
+    """Chemin critique: en remontant depuis la fin du span, l'enfant qui se termine en dernier"""
+    path = []
+    cursor = span["end_us"]
+    blocking = []
+    for child in sorted(span["children"], key=lambda s: s["end_us"], reverse=True):
+        if child["end_us"] <= cursor:
+            blocking.append(child)
+            cursor = child["start_us"]
+    children_time = sum(c["end_us"] - c["start_us"] for c in blocking)
+    path.append({
+        "name": span["name"],
+        "span_id": span["span_id"],
+        "host": span["host"],
+        "duration_ms": span["duration_ms"],
+        "self_ms": round((span["end_us"] - span["start_us"] - children_time) / 1000.0, 3),
+    })
+    for child in reversed(blocking):
+        path.extend(critical_path(child))
+    return path
+
+
+def timeline(spans):
+    roots = build_tree(spans)
+    if not roots:
+        return []
+    origin = min(s["start_us"] for s in spans)
+    lines = []
+
+    def walk(span, depth):
+        lines.append({
+            "depth": depth,
+            "name": span["name"],
+            "host": span["host"],
+            "offset_ms": round((span["start_us"] - origin) / 1000.0, 3),
+            "duration_ms": span["duration_ms"],
+            "status": span["status"],
+        })
+        for child in span["children"]:
+            walk(child, depth + 1)
+
+    for root in roots:
+        walk(root, 0)
+    return lines
+
+
+def read_spans(lines):
+    for line in lines:
+        line = line.strip()
+        if not line.startswith("{"):
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+
+def import_spool(store, spool=DEFAULT_SPOOL):
+    """Importe le fichier spool; la rotation .1 récupère les écritures tardives au passage suivant"""
+    total = 0
+    previous = spool + ".1"
+    if os.path.exists(previous):
+        with open(previous, encoding="utf-8", errors="replace") as f:
+            total += store.insert(list(read_spans(f)))
+        os.remove(previous)
+    if os.path.exists(spool):
+        os.replace(spool, previous)
+        with open(previous, encoding="utf-8", errors="replace") as f:
+            total += store.insert(list(read_spans(f)))
+    return total
+
+
+def serve(store, host=DEFAULT_HOST, port=DEFAULT_PORT, flush_interval=1.0):
+    pending = []
+    pending_lock = threading.Lock()
+    stop_event = threading.Event()
+
+    def flusher():
+        while not stop_event.wait(flush_interval):
+            with pending_lock:
+                batch = pending[:]
+                pending.clear()
+            if batch:
+                store.insert(batch)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for span in read_spans(raw.decode("utf-8", "replace") for raw in self.rfile):
+                with pending_lock:
+                    pending.append(span)
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    server = socketserver.ThreadingTCPServer((host, port), Handler)
+    flush_thread = threading.Thread(target=flusher, daemon=True)
+    flush_thread.start()
+    # Arrêt par systemd ou kill: mêmes étapes que Ctrl-C, les spans en attente sont écrits
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    print(f"🛰️  Collecteur de traces sur {host}:{port} -> {store.db_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stop_event.set()
+        flush_thread.join()
+        with pending_lock:
+            store.insert(pending)
+            pending.clear()
+
+
+def print_timeline(lines):
+    for line in lines:
+        marker = "✅" if line["status"] == "ok" else "❌"
+        print(f"{line['offset_ms']:>10.1f} ms  {'  ' * line['depth']}{marker} {line['name']} "
+              f"({line['duration_ms']:.1f} ms, {line['host']})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collecteur et rapports de traces AtomicOps-Suite")
+    parser.add_argument("--db", default=DEFAULT_CATALOG_DB, help="Base du catalogue")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="Recevoir les spans en TCP")
+    p.add_argument("--host", default=DEFAULT_HOST)
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+
+    p = sub.add_parser("import", help="Importer des spans (spool ou fichiers NDJSON)")
+    p.add_argument("files", nargs="*")
+
+    for name, help_text in (("timeline", "Timeline d'une trace"), ("critical-path", "Chemin critique d'une trace")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("trace_id", nargs="?", help="Défaut: dernière trace")
+        p.add_argument("--workflow", help="Dernière trace de ce workflow")
+
+    p = sub.add_parser("slowest", help="Étapes les plus lentes sur l'ensemble des traces")
+    p.add_argument("--workflow")
+    p.add_argument("--days", type=float)
+    p.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args(argv)
+    store = TraceStore(args.db)
+
+    try:
+        if args.command == "serve":
+            serve(store, args.host, args.port)
+            return 0
+
+        if args.command == "import":
+            if args.files:
+                count = 0
+                for path in args.files:
+                    with open(path, encoding="utf-8", errors="replace") as f:
+                        count += store.insert(list(read_spans(f)))
+            else:
+                count = import_spool(store)
+            print(f"✅ {count} spans importés -> {args.db}")
+            return 0
+
+        if args.command in ("timeline", "critical-path"):
+            trace_id = args.trace_id or store.latest_trace(args.workflow)
+            spans = store.spans(trace_id) if trace_id else []
+            if not spans:
+                print("❌ Trace introuvable", file=sys.stderr)
+                return 4
+            if args.command == "timeline":
+                lines = timeline(spans)
+                if args.json:
+                    print(json.dumps({"trace_id": trace_id, "spans": lines}, indent=2))
+                else:
+                    print(f"🧭 Trace {trace_id}")
+                    print_timeline(lines)
+            else:
+                path = [step for root in build_tree(spans) for step in critical_path(root)]
+                if args.json:
+                    print(json.dumps({"trace_id": trace_id, "critical_path": path}, indent=2))
+                else:
+                    print(f"🔥 Chemin critique de {trace_id}")
+                    for step in path:
+                        print(f"  {step['name']:<40} {step['duration_ms']:>10.1f} ms  (propre: {step['self_ms']:.1f} ms)")
+            return 0
+
+        if args.command == "slowest":
+            results = store.slowest(args.workflow, args.days, args.limit)
+            if args.json:
+                print(json.dumps(results, indent=2))
+            else:
+                print(f"{'Étape':<40} {'N':>6} {'Moy ms':>10} {'P95 ms':>10} {'Max ms':>10} {'% wf':>6}")
+                for r in results:
+                    pct = f"{r['pct_of_workflows']:.1f}" if r["pct_of_workflows"] is not None else "-"
+                    print(f"{r['name']:<40} {r['count']:>6} {r['avg_ms']:>10.1f} {r['p95_ms']:>10.1f} "
+                          f"{r['max_ms']:>10.1f} {pct:>6}")
+            return 0
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
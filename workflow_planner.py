@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Planificateur de workflows AtomicOps-Suite (simulation avant exécution)
+
+À partir d'un workflow (scripts, hôtes cibles, mode d'exécution), estime sans rien
+exécuter: le plan par vagues selon les dépendances du catalogue, la durée de chaque
+script d'après l'historique de script_usage_stats (par hôte si possible), le chemin
+critique, les octets à transférer (scripts et bibliothèques lib/ sourcées) et la
+concurrence entre hôtes qui minimise la durée totale compte tenu des limites
+(sessions simultanées, débit montant du poste de contrôle, cœurs des hôtes).
+"""
+
+import argparse
+import heapq
+import json
+import os
+import re
+import sqlite3
+import sys
+
+from perf_baseline import PerfBaselineStore
+from script_test_runner import LIB_DIR, ScriptTestRunner
+from trace_collector import DEFAULT_CATALOG_DB
+
+DEFAULT_SCRIPT_MS = 5000
+DEFAULT_BANDWIDTH_MBPS = 100.0
+DEFAULT_CONNECT_MS = 500
+MIN_SAMPLES = 3
+HISTORY_LIMIT = 200
+
+HOST_RE = re.compile(r"\bhost=(\S+)")
+
+
+def quantile(values, q):
+    ordered = sorted(values)
+    return ordered[round(q * (len(ordered) - 1))]
+
+
+def format_ms(ms):
+    seconds = ms / 1000
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+def format_bytes(size):
+    for unit in ("o", "Ko", "Mo", "Go"):
+        if size < 1024 or unit == "Go":
+            return f"{size:.0f} {unit}" if unit == "o" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class WorkflowPlanner:
+    def __init__(self, db_path=DEFAULT_CATALOG_DB, quantile=0.5, default_ms=DEFAULT_SCRIPT_MS,
+                 bandwidth_mbps=None, uplink_mbps=None, connect_ms=DEFAULT_CONNECT_MS):
+        self.db_path = db_path
+        self.quantile = quantile
+        self.default_ms = default_ms
+        self.bandwidth_mbps = bandwidth_mbps
+        self.uplink_mbps = uplink_mbps
+        self.connect_ms = connect_ms
+        self.runner = ScriptTestRunner(db_path=db_path)
+        self.warnings = []
+
+    def _connect(self):
+        if not os.path.exists(self.db_path):
+            return None
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ------------------------------------------------------------------
+    # Données du catalogue
+    # ------------------------------------------------------------------
+
+    def load_scripts(self, names):
+        """(clés, {clé: {"name", "path", "script_id", "bytes", "libs", "after"}}) pour les scripts
+        du workflow; la clé est le chemin relatif du script (même résolution que
+        script_test_runner): des scripts homonymes restent distincts"""
+        known = self.runner.discover("both")
+        keys, scripts = [], {}
+        for name in names:
+            entry = self.runner.locate(name, known)
+            base = os.path.basename(name)
+            if entry is None:
+                homonyms = [e[0] for e in known if os.path.basename(e[0]) == base]
+                self.warnings.append(
+                    f"{base}: ambigu ({', '.join(homonyms)}), préciser le chemin" if homonyms
+                    else f"{base}: introuvable sur le disque (taille inconnue)")
+                key, path, script_id = name, None, None
+            else:
+                key, path, script_id = entry[0], entry[1], entry[2]
+            keys.append(key)
+            scripts[key] = {
+                "name": base,
+                "path": path,
+                "script_id": script_id,
+                "bytes": os.path.getsize(path) if path else 0,
+                "libs": self.runner.lib_closure(path) if path else [],
+                "after": set(),
+            }
+
+        conn = self._connect()
+        if conn is None:
+            return keys, scripts
+        try:
+            aliases = {}
+            for key, info in scripts.items():
+                name = info["name"]
+                aliases.setdefault(name, key)
+                aliases.setdefault(name[:-3] if name.endswith(".sh") else name, key)
+            for key, info in scripts.items():
+                if info["script_id"] is None:
+                    continue
+                for row in conn.execute(
+                        "SELECT dependency_type, dependency_name FROM script_dependencies WHERE script_id = ?",
+                        (info["script_id"],)):
+                    dep = os.path.basename(row["dependency_name"])
+                    if row["dependency_type"] == "script" and dep in aliases and aliases[dep] != key:
+                        info["after"].add(aliases[dep])
+                    elif row["dependency_type"] == "library" and dep.endswith(".sh"):
+                        if os.path.isfile(os.path.join(LIB_DIR, dep)) and dep not in info["libs"]:
+                            info["libs"].append(dep)
+        finally:
+            conn.close()
+        return keys, scripts
+
+    def durations(self, scripts, hosts):
+        """Durée estimée de chaque script: quantile par hôte, sinon global, sinon défaut"""
+        estimates = {}
+        conn = self._connect()
+        try:
+            for name, info in scripts.items():
+                by_host, all_runs, failures = {}, [], 0
+                if conn is not None and info["script_id"] is not None:
+                    rows = conn.execute(
+                        """SELECT execution_time_ms, success, user_context FROM script_usage_stats
+                           WHERE script_id = ? AND execution_time_ms IS NOT NULL
+                           ORDER BY execution_date DESC LIMIT ?""",
+                        (info["script_id"], HISTORY_LIMIT)).fetchall()
+                    for row in rows:
+                        if not row["success"]:
+                            failures += 1
+                            continue
+                        all_runs.append(row["execution_time_ms"])
+                        match = HOST_RE.search(row["user_context"] or "")
+                        if match:
+                            by_host.setdefault(match.group(1), []).append(row["execution_time_ms"])
+
+                if len(all_runs) >= 1:
+                    fleet_ms, source = quantile(all_runs, self.quantile), "history"
+                else:
+                    fleet_ms, source = self.default_ms, "default"
+                    self.warnings.append(f"{name}: aucun historique, durée par défaut {format_ms(self.default_ms)}")
+                per_host = {
+                    host: quantile(by_host[host], self.quantile) if len(by_host.get(host, ())) >= MIN_SAMPLES
+                    else fleet_ms
+                    for host in hosts
+                }
+                total = len(all_runs) + failures
+                estimates[name] = {
+                    "estimate_ms": fleet_ms,
+                    "source": source,
+                    "samples": len(all_runs),
+                    "failure_rate": round(failures / total, 3) if total else None,
+                    "hosts": per_host,
+                }
+        finally:
+            if conn is not None:
+                conn.close()
+        return estimates
+
+    def host_capacities(self, hosts):
+        """{hôte: (débit Mbit/s, threads CPU ou None)} d'après les baselines de performance"""
+        profile = {}
+        conn = self._connect()
+        has_samples = conn is not None and conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'host_perf_samples'").fetchone()
+        if conn is not None:
+            conn.close()
+        if has_samples:
+            store = PerfBaselineStore(self.db_path)
+            try:
+                profile = store.host_profile(hosts)
+            except sqlite3.Error:
+                profile = {}
+            finally:
+                store.close()
+        capacities = {}
+        for host in hosts:
+            metrics = profile.get(host, {}).get("metrics", {})
+            mbps = self.bandwidth_mbps or metrics.get("net.upload_mbps")
+            if not mbps and metrics.get("net.iperf_received_bps"):
+                mbps = metrics["net.iperf_received_bps"] / 1e6
+            threads = metrics.get("cpu.threads")
+            capacities[host] = (mbps or DEFAULT_BANDWIDTH_MBPS, int(threads) if threads else None)
+        return capacities
+
+    # ------------------------------------------------------------------
+    # Ordonnancement
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def predecessors(order, scripts, mode):
+        """Contraintes d'ordre entre étapes (indices dans `order`, un script peut revenir):
+        chaîne en séquentiel, dépendances du catalogue en parallèle"""
+        if mode == "sequential":
+            return {i: {i - 1} if i else set() for i in range(len(order))}
+        preds = {}
+        for i, name in enumerate(order):
+            preds[i] = set()
+            for dep in scripts[name]["after"]:
+                # Occurrence la plus proche avant l'étape, sinon la première après
+                before = [j for j in range(i) if order[j] == dep]
+                after = [j for j in range(i + 1, len(order)) if order[j] == dep]
+                preds[i].add(before[-1] if before else after[0])
+        return preds
+
+    @staticmethod
+    def waves(order, preds):
+        """Tri topologique des étapes par niveaux; ValueError si cycle"""
+        remaining = {i: set(preds[i]) for i in range(len(order))}
+        done, waves = set(), []
+        while remaining:
+            wave = [i for i in sorted(remaining) if remaining[i] <= done]
+            if not wave:
+                raise ValueError("Dépendances circulaires entre: "
+                                 + ", ".join(f"#{i + 1} {order[i]}" for i in sorted(remaining)))
+            waves.append(wave)
+            done.update(wave)
+            for i in wave:
+                del remaining[i]
+        return waves
+
+    @staticmethod
+    def critical_path(steps, preds, durations):
+        """Plus long chemin; `steps` en ordre topologique (prédécesseurs d'abord)"""
+        finish, via = {}, {}
+        for step in steps:
+            start = max((finish[p] for p in preds[step]), default=0)
+            via[step] = max(preds[step], key=lambda p: finish[p]) if preds[step] else None
+            finish[step] = start + durations[step]
+        last = max(steps, key=lambda n: finish[n])
+        path = []
+        while last is not None:
+            path.append(last)
+            last = via[last]
+        return list(reversed(path)), max(finish.values())
+
+    @staticmethod
+    def host_makespan(steps, preds, durations, limit=None):
+        """Ordonnancement par listes sur un hôte (priorité au plus long chemin restant);
+        `steps` en ordre topologique"""
+        successors = {step: [n for n in steps if step in preds[n]] for step in steps}
+        tail = {}
+        for step in reversed(steps):
+            tail[step] = durations[step] + max((tail[s] for s in successors[step]), default=0)
+
+        pending = {step: len(preds[step]) for step in steps}
+        ready = [(-tail[n], n) for n in steps if not pending[n]]
+        heapq.heapify(ready)
+        running, now, slots = [], 0, limit or len(steps)
+        while ready or running:
+            while ready and len(running) < slots:
+                _, step = heapq.heappop(ready)
+                heapq.heappush(running, (now + durations[step], step))
+            now, step = heapq.heappop(running)
+            for succ in successors[step]:
+                pending[succ] -= 1
+                if not pending[succ]:
+                    heapq.heappush(ready, (-tail[succ], succ))
+        return now
+
+    @staticmethod
+    def fleet_makespan(host_times, concurrency):
+        """Hôtes traités par `concurrency` sessions simultanées (plus longs d'abord)"""
+        slots = [0.0] * min(concurrency, len(host_times))
+        for duration in sorted(host_times, reverse=True):
+            heapq.heapreplace(slots, slots[0] + duration)
+        return max(slots)
+
+    # ------------------------------------------------------------------
+    # Plan
+    # ------------------------------------------------------------------
+
+    def plan(self, name, order, hosts, mode="sequential", max_concurrency=None, per_host_limit=None):
+        order, scripts = self.load_scripts(order)
+        preds = self.predecessors(order, scripts, mode)
+        waves = self.waves(order, preds)
+        if mode == "sequential":
+            for i, script in enumerate(order):
+                late = {d for d in scripts[script]["after"] if d in order[i + 1:] and d not in order[:i]}
+                if late:
+                    self.warnings.append(f"{script} dépend de {', '.join(sorted(late))}, placé après lui")
+
+        estimates = self.durations(scripts, hosts)
+        capacities = self.host_capacities(hosts)
+
+        # Un script répété n'est transféré qu'une fois par hôte
+        libs = sorted({lib for info in scripts.values() for lib in info["libs"]})
+        bytes_per_host = sum(info["bytes"] for info in scripts.values()) + sum(
+            os.path.getsize(os.path.join(LIB_DIR, lib)) for lib in libs)
+
+        # En parallèle, une dépendance peut figurer plus loin dans le workflow
+        steps = [i for wave in waves for i in wave]
+        fleet_durations = {i: estimates[order[i]]["estimate_ms"] for i in steps}
+        path, path_ms = self.critical_path(steps, preds, fleet_durations)
+
+        exec_ms = {}
+        for host in hosts:
+            limit = 1 if mode == "sequential" else (per_host_limit or capacities[host][1])
+            exec_ms[host] = self.host_makespan(
+                steps, preds, {i: estimates[order[i]]["hosts"][host] for i in steps}, limit)
+
+        def host_times(concurrency):
+            times = []
+            for host in hosts:
+                mbps = capacities[host][0]
+                if self.uplink_mbps:
+                    mbps = min(mbps, self.uplink_mbps / concurrency)
+                transfer_ms = bytes_per_host * 8 / (mbps * 1e6) * 1000
+                times.append(self.connect_ms + transfer_ms + exec_ms[host])
+            return times
+
+        ceiling = min(len(hosts), max_concurrency or len(hosts))
+        curve = {c: self.fleet_makespan(host_times(c), c) for c in range(1, ceiling + 1)}
+        best = min(curve, key=lambda c: (round(curve[c]), c))
+        slowest = max(hosts, key=lambda h: exec_ms[h])
+
+        return {
+            "workflow": {"name": name, "execution_mode": mode, "scripts": order, "hosts": len(hosts)},
+            "steps": [
+                {"step": i + 1, "wave": w + 1, "script": order[i], "after": [p + 1 for p in sorted(preds[i])],
+                 "path": scripts[order[i]]["path"], "bytes": scripts[order[i]]["bytes"],
+                 "libraries": scripts[order[i]]["libs"], **{
+                     k: estimates[order[i]][k] for k in ("estimate_ms", "source", "samples", "failure_rate")}}
+                for w, wave in enumerate(waves) for i in wave
+            ],
+            "critical_path": {"steps": [i + 1 for i in path], "scripts": [order[i] for i in path],
+                              "duration_ms": path_ms,
+                              "slowest_host": slowest, "slowest_host_ms": exec_ms[slowest]},
+            "transfer": {"bytes_per_host": bytes_per_host, "total_bytes": bytes_per_host * len(hosts),
+                         "libraries": libs},
+            "concurrency": {
+                "best": best,
+                "wall_time_ms": round(curve[best]),
+                "sequential_ms": round(curve[1]),
+                "limit": ceiling,
+                "curve": {str(c): round(ms) for c, ms in curve.items()
+                          if c in (1, best, ceiling) or c & (c - 1) == 0},
+            },
+            "warnings": self.warnings,
+        }
+
+
+def print_plan(plan):
+    wf = plan["workflow"]
+    print(f"📋 Plan du workflow '{wf['name']}' ({wf['execution_mode']}, "
+          f"{len(wf['scripts'])} étape(s), {wf['hosts']} hôte(s))")
+    current = None
+    for step in plan["steps"]:
+        if step["wave"] != current:
+            current = step["wave"]
+            print(f"  Vague {current}:")
+        history = f"{step['samples']} exécution(s)" if step["source"] == "history" else "sans historique"
+        if step["failure_rate"]:
+            history += f", {step['failure_rate']:.0%} d'échecs"
+        after = f" après {', '.join(f'#{n}' for n in step['after'])}" if step["after"] else ""
+        print(f"    #{step['step']:<3} {step['script']:<48} ~{format_ms(step['estimate_ms']):>8}  "
+              f"{format_bytes(step['bytes']):>9}  ({history}){after}")
+
+    cp = plan["critical_path"]
+    print(f"\n⏱️  Chemin critique: {' → '.join(cp['scripts'])} ({format_ms(cp['duration_ms'])})")
+    print(f"   Hôte le plus lent: {cp['slowest_host']} ({format_ms(cp['slowest_host_ms'])} d'exécution)")
+    tr = plan["transfer"]
+    print(f"📦 Transfert: {format_bytes(tr['bytes_per_host'])} par hôte, {format_bytes(tr['total_bytes'])} au total"
+          + (f" (bibliothèques: {', '.join(tr['libraries'])})" if tr["libraries"] else ""))
+    cc = plan["concurrency"]
+    print(f"📊 Concurrence optimale: {cc['best']} hôte(s) simultané(s) → {format_ms(cc['wall_time_ms'])} "
+          f"(un par un: {format_ms(cc['sequential_ms'])}, limite: {cc['limit']})")
+    if len(cc["curve"]) > 1:
+        print("   " + "  ".join(f"{c}: {format_ms(ms)}" for c, ms in cc["curve"].items()))
+    for warning in plan["warnings"]:
+        print(f"⚠️  {warning}")
+
+
+def read_hosts(values, hosts_file):
+    hosts = [h for value in values for h in value.split(",") if h]
+    if hosts_file:
+        with open(hosts_file, encoding="utf-8") as f:
+            hosts.extend(line.split("#")[0].strip() for line in f if line.split("#")[0].strip())
+    return list(dict.fromkeys(hosts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation et estimation d'un workflow avant exécution")
+    parser.add_argument("name", nargs="?", help="Nom du workflow")
+    parser.add_argument("scripts", nargs="*", help="Scripts du workflow (ordre d'exécution)")
+    parser.add_argument("--workflow", help="Fichier JSON {name, scripts, hosts, execution_mode}")
+    parser.add_argument("-H", "--host", action="append", default=[], help="Hôte cible (répétable, ou a,b,c)")
+    parser.add_argument("--hosts-file", help="Fichier d'hôtes (un par ligne)")
+    parser.add_argument("--parallel", action="store_true", help="Mode parallèle (défaut: séquentiel)")
+    parser.add_argument("--max-concurrency", type=int, help="Sessions simultanées max entre hôtes")
+    parser.add_argument("--per-host-limit", type=int, help="Scripts simultanés max par hôte (mode parallèle)")
+    parser.add_argument("--uplink-mbps", type=float, help="Débit montant partagé du poste de contrôle")
+    parser.add_argument("--bandwidth-mbps", type=float, help="Débit par hôte (défaut: baselines, sinon 100)")
+    parser.add_argument("--connect-ms", type=int, default=DEFAULT_CONNECT_MS, help="Coût fixe par hôte (SSH)")
+    parser.add_argument("--default-ms", type=int, default=DEFAULT_SCRIPT_MS, help="Durée sans historique")
+    parser.add_argument("--quantile", type=float, default=0.5, help="Quantile des durées (0.9: pessimiste)")
+    parser.add_argument("--db", default=DEFAULT_CATALOG_DB, help="Base du catalogue")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_intermixed_args(argv)
+
+    workflow = {}
+    if args.workflow:
+        try:
+            with open(args.workflow, encoding="utf-8") as f:
+                workflow = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Workflow illisible: {e}", file=sys.stderr)
+            return 2
+    name = args.name or workflow.get("name", "workflow")
+    scripts = args.scripts or workflow.get("scripts", [])
+    mode = "parallel" if args.parallel else workflow.get("execution_mode", "sequential")
+    try:
+        hosts = read_hosts(args.host, args.hosts_file) or workflow.get("hosts", [])
+    except OSError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    if not scripts or not hosts:
+        parser.error("au moins un script et un hôte (--host/--hosts-file) sont requis")
+    if mode not in ("sequential", "parallel") or not 0 <= args.quantile <= 1:
+        parser.error("mode sequential|parallel et quantile entre 0 et 1 requis")
+
+    planner = WorkflowPlanner(args.db, args.quantile, args.default_ms, args.bandwidth_mbps,
+                              args.uplink_mbps, args.connect_ms)
+    try:
+        plan = planner.plan(name, scripts, hosts, mode, args.max_concurrency, args.per_host_limit)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 8
+
+    if args.json:
+        print(json.dumps(plan, indent=2, ensure_ascii=False))
+    else:
+        print_plan(plan)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())